@@ -0,0 +1,45 @@
+""" compares the fast-path filter deserializer against a full
+`FilterSchema.load` for a handful of representative payloads.
+
+    $ python -m benchmarks.bench_deserialize
+"""
+import timeit
+
+from flask_filter.schemas import _schema, deserialize_filters
+
+
+PAYLOADS = {
+    "single": [{"field": "name", "op": "=", "value": "Fido"}],
+    "mixed": [
+        {"field": "weight", "op": ">", "value": 10},
+        {"field": "dateOfBirth", "op": "<", "value": "2018-12-15"},
+        {"field": "name", "op": "like", "value": "J%"},
+        {"field": "toys.id", "op": "contains", "value": 2},
+    ],
+    "large-in": [{"field": "id", "op": "in", "value": list(range(10000))}],
+}
+
+
+def bench(fn, data, number):
+    best = min(timeit.repeat(lambda: fn(data, many=True), number=number,
+                             repeat=5))
+    return best / number * 1e6
+
+
+def run(number=200):
+    """ fast-path deserializations per second, per payload """
+    return {name: 1e6 / bench(deserialize_filters, data, number)
+            for name, data in PAYLOADS.items()}
+
+
+def main(number=200):
+    print(f"{'payload':<10} {'marshmallow':>14} {'fast path':>14} {'speedup':>8}")
+    for name, data in PAYLOADS.items():
+        slow = bench(_schema.load, data, number)
+        fast = bench(deserialize_filters, data, number)
+        print(f"{name:<10} {slow:>11.1f} us {fast:>11.1f} us "
+              f"{slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+""" benchmark suite over the minipet models scaled up in SQLite. Writes
+machine-readable results and, given a baseline from an earlier run, fails
+when any metric regressed by more than the tolerance::
+
+    $ python -m benchmarks --dogs 100000 --output results.json
+    $ python -m benchmarks --dogs 100000 --baseline results.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+from datetime import date, timedelta
+
+import sqlalchemy
+
+from benchmarks import bench_deserialize
+from flask_filter.plans import FilterPlan
+from flask_filter.schemas import deserialize_filters
+from tests.minipet_app import create_app, filtr, db, Dog, DogSchema, Toy
+
+
+# one filter list per operator, each matching a small share of the dogs
+def operator_payloads(dogs):
+    return {
+        "=": [{"field": "name", "op": "=", "value": f"dog{dogs // 2}"}],
+        "!=": [{"field": "weight", "op": ">", "value": 117},
+               {"field": "weight", "op": "!=", "value": 119}],
+        "<": [{"field": "weight", "op": "<", "value": 2}],
+        "<=": [{"field": "dateOfBirth", "op": "<=", "value": "2000-01-05"}],
+        ">": [{"field": "weight", "op": ">", "value": 119}],
+        ">=": [{"field": "dateOfBirth", "op": ">=", "value": "2019-02-01"}],
+        "in": [{"field": "id", "op": "in",
+                "value": list(range(1, dogs, max(dogs // 100, 1)))}],
+        "like": [{"field": "name", "op": "like", "value": "dog12%"}],
+        "contains": [{"field": "toys", "op": "contains", "value": 7}],
+        "contains-name": [{"field": "toys.name", "op": "contains",
+                           "value": "toy7"}],
+    }
+
+
+def populate(dogs, toys, toys_per_dog=2, chunk=50000):
+    """ bulk-insert `dogs` dogs, `toys` toys and `toys_per_dog` links each """
+    start = date(2000, 1, 1)
+    db.session.execute(Toy.__table__.insert(),
+                       [{"name": f"toy{i}"} for i in range(toys)])
+    dog_toys = db.Model.metadata.tables["dog_toys"]
+    for first in range(0, dogs, chunk):
+        ids = range(first, min(first + chunk, dogs))
+        db.session.execute(Dog.__table__.insert(), [
+            {"id": i + 1, "name": f"dog{i}",
+             "dob": start + timedelta(days=i % 7000), "weight": i % 120}
+            for i in ids
+        ])
+        db.session.execute(dog_toys.insert(), [
+            {"dog_id": i + 1, "toy_id": (i * 7 + k * 13) % toys + 1}
+            for i in ids for k in range(toys_per_dog)
+        ])
+    db.session.commit()
+
+
+def _median(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        db.session.expunge_all()
+    return statistics.median(times)
+
+
+def metric(value, unit, higher_is_better=False):
+    return {"value": value, "unit": unit,
+            "higher_is_better": higher_is_better}
+
+
+def bench_deserialization(results, number):
+    for name, ops in bench_deserialize.run(number).items():
+        results[f"deserialize.{name}"] = metric(ops, "ops/s", True)
+
+
+def bench_compile(results, dogs, number):
+    for op, payload in operator_payloads(dogs).items():
+        filters = deserialize_filters(payload, many=True)
+        best = min(timeit.repeat(lambda: FilterPlan(Dog, DogSchema, filters),
+                                 number=number, repeat=5))
+        results[f"compile.{op}"] = metric(best / number * 1e6, "us")
+        best = min(timeit.repeat(
+            lambda: filtr.plan_cache.get(Dog, DogSchema, filters),
+            number=number, repeat=5))
+        results[f"compile-cached.{op}"] = metric(best / number * 1e6, "us")
+
+
+def bench_search(results, dogs, repeat):
+    for op, payload in operator_payloads(dogs).items():
+        seconds = _median(lambda: filtr.search(Dog, payload), repeat)
+        results[f"search.{op}"] = metric(seconds * 1e3, "ms")
+
+
+def bench_memory(results, rows):
+    everything = [{"field": "id", "op": "<=", "value": rows}]
+    for name, fn in (
+        ("search", lambda: filtr.search(Dog, everything)),
+        ("stream", lambda: sum(1 for _ in filtr.stream(Dog, everything))),
+        ("search_rows", lambda: filtr.search_rows(Dog, everything,
+                                                  ["id", "name"])),
+    ):
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        db.session.expunge_all()
+        results[f"memory.{name}"] = metric(peak / 2 ** 20, "MiB")
+
+
+def run(dogs=100000, toys=1000, repeat=5, number=200, memory_rows=None,
+        database="sqlite://"):
+    app = create_app()
+    app.config["SQLALCHEMY_DATABASE_URI"] = database
+    results = {}
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        populate(dogs, toys)
+        load = time.perf_counter() - start
+        bench_deserialization(results, number)
+        bench_compile(results, dogs, number)
+        bench_search(results, dogs, repeat)
+        bench_memory(results, memory_rows or min(dogs, 100000))
+        db.drop_all()
+    return {
+        "meta": {
+            "dogs": dogs, "toys": toys, "load_seconds": load,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=0.2):
+    """ (name, baseline, current, change) for every metric that got worse
+    by more than `tolerance` (a fraction) relative to `baseline`
+    """
+    regressions = []
+    for name, old in baseline["results"].items():
+        new = current["results"].get(name)
+        if new is None or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / old["value"]
+        if old.get("higher_is_better"):
+            change = -change
+        if change > tolerance:
+            regressions.append((name, old["value"], new["value"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description=__doc__.split("\n")[0])
+    parser.add_argument("--dogs", type=int, default=100000)
+    parser.add_argument("--toys", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", default="sqlite://",
+                        help="SQLAlchemy URL, in memory by default")
+    parser.add_argument("--output", help="write the results to this file")
+    parser.add_argument("--baseline", help="results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = run(args.dogs, args.toys, args.repeat, database=args.database)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:.4g} -> {new:.4g} "
+                  f"({change:+.0%})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
@@ -0,0 +1,77 @@
+""" GROUP BY aggregates over a filtered search, computed in the database::
+
+    filtr.aggregate(Dog, filters, group_by=["weight"],
+                    metrics=["count", "avg:weight", "max:dateOfBirth"])
+    [{"weight": 50.0, "count": 2, "avg_weight": 50.0,
+      "max_dateOfBirth": date(2005, 12, 31)}, ...]
+
+A metric is "count" (matching objects) or "<function>:<field>" for one of
+`FUNCTIONS`; each comes back under the key "<function>_<field>".
+"""
+from collections import namedtuple
+
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import func, inspect
+
+from flask_filter.fields import get_column
+from flask_filter.projection import _is_column
+
+
+FUNCTIONS = ("count", "sum", "avg", "min", "max")
+Metric = namedtuple("Metric", ["function", "field", "label"])
+
+
+def parse_metric(metric) -> Metric:
+    function, _, field = metric.partition(":")
+    if function not in FUNCTIONS:
+        raise ValidationError(f"unknown aggregate '{function}', expected "
+                              f"one of {FUNCTIONS}")
+    if not field:
+        if function != "count":
+            raise ValidationError(f"'{function}' needs a field, "
+                                  f"e.g. '{function}:weight'")
+        return Metric(function, None, function)
+    return Metric(function, field, f"{function}_{field}")
+
+
+def _column(class_, schema, field):
+    column = get_column(class_, schema, field)
+    if not _is_column(column):
+        raise ValidationError(f"'{field}' is not a column field")
+    return column
+
+
+def _expression(class_, schema, metric):
+    if metric.field is None:
+        return func.count(inspect(class_).primary_key[0])
+    column = _column(class_, schema, metric.field)
+    return getattr(func, metric.function)(column)
+
+
+def aggregate_query(query, class_, schema, group_by=(), metrics=("count",)):
+    """ the rows of `group_by` fields and `metrics` over a filtered query,
+    as dicts keyed by JSON field name and metric label, ordered by group.
+    """
+    group_by = list(group_by or ())
+    metrics = [parse_metric(m) for m in metrics]
+    groups = [_column(class_, schema, f) for f in group_by]
+    if query._distinct:
+        # relationship joins repeat rows; aggregate each object once
+        pk = inspect(class_).primary_key[0]
+        ids = query.order_by(None).with_entities(pk).statement
+        query = query.session.query(class_).filter(pk.in_(ids)) \
+            .params(query._params)
+    columns = groups + [_expression(class_, schema, m) for m in metrics]
+    query = query.order_by(None).with_entities(*columns)
+    if groups:
+        query = query.group_by(*groups).order_by(*groups)
+    keys = group_by + [m.label for m in metrics]
+    return [dict(zip(keys, row)) for row in query]
+
+
+def empty_aggregate(group_by=(), metrics=("count",)):
+    """ what `aggregate_query` returns when nothing can match """
+    if group_by:
+        return []
+    metrics = [parse_metric(m) for m in metrics]
+    return [{m.label: 0 if m.function == "count" else None for m in metrics}]
@@ -0,0 +1,85 @@
+""" asyncio counterparts of the `FlaskFilter` search methods, running
+`select()` statements on SQLAlchemy `AsyncSession` objects (SQLAlchemy 1.4+).
+
+Every call opens its own session from the session factory, so independent
+searches can run concurrently on separate connections::
+
+    searches = AsyncSearch(filtr, async_sessionmaker(engine))
+    total, page = await asyncio.gather(
+        searches.count(Dog, filters),
+        searches.search(Dog, filters, limit=20),
+    )
+"""
+import sqlalchemy
+from sqlalchemy import distinct, func, inspect, select
+
+from flask_filter.base import FlaskFilter, qualify_order_by
+
+if tuple(int(v) for v in sqlalchemy.__version__.split(".")[:2]) < (1, 4):
+    raise ImportError("flask_filter.aio requires SQLAlchemy 1.4 or newer")
+
+
+class AsyncSearch(object):
+
+    def __init__(self, filtr: FlaskFilter, session_factory):
+        """
+        :param filtr: the `FlaskFilter` providing registered schemas and
+            the compiled-plan cache
+        :param session_factory: callable returning a new `AsyncSession`,
+            e.g. an `async_sessionmaker` bound to an async engine
+        """
+        self.filtr = filtr
+        self.session_factory = session_factory
+
+    def statement(self, DbModel, filters, ModelSchema=None,
+                  limit: int = None, order_by=None):
+        """ the `select()` statement `search` would execute, or None if the
+        filters contradict each other
+        """
+        plan, filters = self._plan(DbModel, filters, ModelSchema)
+        if plan is None:
+            return None
+        stmt = plan.apply_statement(select(DbModel), filters)
+        if plan.distinct:
+            stmt = stmt.distinct()
+        if order_by:
+            stmt = stmt.order_by(qualify_order_by(DbModel, order_by))
+        if limit:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    async def search(self, DbModel, filters, ModelSchema=None,
+                     limit: int = None, order_by=None) -> list:
+        stmt = self.statement(DbModel, filters, ModelSchema, limit, order_by)
+        if stmt is None:
+            return []
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            return result.scalars().all()
+
+    async def count(self, DbModel, filters, ModelSchema=None) -> int:
+        plan, filters = self._plan(DbModel, filters, ModelSchema)
+        if plan is None:
+            return 0
+        pk = inspect(DbModel).primary_key[0]
+        count = func.count(distinct(pk)) if plan.distinct else func.count(pk)
+        stmt = plan.apply_statement(select(count).select_from(DbModel),
+                                    filters)
+        async with self.session_factory() as session:
+            return (await session.execute(stmt)).scalar()
+
+    async def exists(self, DbModel, filters, ModelSchema=None) -> bool:
+        plan, filters = self._plan(DbModel, filters, ModelSchema)
+        if plan is None:
+            return False
+        pk = inspect(DbModel).primary_key[0]
+        stmt = plan.apply_statement(select(pk).select_from(DbModel), filters)
+        async with self.session_factory() as session:
+            return (await session.execute(select(stmt.exists()))).scalar()
+
+    def _plan(self, DbModel, filters, ModelSchema):
+        filters = self.filtr._prepare(filters, DbModel, ModelSchema)
+        if filters is None:
+            return None, None
+        schema = ModelSchema or self.filtr._lookup_schema(DbModel)
+        return self.filtr.plan_cache.get(DbModel, schema, filters), filters
@@ -1,38 +1,425 @@
+import itertools
+from contextlib import contextmanager
 from flask import Flask
 from flask_sqlalchemy import Model
 from marshmallow import Schema
+from sqlalchemy import inspect
 from typing import Union
+from flask_filter.aggregation import aggregate_query, empty_aggregate
+from flask_filter.batch import equality_field, split_by_value, union_all
+from flask_filter.facets import (
+    facet_specs, facet_statement, run_facets, without_field
+)
+from flask_filter.fields import field_index, get_column
+from flask_filter.fts import RELEVANCE, register_fts, relevance
+from flask_filter.instrumentation import NULL_RECORDER, SearchRecorder
+from flask_filter.large_in import choose_strategy, rewrite_large_in
+from flask_filter.loading import eager_options
+from flask_filter.normalize import normalize_filters
+from flask_filter.filters import InFilter
+from flask_filter.pagination import Page, paginate_query, sort_keys
+from flask_filter.plans import PlanCache, iter_leaves
+from flask_filter.projection import (
+    _is_column, load_only_option, project_rows, projected_fields
+)
+from flask_filter.query_filter import count_query, exists_query
+from flask_filter.results import cache_key, dependencies
 from flask_filter.schemas import deserialize_filters
+from flask_filter.streaming import stream_ndjson, stream_query
+
+
+def qualify_order_by(DbModel, order_by):
+    """ map an attribute name to the model's column so that joins added by
+    relationship filters cannot make it ambiguous.
+    """
+    if isinstance(order_by, str) and hasattr(DbModel, order_by):
+        return getattr(DbModel, order_by)
+    return order_by
 
 
 class FlaskFilter(object):
     __SCHEMA_MAP = {}
 
-    def __init__(self, app: Flask = None):
+    def __init__(self, app: Flask = None, plan_cache_size: int = 128,
+                 relationship_strategy: str = "auto", result_cache=None,
+                 normalize: bool = True, large_in_threshold: int = 1000,
+                 large_in_strategy: str = "auto", eager_load=False,
+                 router=None):
+        """
+        :param plan_cache_size: number of compiled filter plans to keep
+        :param relationship_strategy: how filters on related models compile,
+            one of "auto", "exists", "semijoin", "join" or "grouped"
+        :param result_cache: optional `ResultCache` that `search` reads
+            through, invalidated when registered models are written
+        :param normalize: fold filters on the same column together and
+            answer contradictory filter lists without querying
+        :param large_in_threshold: `in` lists longer than this are bound
+            as one array or loaded into a temporary table
+        :param large_in_strategy: one of "auto" (`= ANY` on PostgreSQL, a
+            temporary table elsewhere), "any", "temp_table" or "in"
+        :param eager_load: default for the `eager` argument of `search` and
+            `paginate`; True eager-loads every relationship the schema
+            serializes through a `Nested` field
+        :param router: optional `ReplicaRouter` sending searches to read
+            replicas; see `primary` to read from the primary instead
+        """
         self.app = app
+        self.plan_cache = PlanCache(maxsize=plan_cache_size,
+                                    relationship_strategy=relationship_strategy)
+        self.result_cache = result_cache
+        self.normalize = normalize
+        self.large_in_threshold = large_in_threshold
+        self.large_in_strategy = large_in_strategy
+        self.listeners = []
+        self.eager_load = eager_load
+        self.router = router
         if self.app:
             self.init_app(app)
 
     def init_app(self, app: Flask):
         """Callback for initializing application """
         self.app = app
+        if self.router is not None:
+            app.teardown_appcontext(self._remove_sessions)
+
+    def _remove_sessions(self, exc=None):
+        self.router.remove()
+
+    @contextmanager
+    def primary(self):
+        """ run the searches of this block on the primary session rather
+        than a replica, e.g. to read rows written in this transaction
+        """
+        if self.router is None:
+            yield
+            return
+        with self.router.primary():
+            yield
+
+    def add_listener(self, listener):
+        """ call `listener(QueryEvent)` after each phase of every search """
+        self.listeners.append(listener)
 
-    def register_model(self, DbModel, ModelSchema):
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def register_model(self, DbModel, ModelSchema, fts=None):
+        """ map `ModelSchema` to `DbModel`. `fts` lists the JSON fields
+        `match` filters search through a full-text index (or maps them to
+        a `FullText` configuration); create the index with `create_fts`.
+        """
+        field_index(DbModel, ModelSchema)
+        if fts:
+            register_fts(DbModel, ModelSchema, fts)
         self.__SCHEMA_MAP[DbModel] = ModelSchema
+        if self.result_cache is not None:
+            self.result_cache.watch(DbModel)
 
     def search(self, DbModel: Model, filters: list,
                ModelSchema: Union[Schema, None] = None,
-               limit: int = None, order_by=None):
+               limit: int = None, order_by=None, fields: list = None,
+               cache: bool = True, eager=None):
+        """ filtered search returning ORM objects. `fields` (or the `only`
+        set of a `ModelSchema` instance) limits the columns loaded. Results
+        go through the result cache, if one is configured, unless `cache`
+        is False. `eager` picks the relationships to load up front: True
+        for every `Nested` field of the schema, a list of dotted fields or
+        a dict of field -> "auto" / "selectin" / "joined".
+        """
+        recorder = self._recorder(DbModel)
+        with recorder.phase("deserialize"):
+            filters = self._prepare(filters, DbModel, ModelSchema)
+            recorder.describe(filters)
+        if filters is None:
+            return []
+        session = self._session(DbModel)
+        if self.result_cache is None or not cache:
+            with recorder.phase("build"):
+                query = self._search_query(DbModel, filters, ModelSchema,
+                                           limit, order_by, fields, eager,
+                                           session=session)
+            return recorder.run(query)
+        schema = ModelSchema or self._lookup_schema(DbModel)
+        key = cache_key(DbModel, schema, filters, order_by, limit,
+                        projected_fields(ModelSchema, fields),
+                        self.eager_load if eager is None else eager)
+        results = self.result_cache.get(key, session)
+        if results is None:
+            with recorder.phase("build"):
+                query = self._search_query(DbModel, filters, ModelSchema,
+                                           limit, order_by, fields, eager,
+                                           session=session)
+            results = recorder.run(query)
+            self.result_cache.set(key, results,
+                                  dependencies(DbModel, schema, filters))
+        return results
+
+    def search_rows(self, DbModel: Model, filters: list, fields: list,
+                    ModelSchema: Union[Schema, None] = None,
+                    limit: int = None, order_by=None) -> list:
+        """ filtered search returning a dict of the JSON `fields` for each
+        match, selecting only those columns instead of whole entities.
+        """
+        filters = self._prepare(filters, DbModel, ModelSchema)
+        if filters is None:
+            return []
+        schema = ModelSchema or self._lookup_schema(DbModel)
+        query = self._search_query(DbModel, filters, schema, limit, order_by)
+        return project_rows(query, DbModel, schema, fields)
+
+    def search_many(self, DbModel: Model, filter_sets: list,
+                    ModelSchema: Union[Schema, None] = None,
+                    limit: int = None, order_by=None) -> list:
+        """ run several searches in one round trip, returning a list of
+        results per filter set. Sets that are each a single equality test
+        on the same field become one `IN` query; anything else runs as a
+        single UNION ALL with a discriminator column.
+        """
+        prepared = [self._prepare(f, DbModel, ModelSchema)
+                    for f in filter_sets]
+        live = [i for i, filters in enumerate(prepared) if filters is not None]
+        results = [[] for _ in prepared]
+        if live:
+            found = self._search_many(DbModel, [prepared[i] for i in live],
+                                      ModelSchema, limit, order_by)
+            for i, rows in zip(live, found):
+                results[i] = rows
+        return results
+
+    def _search_many(self, DbModel, filter_sets, ModelSchema, limit, order_by):
+        schema = ModelSchema or self._lookup_schema(DbModel)
+        session = self._session(DbModel)
+        field = equality_field(filter_sets)
+        attribute = None if field is None \
+            else get_column(DbModel, schema, field)
+        # rows split by the value of a column; relationship fields take
+        # the UNION ALL below
+        if _is_column(attribute) and limit is None:
+            values = [filters[0].value for filters in filter_sets]
+            in_filter = [InFilter(field, list(dict.fromkeys(values)))]
+            query = self._build_query(DbModel, in_filter, schema,
+                                      session=session)
+            if order_by is not None:
+                query = query.order_by(qualify_order_by(DbModel, order_by))
+            return split_by_value(query.all(), attribute, values)
+        tables = itertools.count()
+        queries = [self._search_query(DbModel, filters, schema, limit,
+                                      order_by, tables=tables,
+                                      session=session)
+                   for filters in filter_sets]
+        if len(queries) == 1:
+            return [queries[0].all()]
+        return union_all(session, DbModel, queries,
+                         qualify_order_by(DbModel, order_by))
+
+    def count(self, DbModel: Model, filters: list,
+              ModelSchema: Union[Schema, None] = None) -> int:
+        """ number of objects matching `filters`, computed in the database """
+        filters = self._prepare(filters, DbModel, ModelSchema)
+        if filters is None:
+            return 0
+        query = self._search_query(DbModel, filters, ModelSchema)
+        return count_query(query, DbModel)
+
+    def exists(self, DbModel: Model, filters: list,
+               ModelSchema: Union[Schema, None] = None) -> bool:
+        """ whether any object matches `filters`, without loading rows """
+        filters = self._prepare(filters, DbModel, ModelSchema)
+        if filters is None:
+            return False
+        query = self._search_query(DbModel, filters, ModelSchema)
+        return exists_query(query)
+
+    def aggregate(self, DbModel: Model, filters: list, group_by: list = None,
+                  metrics: list = ("count",),
+                  ModelSchema: Union[Schema, None] = None) -> list:
+        """ per-group aggregates over the objects matching `filters`,
+        computed in the database. `group_by` takes JSON field names and
+        `metrics` "count" or "<function>:<field>" with a function among
+        count, sum, avg, min and max. Returns a list of one dict per group
+        (a list of a single dict without `group_by`).
+        """
+        filters = self._prepare(filters, DbModel, ModelSchema)
+        if filters is None:
+            return empty_aggregate(group_by, metrics)
+        schema = ModelSchema or self._lookup_schema(DbModel)
+        query = self._search_query(DbModel, filters, schema)
+        return aggregate_query(query, DbModel, schema, group_by, metrics)
+
+    def facets(self, DbModel: Model, filters: list, facets: list,
+               ModelSchema: Union[Schema, None] = None) -> dict:
+        """ counts of the objects matching `filters` per value of each facet
+        field, computed in one statement. A facet is a JSON field name
+        (dotted through relationships) or `{"field": ..., "buckets": [...]}`
+        to count numeric ranges; each leaves out the filters on its own
+        field. Returns {field: [{"value": ..., "count": ...}, ...]}.
+        """
+        schema = ModelSchema or self._lookup_schema(DbModel)
+        specs = facet_specs(facets)
+        filters = self._deserialize(filters, DbModel, schema)
+        index = field_index(DbModel, schema)
+        statements, tables = [], itertools.count()
+        session = self._session(DbModel)
+        for facet in specs:
+            own = without_field(filters, facet.field)
+            if self.normalize:
+                own = normalize_filters(own, index)
+            if own is None:
+                continue
+            query = self._search_query(DbModel, own, schema, tables=tables,
+                                       session=session)
+            statements.append(facet_statement(query, DbModel, schema, facet))
+        return run_facets(session, DbModel, schema, specs, statements)
+
+    def stream(self, DbModel: Model, filters: list,
+               ModelSchema: Union[Schema, None] = None,
+               limit: int = None, order_by=None, chunk_size: int = 1000,
+               fields: list = None):
+        """ like `search`, but returns an iterator that fetches results
+        `chunk_size` rows at a time rather than a fully loaded list.
+        """
+        filters = self._prepare(filters, DbModel, ModelSchema)
+        if filters is None:
+            return iter(())
+        query = self._search_query(DbModel, filters, ModelSchema,
+                                   limit, order_by, fields)
+        return stream_query(query, chunk_size)
+
+    def stream_json(self, DbModel: Model, filters: list,
+                    ModelSchema: Union[Schema, None] = None,
+                    limit: int = None, order_by=None, chunk_size: int = 1000):
+        """ stream search results as newline-delimited JSON serialized
+        through `ModelSchema` (or the registered schema), chunk by chunk.
+        """
+        filters = self._prepare(filters, DbModel, ModelSchema)
+        if filters is None:
+            return iter(())
+        schema = ModelSchema or self._lookup_schema(DbModel)
+        query = self._search_query(DbModel, filters, schema, limit, order_by)
+        return stream_ndjson(query, schema, chunk_size)
+
+    def paginate(self, DbModel: Model, filters: list,
+                 ModelSchema: Union[Schema, None] = None,
+                 limit: int = 20, order_by=None, cursor: str = None,
+                 eager=None) -> Page:
+        """ keyset pagination over a filtered search. `order_by` takes JSON
+        field names ("-name" for descending) and is always suffixed with the
+        primary key. Pass the returned `next_cursor` back as `cursor` to
+        fetch the following page. `eager` works as in `search`.
+        """
+        filters = self._prepare(filters, DbModel, ModelSchema)
+        if filters is None:
+            return Page([], None)
+        schema = ModelSchema or self._lookup_schema(DbModel)
+        query = self._build_query(DbModel, filters, schema)
+        options = self._eager_options(DbModel, schema, eager, None)
+        if options:
+            query = query.options(*options)
+        keys = sort_keys(DbModel, schema, order_by)
+        dialect = query.session.get_bind(mapper=inspect(DbModel)).dialect
+        return paginate_query(query, keys, limit, cursor, dialect.name)
+
+    def _eager_options(self, DbModel, schema, eager, fields):
+        if eager is None:
+            eager = self.eager_load
+        return eager_options(DbModel, schema, eager, fields)
+
+    def _recorder(self, DbModel):
+        if not self.listeners:
+            return NULL_RECORDER
+        return SearchRecorder(list(self.listeners), DbModel)
+
+    def _prepare(self, filters, DbModel=None, ModelSchema=None):
+        """ deserialized (and normalized) filters, or None if they can
+        match nothing. Given the model searched, values are parsed into
+        the types of the columns they are compared to.
+        """
+        index = self._index(DbModel, ModelSchema)
+        filters = deserialize_filters(filters, many=True, index=index)
+        return normalize_filters(filters, index) if self.normalize \
+            else filters
+
+    def _deserialize(self, filters, DbModel=None, ModelSchema=None):
+        index = self._index(DbModel, ModelSchema)
+        return deserialize_filters(filters, many=True, index=index)
+
+    def _index(self, DbModel, ModelSchema=None):
+        """ the `FieldIndex` of the model searched, if its schema is known """
+        schema = ModelSchema or self.__SCHEMA_MAP.get(DbModel)
+        return field_index(DbModel, schema) if schema is not None else None
+
+    def _search_query(self, DbModel, filters, ModelSchema=None,
+                      limit=None, order_by=None, fields=None, eager=False,
+                      tables=None, session=None):
         filters = deserialize_filters(filters, many=True)
         schema = ModelSchema or self._lookup_schema(DbModel)
-        query = DbModel.query
-        for f in filters:
-            query = f.apply(query, DbModel, schema)
-        if order_by:
-            query = query.order_by(order_by)
+        query = self._build_query(DbModel, filters, schema, tables, session)
+        fields = projected_fields(ModelSchema, fields)
+        if fields:
+            option = load_only_option(DbModel, schema, fields)
+            if option is not None:
+                query = query.options(option)
+        options = self._eager_options(DbModel, schema, eager, fields)
+        if options:
+            query = query.options(*options)
+        if isinstance(order_by, str) and order_by == RELEVANCE \
+                and not hasattr(DbModel, RELEVANCE):
+            order_by = relevance(DbModel, schema, filters)
+        if order_by is not None:
+            query = query.order_by(qualify_order_by(DbModel, order_by))
         if limit:
             query = query.limit(limit)
-        return query.all()
+        return query
+
+    def _build_query(self, DbModel, filters, schema, tables=None,
+                     session=None):
+        """ the filtered query on `session` (one routed by `_session` if
+        not given); `tables` numbers its temp tables, shared by queries
+        that run as one statement
+        """
+        query = self._query(DbModel, session)
+        filters = self._large_in(query.session, DbModel, filters, schema,
+                                 tables)
+        plan = self.plan_cache.get(DbModel, schema, filters)
+        return plan.apply(query, filters)
+
+    def _large_in(self, session, DbModel, filters, schema, tables=None):
+        """ swap long `in` lists for their array / temp table form, loading
+        any temp tables on the session's connection
+        """
+        if not any(type(f) is InFilter and
+                   len(f.value) > self.large_in_threshold
+                   for f in iter_leaves(filters)):
+            return filters
+        mapper = inspect(DbModel)
+        dialect = session.get_bind(mapper=mapper).dialect.name
+        strategy = choose_strategy(self.large_in_strategy, dialect)
+        filters, loads = rewrite_large_in(filters, self.large_in_threshold,
+                                          strategy, tables)
+        if loads:
+            connection = session.connection(mapper=mapper)
+            for f in loads:
+                f.load(connection, DbModel, schema)
+        return filters
+
+    def _session(self, DbModel):
+        """ the session one search call runs on: a replica's if searches
+        are routed, the model's own otherwise. Queries that are combined,
+        loaded into temp tables or merged from the cache must share it.
+        """
+        if self.router is not None:
+            session = self.router.session()
+            if session is not None:
+                return session
+        return DbModel.query.session
+
+    def _query(self, DbModel, session=None):
+        """ `DbModel.query` on `session`, or on a routed session """
+        query = DbModel.query
+        session = session or self._session(DbModel)
+        if session is query.session:
+            return query
+        return query.with_session(session)
 
     def _lookup_schema(self, DbModel):
         model = self.__SCHEMA_MAP.get(DbModel)
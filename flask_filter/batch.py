@@ -0,0 +1,97 @@
+from sqlalchemy import bindparam, inspect, literal
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.util import ClauseAdapter
+from sqlalchemy.sql.visitors import replacement_traverse
+
+from flask_filter.filters.filters import EqualsFilter
+
+
+DISCRIMINATOR = "ff_set"
+
+
+def equality_field(filter_sets):
+    """ the field shared by filter sets that are each one non-null equality
+    test on that same (non-nested) field, or None if they are not.
+    """
+    shapes = set()
+    for filters in filter_sets:
+        if len(filters) != 1 or type(filters[0]) is not EqualsFilter:
+            return None
+        f = filters[0]
+        if f.value is None or f.path:
+            return None
+        shapes.add(f.field)
+    return shapes.pop() if len(shapes) == 1 else None
+
+
+def _coerce(column, value):
+    """ cast a filter value to the column's python type so it can be
+    matched against loaded attribute values.
+    """
+    try:
+        python_type = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return value
+    if isinstance(value, python_type):
+        return value
+    try:
+        return python_type(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def split_by_value(rows, attribute, values):
+    """ distribute the rows of an `IN (...)` query back to the filter sets
+    whose value they matched, keeping the query's order within each set.
+    """
+    matches = {}
+    for row in rows:
+        matches.setdefault(getattr(row, attribute.key), []).append(row)
+    return [list(matches.get(_coerce(attribute, v), [])) for v in values]
+
+
+def _bind_unique(statement, params):
+    """ replace the named plan parameters of `statement` with anonymous ones
+    holding their values, so several plans can share one statement.
+    """
+    def replace(element):
+        if isinstance(element, BindParameter) and element.key in params:
+            return bindparam(element.key, params[element.key],
+                             type_=element.type, unique=True,
+                             expanding=element.expanding)
+        return None
+    return replacement_traverse(statement, {}, replace)
+
+
+def union_all(session, DbModel, queries, order_by=None):
+    """ run one UNION ALL over the search queries, tagging every row with
+    the index of the query it came from, and split the rows back out. Each
+    query is wrapped in a subquery so it can keep its own ORDER BY / LIMIT,
+    with its plan parameters made unique since every plan names them
+    `ff_0`, `ff_1`, ...
+    """
+    members, first = [], None
+    for i, query in enumerate(queries):
+        query = query.add_columns(literal(i).label(DISCRIMINATOR))
+        query = query.enable_eagerloads(False)
+        tagged = _bind_unique(query.statement, query._params).alias()
+        entity = aliased(DbModel, tagged)
+        members.append(session.query(entity, tagged.c[DISCRIMINATOR]))
+        if first is None:
+            first = (entity, tagged)
+    union = members[0].union_all(*members[1:])
+    entity, tagged = first
+    ordering = [tagged.c[DISCRIMINATOR]]
+    if order_by is not None:
+        if hasattr(order_by, "__clause_element__"):
+            order_by = order_by.__clause_element__()
+        ordering.append(ClauseAdapter(tagged).traverse(order_by))
+    else:
+        mapper = inspect(DbModel)
+        pk = mapper.get_property_by_column(mapper.primary_key[0]).key
+        ordering.append(getattr(entity, pk))
+    results = [[] for _ in queries]
+    for obj, index in union.order_by(*ordering):
+        results[index].append(obj)
+    return results
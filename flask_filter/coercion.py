@@ -0,0 +1,233 @@
+""" parsers turning JSON filter values into the python type of the column
+they are compared to. The `FieldIndex` builds one parser per field from the
+column's SQLAlchemy type (or, for types it does not know, the schema's
+marshmallow field), so a value is parsed by what its column holds rather
+than by what it looks like: "2018-12-15" stays a string when compared to a
+`String` column, and string columns skip parsing altogether.
+"""
+import datetime
+import decimal
+import uuid
+
+from marshmallow import fields as ma_fields
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import types
+from sqlalchemy.dialects import postgresql
+
+
+_TRUE = {"true", "t", "yes", "y", "1"}
+_FALSE = {"false", "f", "no", "n", "0"}
+_UUID_TYPES = tuple(filter(None, (postgresql.UUID,
+                                  getattr(types, "Uuid", None))))
+
+
+def _invalid(value, kind):
+    return ValidationError(f"{value!r} is not a valid {kind}")
+
+
+def identity(value):
+    return value
+
+
+def parse_date(value):
+    if value is None or type(value) is datetime.date:
+        return value
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            pass
+        try:
+            return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            pass
+    raise _invalid(value, "date")
+
+
+def datetime_parser(timezone):
+    """ datetimes in ISO 8601, aware for `timezone` columns (naive values
+    are taken as UTC) and naive UTC otherwise
+    """
+    utc = datetime.timezone.utc
+
+    def parse_datetime(value):
+        if value is None:
+            return value
+        if isinstance(value, str):
+            try:
+                value = datetime.datetime.fromisoformat(
+                    value[:-1] + "+00:00" if value.endswith("Z") else value)
+            except ValueError:
+                raise _invalid(value, "datetime")
+        elif type(value) is datetime.date:
+            value = datetime.datetime.combine(value, datetime.time())
+        elif not isinstance(value, datetime.datetime):
+            raise _invalid(value, "datetime")
+        if timezone and value.tzinfo is None:
+            return value.replace(tzinfo=utc)
+        if not timezone and value.tzinfo is not None:
+            return value.astimezone(utc).replace(tzinfo=None)
+        return value
+    return parse_datetime
+
+
+def parse_integer(value):
+    if value is None or type(value) is int:
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (str, decimal.Decimal)):
+        try:
+            return int(value)
+        except (ValueError, ArithmeticError):
+            pass
+    raise _invalid(value, "integer")
+
+
+def parse_integer_bound(value):
+    """ a range bound on an integer column: any number will do """
+    try:
+        return parse_integer(value)
+    except ValidationError:
+        return parse_float(value)
+
+
+def parse_float(value):
+    # ints compare to floats as they are
+    if value is None or type(value) in (int, float):
+        return value
+    if not isinstance(value, bool):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            pass
+    raise _invalid(value, "number")
+
+
+def parse_decimal(value):
+    if value is None or isinstance(value, decimal.Decimal):
+        return value
+    if not isinstance(value, bool):
+        try:
+            return decimal.Decimal(str(value))
+        except (TypeError, ValueError, ArithmeticError):
+            pass
+    raise _invalid(value, "decimal")
+
+
+def parse_boolean(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered in _TRUE:
+            return True
+        if lowered in _FALSE:
+            return False
+    raise _invalid(value, "boolean")
+
+
+def uuid_parser(as_uuid):
+    def parse_uuid(value):
+        if value is None:
+            return value
+        try:
+            parsed = value if isinstance(value, uuid.UUID) \
+                else uuid.UUID(str(value))
+        except ValueError:
+            raise _invalid(value, "UUID")
+        return parsed if as_uuid else str(parsed)
+    return parse_uuid
+
+
+def enum_parser(type_):
+    """ members of the enum class, by member, name or value, or one of the
+    type's strings
+    """
+    enum_class = getattr(type_, "enum_class", None)
+    if enum_class is None:
+        allowed = frozenset(type_.enums)
+
+        def parse_enum(value):
+            if value is None or value in allowed:
+                return value
+            raise _invalid(value, f"choice of {sorted(allowed)}")
+        return parse_enum
+    by_value = {m.value: m for m in enum_class}
+
+    def parse_enum_member(value):
+        if value is None or isinstance(value, enum_class):
+            return value
+        member = enum_class.__members__.get(value) \
+            if isinstance(value, str) else None
+        if member is None:
+            try:
+                member = by_value.get(value)
+            except TypeError:
+                member = None
+        if member is None:
+            raise _invalid(value, enum_class.__name__)
+        return member
+    return parse_enum_member
+
+
+def bound_parser(parse):
+    """ the parser for the bounds of `<`, `<=`, `>` and `>=` on a column
+    whose values `parse` parses: `id < 1.5` is a fine comparison even
+    though 1.5 is no integer
+    """
+    return parse_integer_bound if parse is parse_integer else parse
+
+
+def _type_parser(type_):
+    if isinstance(type_, types.TypeDecorator):
+        return None
+    if isinstance(type_, types.Boolean):
+        return parse_boolean
+    if isinstance(type_, types.DateTime):
+        return datetime_parser(type_.timezone)
+    if isinstance(type_, types.Date):
+        return parse_date
+    if isinstance(type_, types.Enum):
+        return enum_parser(type_)
+    if isinstance(type_, _UUID_TYPES):
+        return uuid_parser(getattr(type_, "as_uuid", False))
+    if isinstance(type_, types.Integer):
+        return parse_integer
+    if isinstance(type_, types.Numeric):
+        return parse_decimal if type_.asdecimal else parse_float
+    if isinstance(type_, (types.String, types.Interval, types.Time,
+                          types.LargeBinary)):
+        return identity
+    return None
+
+
+def _field_parser(field):
+    if isinstance(field, ma_fields.DateTime) and \
+            not isinstance(field, ma_fields.Date):
+        return datetime_parser(False)
+    for kind, parser in ((ma_fields.Date, parse_date),
+                         (ma_fields.Boolean, parse_boolean),
+                         (ma_fields.Integer, parse_integer),
+                         (ma_fields.Decimal, parse_decimal),
+                         (ma_fields.Float, parse_float),
+                         (ma_fields.UUID, uuid_parser(True)),
+                         (ma_fields.String, identity)):
+        if isinstance(field, kind):
+            return parser
+    return None
+
+
+def column_parser(type_, field=None):
+    """ the parser for values compared to a column of `type_`, falling back
+    on the marshmallow `field` for types it does not recognize. None if
+    neither says what the values should be.
+    """
+    parser = _type_parser(type_) if type_ is not None else None
+    if parser is None and field is not None:
+        parser = _field_parser(field)
+    return parser
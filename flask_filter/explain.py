@@ -0,0 +1,185 @@
+""" run representative filter payloads through `EXPLAIN` to find the
+searches that scan whole tables, and suggest indexes for the fields a
+`FlaskFilter` exposes without one. Works on SQLite (`EXPLAIN QUERY PLAN`)
+and PostgreSQL (`EXPLAIN`), e.g. offline against a local SQLite copy::
+
+    advice = advise(filtr, Dog, [
+        [{"field": "weight", "op": ">", "value": 50}],
+        [{"field": "name", "op": "=", "value": "Kaya"}],
+    ])
+    print(format_advice(advice))
+"""
+import re
+from collections import namedtuple
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from flask_filter.fields import field_index
+from flask_filter.plans import iter_leaves
+from flask_filter.relationships import RelationshipPath
+
+
+ExplainReport = namedtuple("ExplainReport",
+                           ["filters", "sql", "plan", "full_scans"])
+IndexSuggestion = namedtuple("IndexSuggestion",
+                             ["table", "column", "fields", "scanned", "ddl"])
+Advice = namedtuple("Advice", ["reports", "suggestions"])
+
+# `SCAN dog` / `SCAN TABLE dog` without an index, on SQLite
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?!.*USING)")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+class Explain(Executable, ClauseElement):
+    """ `EXPLAIN` for a select statement, rendered per dialect """
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _explain(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, "sqlite")
+def _explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+
+def _plan_lines(rows, dialect):
+    if dialect == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def _full_scans(lines, dialect, tables):
+    """ tables scanned without an index, with aliases such as `dog_1`
+    traced back to their table
+    """
+    pattern = _SQLITE_SCAN if dialect == "sqlite" else _POSTGRES_SCAN
+    scanned = []
+    for line in lines:
+        match = pattern.search(line.strip())
+        if not match:
+            continue
+        name = match.group(1)
+        if name not in tables:
+            name = re.sub(r"_\d+$", "", name)
+        if name in tables and name not in scanned:
+            scanned.append(name)
+    return scanned
+
+
+def explain(filtr, DbModel, filters, ModelSchema=None) -> ExplainReport:
+    """ the database's plan for `filtr.search(DbModel, filters)`. Filters
+    that contradict each other never reach the database and report no plan.
+    """
+    prepared = filtr._prepare(filters, DbModel, ModelSchema)
+    if prepared is None:
+        return ExplainReport(filters, None, [], [])
+    query = filtr._search_query(DbModel, prepared, ModelSchema)
+    session = query.session
+    dialect = session.get_bind(mapper=inspect(DbModel)).dialect.name
+    result = session.execute(Explain(query.statement), query._params)
+    # read the DBAPI cursor directly: the result would otherwise apply the
+    # select's column types to the plan rows
+    lines = _plan_lines(result.cursor.fetchall(), dialect)
+    result.close()
+    tables = set(DbModel.metadata.tables)
+    return ExplainReport(filters, str(query.statement), lines,
+                         _full_scans(lines, dialect, tables))
+
+
+def _indexed_columns(connection, table):
+    """ columns leading an index, unique constraint or primary key """
+    inspector = inspect(connection)
+    leading = set(inspector.get_pk_constraint(table)["constrained_columns"]
+                  [:1])
+    for index in inspector.get_indexes(table):
+        leading.update(index["column_names"][:1])
+    for constraint in inspector.get_unique_constraints(table):
+        leading.update(constraint["column_names"][:1])
+    return leading
+
+
+def _filtered_columns(DbModel, schema, payload_filters):
+    """ (table, column) -> JSON fields, for the columns searches compare:
+    every column field of the schema, plus the join and target columns of
+    the relationship filters in the payloads.
+    """
+    columns = {}
+    index = field_index(DbModel, schema)
+
+    def add(column, field):
+        fields = columns.setdefault((column.table.name, column.name), [])
+        if field not in fields:
+            fields.append(field)
+
+    for info in index.fields.values():
+        if info.relationship is None:
+            add(info.column.property.columns[0], info.name)
+    for filters in payload_filters:
+        for f in iter_leaves(filters):
+            info = index.resolve(f.field)
+            if info.relationship is None:
+                continue
+            field = ".".join((f.field,) + f.path)
+            path = RelationshipPath(DbModel, info.column, f.path)
+            class_ = DbModel
+            for key in path.keys:
+                prop = getattr(class_, key).property
+                for _, remote in prop.local_remote_pairs:
+                    if not remote.primary_key:
+                        add(remote, field)
+                class_ = prop.mapper.class_
+            target = getattr(path.target, path.column)
+            add(target.property.columns[0], field)
+    return columns
+
+
+def advise(filtr, DbModel, payloads, ModelSchema=None) -> Advice:
+    """ explain every payload and suggest an index for each filterable
+    column without one, listing first the columns of tables that some
+    payload scanned in full.
+    """
+    schema = ModelSchema or filtr._lookup_schema(DbModel)
+    reports = [explain(filtr, DbModel, p, schema) for p in payloads]
+    loaded = [filtr._prepare(p, DbModel, schema) or [] for p in payloads]
+    scanned = {t for r in reports for t in r.full_scans}
+    connection = DbModel.query.session.connection(mapper=inspect(DbModel))
+    indexed = {}
+    suggestions = []
+    for (table, column), fields in _filtered_columns(
+            DbModel, schema, loaded).items():
+        if table not in indexed:
+            indexed[table] = _indexed_columns(connection, table)
+        if column in indexed[table]:
+            continue
+        ddl = f"CREATE INDEX ix_{table}_{column} ON {table} ({column})"
+        suggestions.append(IndexSuggestion(table, column, fields,
+                                           table in scanned, ddl))
+    suggestions.sort(key=lambda s: not s.scanned)
+    return Advice(reports, suggestions)
+
+
+def format_advice(advice) -> str:
+    lines = []
+    for report in advice.reports:
+        if report.sql is None:
+            status = "contradictory, never queried"
+        elif report.full_scans:
+            status = "FULL SCAN of " + ", ".join(report.full_scans)
+        else:
+            status = "ok"
+        lines.append(f"{report.filters}: {status}")
+        lines.extend(f"    {line}" for line in report.plan)
+    if advice.suggestions:
+        lines.append("suggested indexes:")
+        lines.extend(f"    {s.ddl};  -- {', '.join(s.fields)}"
+                     for s in advice.suggestions)
+    return "\n".join(lines)
@@ -0,0 +1,138 @@
+""" facet counts: for each of several fields, how many objects matching a
+search fall on each of its values, in one statement::
+
+    filtr.facets(Dog, filters, ["toys.name",
+                                {"field": "weight", "buckets": [25, 50]}])
+    {"toys.name": [{"value": "Ball", "count": 3}, ...],
+     "weight": [{"value": "*-25", "count": 1}, {"value": "25-50", ...}, ...]}
+
+Every facet ignores the filters on its own field, so a UI can show the
+counts of the values it could switch to. Each facet is a GROUP BY query
+over its share of the filters; the facets are combined with UNION ALL,
+their values cast to strings to share a column. Numeric `buckets` group
+values into the ranges between consecutive edges: `[25, 50]` makes
+"*-25", "25-50" and "50-*" (each range including its lower edge).
+"""
+from collections import namedtuple
+
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import String, and_, case, cast, distinct, func, literal
+from sqlalchemy import inspect, union_all
+from sqlalchemy.orm import aliased
+
+from flask_filter.batch import _bind_unique
+from flask_filter.fields import field_index
+from flask_filter.filters.filters import Filter
+from flask_filter.relationships import RelationshipPath
+
+
+Facet = namedtuple("Facet", ["field", "buckets"])
+
+
+def facet_specs(facets):
+    """ `Facet` tuples from field names or `{"field", "buckets"}` dicts """
+    specs = []
+    for facet in facets:
+        if isinstance(facet, str):
+            facet = {"field": facet}
+        buckets = facet.get("buckets")
+        if buckets is not None:
+            buckets = sorted(buckets)
+            if not buckets:
+                raise ValidationError(f"facet '{facet['field']}' needs at "
+                                      f"least one bucket edge")
+        specs.append(Facet(facet["field"], buckets))
+    return specs
+
+
+def without_field(filters, field):
+    """ the top-level filters that do not filter on `field` """
+    return [f for f in filters if not isinstance(f, Filter)
+            or ".".join((f.field,) + f.path) != field]
+
+
+def bucket_labels(edges):
+    bounds = ["*"] + [str(e) for e in edges] + ["*"]
+    return [f"{low}-{high}" for low, high in zip(bounds, bounds[1:])]
+
+
+def _bucket(column, edges):
+    labels = bucket_labels(edges)
+    whens = [(column < edges[0], labels[0])]
+    for (low, high), label in zip(zip(edges, edges[1:]), labels[1:]):
+        whens.append((and_(column >= low, column < high), label))
+    whens.append((column >= edges[-1], labels[-1]))
+    return case(whens, else_=None)
+
+
+def _target(query, class_, schema, field):
+    """ the query joined to the column behind a (possibly dotted) field,
+    and that column
+    """
+    name, *path = field.split(".")
+    column = field_index(class_, schema).resolve(name).column
+    if not hasattr(column.property, "mapper"):
+        if path:
+            raise ValidationError(f"'{field}' is not a valid field")
+        return query, column
+    rpath = RelationshipPath(class_, column, path)
+    entity = class_
+    for key in rpath.keys:
+        attr = getattr(entity, key)
+        entity = aliased(attr.property.mapper.class_)
+        query = query.join(attr.of_type(entity))
+    return query, getattr(entity, rpath.column)
+
+
+def facet_statement(query, class_, schema, facet):
+    """ `SELECT <field>, <value>, count(DISTINCT pk)` grouped by value over
+    a filtered query, with its plan parameters made unique
+    """
+    pk = inspect(class_).primary_key[0]
+    query, column = _target(query.order_by(None), class_, schema, facet.field)
+    value = column if facet.buckets is None \
+        else _bucket(column, facet.buckets)
+    query = query.with_entities(
+        literal(facet.field).label("facet"),
+        cast(value, String).label("value"),
+        func.count(distinct(pk)).label("count"),
+    ).group_by(value)
+    return _bind_unique(query.statement, query._params)
+
+
+def _parse(index, field, value):
+    name, *path = field.split(".")
+    parse = index.parser(name, tuple(path))
+    if parse is None or value is None:
+        return value
+    try:
+        return parse(value)
+    except ValidationError:
+        return value
+
+
+def run_facets(session, class_, schema, facets, statements):
+    """ run the facet statements as one UNION ALL and collect the counts per
+    facet: buckets in range order, other values by descending count
+    """
+    results = {f.field: [] for f in facets}
+    if not statements:
+        return results
+    statement = statements[0] if len(statements) == 1 \
+        else union_all(*statements)
+    index = field_index(class_, schema)
+    specs = {f.field: f for f in facets}
+    for field, value, count in session.execute(statement):
+        if specs[field].buckets is None:
+            value = _parse(index, field, value)
+        results[field].append({"value": value, "count": count})
+    for facet in facets:
+        counts = results[facet.field]
+        if facet.buckets is not None:
+            order = {label: i for i, label in
+                     enumerate(bucket_labels(facet.buckets))}
+            counts.sort(key=lambda c: order.get(c["value"], len(order)))
+        else:
+            counts.sort(key=lambda c: (-c["count"], c["value"] is None,
+                                       c["value"]))
+    return results
@@ -0,0 +1,115 @@
+from collections import namedtuple
+from types import MappingProxyType
+
+from marshmallow.exceptions import ValidationError
+from sqlalchemy.orm import ColumnProperty, RelationshipProperty
+
+from flask_filter.coercion import column_parser
+from flask_filter.relationships import RelationshipPath
+
+
+FieldInfo = namedtuple(
+    "FieldInfo",
+    ["name", "attribute", "column", "type", "relationship", "parse"]
+)
+_INDEXES = {}
+
+
+class FieldIndex(object):
+    """ frozen map from the JSON field names of a schema to the mapped
+    attributes of a model, following `attribute` remaps such as
+    `dateOfBirth -> dob`. Fields that are not mapped on the model (plain
+    python properties, computed fields) are left out, so they are rejected
+    as soon as a filter references them. Each column field carries the
+    parser for the values it is compared to.
+    """
+
+    def __init__(self, class_, schema):
+        self.class_ = class_
+        self.schema = schema
+        fields = {}
+        for name, field in schema._declared_fields.items():
+            attribute = field.attribute or name
+            column = getattr(class_, attribute, None)
+            if not hasattr(column, "__clause_element__"):
+                continue
+            prop = getattr(column, "property", None)
+            relationship = prop if isinstance(prop, RelationshipProperty) \
+                else None
+            type_ = prop.columns[0].type \
+                if isinstance(prop, ColumnProperty) else None
+            parse = column_parser(type_, field) if relationship is None \
+                else None
+            fields[name] = FieldInfo(name, attribute, column, type_,
+                                     relationship, parse)
+        self.fields = MappingProxyType(fields)
+        self._parsers = {}
+
+    def __repr__(self):
+        return f"<FieldIndex(model={self.class_.__name__}, " \
+               f"fields={list(self.fields)})>"
+
+    def __contains__(self, field):
+        return field in self.fields
+
+    def resolve(self, field) -> FieldInfo:
+        info = self.fields.get(field)
+        if info is None:
+            raise ValidationError(f"'{field}' is not a valid field")
+        return info
+
+    def parser(self, field, path=()):
+        """ the value parser for a filter on `field` (and, for relationship
+        fields, the dotted `path` beyond it), or None if the field is
+        unknown. A `path` the relationship does not lead along raises
+        `ValidationError`.
+        """
+        info = self.fields.get(field)
+        if info is None:
+            return None
+        if info.relationship is None:
+            return info.parse
+        key = (field, path)
+        if key not in self._parsers:
+            target = RelationshipPath(self.class_, info.column, path)
+            prop = getattr(target.target, target.column).property
+            self._parsers[key] = column_parser(prop.columns[0].type) \
+                if isinstance(prop, ColumnProperty) else None
+        return self._parsers[key]
+
+
+def field_index(class_, schema) -> FieldIndex:
+    """ the `FieldIndex` for (model, schema), built on first use """
+    if not isinstance(schema, type):
+        schema = type(schema)
+    key = (class_, schema)
+    index = _INDEXES.get(key)
+    if index is None:
+        index = _INDEXES[key] = FieldIndex(class_, schema)
+    return index
+
+
+def get_db_field(schema, field):
+    """ convert a JSON field name to the name of the model attribute it
+    is loaded into, following the schema's `attribute` remaps.
+
+    :param schema: optional Marshmallow schema to map field -> column
+    :param field: JSON field name
+    :return: string attribute name
+    """
+    if not schema:
+        return field
+    attr = schema._declared_fields.get(field)
+    if not attr:
+        raise ValidationError(f"'{field}' is not a valid field")
+    return attr.attribute or field
+
+
+def get_column(class_, schema, field):
+    """ resolve a JSON field name to the mapped attribute on `class_` """
+    if schema:
+        return field_index(class_, schema).resolve(field).column
+    column = getattr(class_, field, None)
+    if column is None:
+        raise ValidationError(f"'{field}' is not a valid field")
+    return column
@@ -7,8 +7,16 @@ from .filters import (
     InFilter,
     NotEqualsFilter,
     LikeFilter,
+    MatchFilter,
     ContainsFilter
 )
+from .groups import (
+    FilterGroup,
+    AndFilter,
+    OrFilter,
+    NotFilter,
+    GROUPS
+)
 
 
 FILTERS = [
@@ -20,5 +28,6 @@ FILTERS = [
     InFilter,
     NotEqualsFilter,
     LikeFilter,
+    MatchFilter,
     ContainsFilter
 ]
@@ -3,23 +3,58 @@ import datetime
 import logging
 import re
 
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
 from typing import Any
 from numbers import Number
 from marshmallow.exceptions import ValidationError
+from sqlalchemy import bindparam
+
+from flask_filter.coercion import bound_parser
+from flask_filter.fields import get_column, get_db_field
+from flask_filter.fts import Match, words
+from flask_filter.relationships import RelationshipPath, is_relationship
 
 
 logger = logging.getLogger(__name__)
 RE_DATE = "^([0-9]{4})-([0-9]|1[0-2]|0[1-9])-([1-9]|0[1-9]|1[0-9]|2[1-9]|3[0-1])$"
+_DATE = re.compile(RE_DATE)
 
 
 class Filter(abc.ABC):
+    """ a `{field, op, value}` filter. Filters are immutable once built and
+    hash once, so they can serve as cache keys.
+    """
+    __slots__ = ("field", "path", "nested", "value", "_hash")
     OP = None
 
-    def __init__(self, field: str, value: Any):
+    def __init__(self, field: str, value: Any, parse=None):
+        """ `parse`, when the column the field maps to is known, turns the
+        JSON value into the column's python type (see `FieldIndex.parser`);
+        without it, strings that look like dates become dates.
+        """
         self.nested = None
         self.set_field(field)
-        self.value = self._date_or_value(value)
+        if parse is None:
+            self.value = self._date_or_value(value)
+        else:
+            self.value = self._parse(value, parse)
         self.is_valid()
+        try:
+            self._hash = hash((".".join((self.field,) + self.path), self.OP,
+                               self.value))
+        except TypeError:
+            self._hash = None
+
+    def __setattr__(self, name, value):
+        if hasattr(self, "_hash"):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
 
     def __repr__(self):
         return f"<{type(self).__name__}(field='{self.field}', op='{self.OP}'" \
@@ -29,22 +64,57 @@ class Filter(abc.ABC):
         return hash(self) == hash(other)
 
     def __hash__(self):
-        return hash((self.field, self.OP, self.value))
+        if self._hash is None:
+            raise TypeError(f"unhashable value in {self}")
+        return self._hash
 
     def set_field(self, field):
         f = field.split(".")
         self.field = f[0]
-        if len(f) == 2:
-            self.nested = f[1]
-        elif len(f) > 2:
-            logger.warning(
-                f"you supplied nested fields {f}. Only one level of nesting "
-                f"is currently supported. ignoring fields {f[2:]}."
-            )
+        self.path = tuple(f[1:])
+        if self.path:
+            self.nested = self.path[0]
+
+    @property
+    def shape(self):
+        """ hashable description of this filter without its value. Filters
+        sharing a shape compile to the same parameterized SQL expression.
+        """
+        return self.field, self.path, self.OP
 
-    @abc.abstractmethod
-    def apply(self, query, class_, schema):
-        raise NotImplementedError('apply is an abstract method')
+    def apply(self, query, class_, schema=None):
+        return query.filter(self.clause(class_, schema, self.bind_value()))
+
+    def clause(self, class_, schema, value):
+        """ the criterion for this filter against `class_`, walking any
+        relationships named by a dotted field with correlated EXISTS.
+        """
+        column = self._get_column(class_, schema)
+        if is_relationship(column):
+            path = RelationshipPath(class_, column, self.path)
+            return path.exists(lambda c: self.criterion(c, value))
+        return self.criterion(column, value)
+
+    def criterion(self, column, value):
+        """ build the SQL expression comparing `column` to `value`, where
+        `value` is either a literal or a bind parameter.
+        """
+        raise NotImplementedError('criterion is not implemented')
+
+    def predicate(self):
+        """ python callable testing a single attribute value the way
+        `criterion` would in SQL, for filtering in-memory collections.
+        """
+        raise NotImplementedError('predicate is not implemented')
+
+    def parameter(self, key):
+        """ bind parameter standing in for this filter's value in a
+        compiled plan, or None if the value must be rendered inline.
+        """
+        return bindparam(key)
+
+    def bind_value(self):
+        return self.value
 
     @abc.abstractmethod
     def is_valid(self):
@@ -56,22 +126,29 @@ class Filter(abc.ABC):
         :param schema: optional Marshmallow schema to map field -> column
         :return: string field name
         """
-        if not schema:
-            return self.field
-        attr = schema._declared_fields.get(self.field)
-        if not attr:
-            raise ValidationError(f"'{attr}' is not a valid field")
-        return attr.attribute or self.field
+        return get_db_field(schema, self.field)
+
+    def _get_column(self, class_, schema):
+        return get_column(class_, schema, self.field)
+
+    def _parse(self, value, parse):
+        return parse(value)
 
     def _date_or_value(self, value):
-        if not isinstance(value, str):
+        # dates are 8 to 10 characters long and start with the year
+        if not isinstance(value, str) or not 8 <= len(value) <= 10 \
+                or not value[:1].isdigit():
             return value
-        if re.match(RE_DATE, value):
+        if _DATE.match(value):
             return datetime.datetime.strptime(value, "%Y-%m-%d").date()
         return value
 
 
 class RelativeComparator(Filter):
+    __slots__ = ()
+
+    def _parse(self, value, parse):
+        return bound_parser(parse)(value)
 
     def is_valid(self):
         try:
@@ -82,63 +159,131 @@ class RelativeComparator(Filter):
 
 
 class LTFilter(RelativeComparator):
+    __slots__ = ()
     OP = "<"
 
-    def apply(self, query, class_, schema=None):
-        field = self._get_db_field(schema)
-        return query.filter(getattr(class_, field) < self.value)
+    def criterion(self, column, value):
+        return column < value
+
+    def predicate(self):
+        value = self.value
+        return lambda x: x is not None and x < value
 
 
 class LTEFilter(RelativeComparator):
+    __slots__ = ()
     OP = "<="
 
-    def apply(self, query, class_, schema=None):
-        field = self._get_db_field(schema)
-        return query.filter(getattr(class_, field) <= self.value)
+    def criterion(self, column, value):
+        return column <= value
+
+    def predicate(self):
+        value = self.value
+        return lambda x: x is not None and x <= value
 
 
 class GTFilter(RelativeComparator):
+    __slots__ = ()
     OP = ">"
 
-    def apply(self, query, class_, schema=None):
-        field = self._get_db_field(schema)
-        return query.filter(getattr(class_, field) > self.value)
+    def criterion(self, column, value):
+        return column > value
+
+    def predicate(self):
+        value = self.value
+        return lambda x: x is not None and x > value
 
 
 class GTEFilter(RelativeComparator):
+    __slots__ = ()
     OP = ">="
 
-    def apply(self, query, class_, schema=None):
-        field = self._get_db_field(schema)
-        return query.filter(getattr(class_, field) >= self.value)
+    def criterion(self, column, value):
+        return column >= value
 
+    def predicate(self):
+        value = self.value
+        return lambda x: x is not None and x >= value
 
-class EqualsFilter(Filter):
-    OP = "="
 
-    def apply(self, query, class_, schema=None):
-        field = self._get_db_field(schema)
-        return query.filter(getattr(class_, field) == self.value)
+class NullableComparator(Filter):
+    __slots__ = ("_parsed",)
+
+    @property
+    def shape(self):
+        return super().shape + (self.value is None,)
+
+    def parameter(self, key):
+        # NULL comparisons must render inline to become IS / IS NOT NULL
+        return None if self.value is None else super().parameter(key)
+
+    def _parse(self, value, parse):
+        self._parsed = True
+        return super()._parse(value, parse)
 
     def is_valid(self):
-        allowed = (str, int, datetime.date, None.__class__)
+        if getattr(self, "_parsed", False):
+            # anything the column parsers of `flask_filter.coercion` return
+            allowed = (str, Number, datetime.date, datetime.time,
+                       None.__class__, UUID, Enum)
+        else:
+            allowed = (str, int, datetime.date, None.__class__, Decimal,
+                       UUID, Enum)
         try:
             assert isinstance(self.value, allowed)
         except AssertionError:
             raise ValidationError(f"{self} requires a string or int value")
 
 
+class EqualsFilter(NullableComparator):
+    __slots__ = ()
+    OP = "="
+
+    def criterion(self, column, value):
+        return column == value
+
+    def predicate(self):
+        value = self.value
+        if value is None:
+            return lambda x: x is None
+        return lambda x: x == value
+
+
 class InFilter(Filter):
+    __slots__ = ()
     OP = "in"
 
-    def __init__(self, field: str, value: Any):
+    def __init__(self, field: str, value: Any, parse=None):
         if isinstance(value, str):
-            value = [value]
-        super().__init__(field, value)
+            value = (value,)
+        super().__init__(field, value, parse)
 
-    def apply(self, query, class_, schema=None):
-        field = self._get_db_field(schema)
-        return query.filter(getattr(class_, field).in_(list(self.value)))
+    def criterion(self, column, value):
+        return column.in_(value)
+
+    def predicate(self):
+        try:
+            values = frozenset(self.value)
+        except TypeError:
+            values = list(self.value)
+        return lambda x: x in values
+
+    def parameter(self, key):
+        return bindparam(key, expanding=True)
+
+    def _date_or_value(self, value):
+        # stored as a tuple: hashable, and bound without copying
+        try:
+            return tuple(value)
+        except TypeError:
+            return value
+
+    def _parse(self, value, parse):
+        try:
+            return tuple([parse(v) for v in value])
+        except TypeError:
+            raise ValidationError(f"{self.OP} filter on '{self.field}' "
+                                  f"must be an iterable")
 
     def is_valid(self):
         try:
@@ -147,27 +292,36 @@ class InFilter(Filter):
             raise ValidationError(f"{self} must be an iterable")
 
 
-class NotEqualsFilter(Filter):
+class NotEqualsFilter(NullableComparator):
+    __slots__ = ()
     OP = "!="
 
-    def apply(self, query, class_, schema=None):
-        field = self._get_db_field(schema)
-        return query.filter(getattr(class_, field) != self.value)
+    def criterion(self, column, value):
+        return column != value
 
-    def is_valid(self):
-        allowed = (str, int, datetime.date, None.__class__)
-        try:
-            assert isinstance(self.value, allowed)
-        except AssertionError:
-            raise ValidationError(f"{self} requires a string or int value")
+    def predicate(self):
+        value = self.value
+        if value is None:
+            return lambda x: x is not None
+        return lambda x: x is not None and x != value
 
 
 class LikeFilter(Filter):
+    __slots__ = ()
     OP = "like"
 
-    def apply(self, query, class_, schema=None):
-        field = self._get_db_field(schema)
-        return query.filter(getattr(class_, field).like(self.value))
+    def _parse(self, value, parse):
+        return value
+
+    def criterion(self, column, value):
+        return column.like(value)
+
+    def predicate(self):
+        pattern = re.compile("".join(
+            ".*" if c == "%" else "." if c == "_" else re.escape(c)
+            for c in self.value
+        ), re.DOTALL)
+        return lambda x: x is not None and pattern.fullmatch(x) is not None
 
     def is_valid(self):
         try:
@@ -176,14 +330,54 @@ class LikeFilter(Filter):
             raise ValidationError(f"{self} requires a string with a wildcard")
 
 
+class MatchFilter(Filter):
+    """ full-text search: matches objects whose field contains every word
+    of the value. Uses the model's full-text index where one is registered
+    (see `flask_filter.fts`) and a case-insensitive LIKE otherwise.
+    """
+    __slots__ = ()
+    OP = "match"
+
+    def _parse(self, value, parse):
+        return value
+
+    def criterion(self, column, value):
+        return Match(column, value)
+
+    def predicate(self):
+        terms = {w.lower() for w in words(self.value)}
+        return lambda x: x is not None and \
+            terms <= {w.lower() for w in words(x)}
+
+    def is_valid(self):
+        try:
+            assert isinstance(self.value, str) and words(self.value)
+        except AssertionError:
+            raise ValidationError(f"{self} requires a string with at least "
+                                  f"one word")
+
+
 class ContainsFilter(Filter):
+    """ matches objects with at least one related object (reached through
+    the relationships named by the field) whose column equals the value.
+    `toys` compares against the primary key of each toy, `toys.name`
+    against its name.
+    """
+    __slots__ = ()
     OP = "contains"
 
-    def apply(self, query, class_, schema=None):
-        subfield = self.nested or "id"
-        q = {subfield: self.value}
-        field = self._get_db_field(schema)
-        return query.filter(getattr(class_, field).any(**q))
+    def criterion(self, column, value):
+        return column == value
+
+    def predicate(self):
+        value = self.value
+
+        def contains(x):
+            if x == value:
+                return True
+            key = x.get("id") if isinstance(x, dict) else getattr(x, "id", None)
+            return key is not None and key == value
+        return contains
 
     def is_valid(self):
         pass
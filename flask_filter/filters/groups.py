@@ -0,0 +1,110 @@
+import abc
+
+from sqlalchemy import and_, false, not_, or_, true
+
+
+class FilterGroup(abc.ABC):
+    """ a boolean node (`{"and": [...]}`, `{"or": [...]}`, `{"not": ...}`)
+    combining filters and other groups into a single SQL expression.
+    """
+    KEY = None
+
+    def __init__(self, filters):
+        self.filters = self._flatten(filters)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}({self.filters})>"
+
+    def __eq__(self, other):
+        return hash(self) == hash(other)
+
+    def __hash__(self):
+        return hash((self.KEY, tuple(hash(f) for f in self.filters)))
+
+    @property
+    def shape(self):
+        return self.KEY, tuple(f.shape for f in self.filters)
+
+    def _flatten(self, filters):
+        """ splice in children of the same kind and drop repeated leaves """
+        flat, seen = [], set()
+        for f in filters:
+            children = f.filters if type(f) is type(self) else [f]
+            for child in children:
+                try:
+                    key = hash(child)
+                except TypeError:
+                    flat.append(child)
+                    continue
+                if key not in seen:
+                    seen.add(key)
+                    flat.append(child)
+        return flat
+
+    def leaves(self):
+        for f in self.filters:
+            if isinstance(f, FilterGroup):
+                yield from f.leaves()
+            else:
+                yield f
+
+    def apply(self, query, class_, schema=None):
+        return query.filter(self.clause(class_, schema))
+
+    def clause(self, class_, schema, value=None):
+        return self.combine(
+            [f.clause(class_, schema, f.bind_value()) for f in self.filters]
+        )
+
+    def bind_value(self):
+        return None
+
+    @abc.abstractmethod
+    def combine(self, clauses):
+        raise NotImplementedError('combine is an abstract method')
+
+    @abc.abstractmethod
+    def combine_predicates(self, predicates):
+        raise NotImplementedError('combine_predicates is an abstract method')
+
+
+class AndFilter(FilterGroup):
+    KEY = "and"
+
+    def combine(self, clauses):
+        return and_(*clauses) if clauses else true()
+
+    def combine_predicates(self, predicates):
+        return lambda obj: all(p(obj) for p in predicates)
+
+
+class OrFilter(FilterGroup):
+    KEY = "or"
+
+    def combine(self, clauses):
+        return or_(*clauses) if clauses else false()
+
+    def combine_predicates(self, predicates):
+        return lambda obj: any(p(obj) for p in predicates)
+
+
+class NotFilter(FilterGroup):
+    KEY = "not"
+
+    def __init__(self, filter):
+        if isinstance(filter, list):
+            filter = AndFilter(filter)
+        super().__init__([filter])
+
+    def _flatten(self, filters):
+        return list(filters)
+
+    def combine(self, clauses):
+        return not_(clauses[0])
+
+    def combine_predicates(self, predicates):
+        predicate = predicates[0]
+        return lambda obj: not predicate(obj)
+
+
+GROUPS = [AndFilter, OrFilter, NotFilter]
@@ -0,0 +1,293 @@
+""" full-text search for the `match` operator. Fields are opted in per
+model when registering it::
+
+    filtr.register_model(Dog, DogSchema, fts=["name"])
+    create_fts(db.session.connection(), Dog)  # once, e.g. in a migration
+    filtr.search(Dog, [{"field": "name", "op": "match", "value": "rex"}],
+                 order_by="relevance")
+
+On SQLite a `match` filter then becomes a lookup in an FTS5 table kept in
+sync with the model's table by triggers (`dog.id IN (SELECT rowid FROM
+dog_fts WHERE dog_fts.name MATCH :q)`); on PostgreSQL it is
+`to_tsvector(<language>, name) @@ plainto_tsquery(<language>, :q)`, which a
+GIN expression index answers. Fields without full-text configuration, and
+other databases, fall back to a case-insensitive `LIKE '%term%'`. Full-text
+matches need every word of the value, in any order; the fallback needs them
+in order.
+"""
+import re
+from collections import namedtuple
+
+from sqlalchemy import (
+    Boolean, Float, and_, func, inspect, literal, literal_column, text,
+    type_coerce
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import column as sql_column, select, table as sql_table
+from sqlalchemy.sql.elements import ClauseElement, ColumnElement, _clone
+from sqlalchemy.types import String, TypeDecorator
+
+from flask_filter.fields import field_index, get_column
+from flask_filter.relationships import is_relationship
+
+
+RELEVANCE = "relevance"
+FullText = namedtuple("FullText", ["table", "language"])
+FullText.__new__.__defaults__ = (None, "english")
+_CONFIGS = {}
+_WORD = re.compile(r"\w+", re.UNICODE)
+_LANGUAGE = re.compile(r"^\w+$")
+
+
+def fts_table_name(class_):
+    return f"{inspect(class_).local_table.name}_fts"
+
+
+def register_fts(class_, schema, fts):
+    """ record the full-text configuration of the JSON fields in `fts`, a
+    list of field names or a dict of field name -> `FullText`
+    """
+    if not isinstance(fts, dict):
+        fts = dict.fromkeys(fts)
+    index = field_index(class_, schema)
+    for name, config in fts.items():
+        info = index.resolve(name)
+        if info.relationship is not None:
+            raise ValueError(f"'{name}' is a relationship; register "
+                             f"full-text fields on the related model")
+        config = config or FullText()
+        if not _LANGUAGE.match(config.language):
+            raise ValueError(f"invalid text search language "
+                             f"'{config.language}'")
+        if config.table is None:
+            config = config._replace(table=fts_table_name(class_))
+        _CONFIGS[(class_, info.column.key)] = config
+
+
+def unregister_fts(class_):
+    for key in [k for k in _CONFIGS if k[0] is class_]:
+        del _CONFIGS[key]
+
+
+def fts_config(class_, key):
+    return _CONFIGS.get((class_, key))
+
+
+def fts_columns(class_):
+    """ (column name, `FullText`) of the full-text fields of `class_` """
+    mapper = inspect(class_)
+    return [(mapper.get_property(key).columns[0].name, config)
+            for (cls, key), config in _CONFIGS.items() if cls is class_]
+
+
+def words(value):
+    return _WORD.findall(value or "")
+
+
+class FTSQuery(TypeDecorator):
+    """ a search string, quoted word by word for FTS5 on SQLite so that
+    user input can never be read as FTS5 query syntax
+    """
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name == "sqlite":
+            return " ".join(f'"{w}"' for w in words(value)) or '""'
+        return value
+
+
+class LikeWords(TypeDecorator):
+    """ a search string as the LIKE pattern of its lower cased words, in
+    order: "Big dog" -> "%big%dog%"
+    """
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        escaped = (re.sub(r"([/%_])", r"/\1", w.lower())
+                   for w in words(value))
+        return "%" + "%".join(escaped) + "%"
+
+
+def _target(column):
+    """ the entity (class or alias) a column attribute belongs to, with its
+    mapper
+    """
+    parent = column.parent
+    entity = getattr(parent, "entity", None) or parent.class_
+    return entity, parent.mapper
+
+
+class _FullTextElement(ColumnElement):
+    """ a full-text expression over `column`, rendered per dialect. The
+    column, the primary key of its entity and the value are children of
+    the element, so aliasing and `params()` reach them.
+    """
+    inherit_cache = False
+
+    def __init__(self, column, value):
+        entity, mapper = _target(column)
+        self.class_ = mapper.class_
+        self.key = column.key
+        self.column_name = mapper.get_property(column.key).columns[0].name
+        pk = mapper.get_property_by_column(mapper.primary_key[0]).key
+        self.column = column.__clause_element__()
+        self.pk = getattr(entity, pk).__clause_element__()
+        self.value = value if isinstance(value, ClauseElement) \
+            else literal(value)
+
+    @property
+    def config(self):
+        # looked up when rendered: compiled plans outlive registration
+        return fts_config(self.class_, self.key)
+
+    def get_children(self, **kw):
+        return self.column, self.pk, self.value
+
+    def _copy_internals(self, clone=_clone, **kw):
+        self.column = clone(self.column, **kw)
+        self.pk = clone(self.pk, **kw)
+        self.value = clone(self.value, **kw)
+
+
+class Match(_FullTextElement):
+    """ full-text `match` of `column` against the words of `value` """
+    inherit_cache = False
+    type = Boolean()
+    _is_implicitly_boolean = True
+
+
+class Relevance(_FullTextElement):
+    """ how well `column` matches `value`; higher is better """
+    inherit_cache = False
+    type = Float()
+
+
+def _like(element):
+    """ the fallback: the words of the value, in order and in any case """
+    pattern = type_coerce(element.value, LikeWords())
+    return func.lower(element.column).like(pattern, escape="/")
+
+
+def _fts5(element):
+    """ `(table, MATCH clause)` for the FTS5 table of `element.config` """
+    name = element.config.table
+    fts = sql_table(name, sql_column("rowid"), sql_column(element.column_name))
+    query = type_coerce(element.value, FTSQuery())
+    return fts, fts.c[element.column_name].op("MATCH")(query)
+
+
+def _tsvector(element):
+    language = literal_column(f"'{element.config.language}'::regconfig")
+    query = type_coerce(element.value, FTSQuery())
+    return (func.to_tsvector(language, element.column),
+            func.plainto_tsquery(language, query))
+
+
+@compiles(Match)
+def _compile_match(element, compiler, **kw):
+    return compiler.process(_like(element), **kw)
+
+
+@compiles(Match, "sqlite")
+def _compile_match_sqlite(element, compiler, **kw):
+    if element.config is None:
+        return compiler.process(_like(element), **kw)
+    fts, match = _fts5(element)
+    return compiler.process(element.pk.in_(select([fts.c.rowid]).where(match)), **kw)
+
+
+@compiles(Match, "postgresql")
+def _compile_match_postgresql(element, compiler, **kw):
+    if element.config is None:
+        return compiler.process(_like(element), **kw)
+    vector, query = _tsvector(element)
+    return compiler.process(vector.op("@@")(query), **kw)
+
+
+@compiles(Relevance)
+def _compile_relevance(element, compiler, **kw):
+    return compiler.process(literal(0), **kw)
+
+
+@compiles(Relevance, "sqlite")
+def _compile_relevance_sqlite(element, compiler, **kw):
+    if element.config is None:
+        return compiler.process(literal(0), **kw)
+    fts, match = _fts5(element)
+    # bm25 is lower for better matches
+    rank = select([-func.bm25(literal_column(fts.name))]).where(
+        and_(fts.c.rowid == element.pk, match))
+    rank = getattr(rank, "scalar_subquery", rank.as_scalar)()
+    return compiler.process(func.coalesce(rank, 0), **kw)
+
+
+@compiles(Relevance, "postgresql")
+def _compile_relevance_postgresql(element, compiler, **kw):
+    if element.config is None:
+        return compiler.process(literal(0), **kw)
+    return compiler.process(func.ts_rank(*_tsvector(element)), **kw)
+
+
+def relevance(class_, schema, filters):
+    """ ordering by how well rows match the top-level `match` filters of
+    `filters`, best first, or None if there are none
+    """
+    ranks = []
+    for f in filters:
+        if getattr(f, "OP", None) != "match":
+            continue
+        column = get_column(class_, schema, f.field)
+        if not is_relationship(column):
+            ranks.append(Relevance(column, f.value))
+    if not ranks:
+        return None
+    return sum(ranks[1:], ranks[0]).desc()
+
+
+def fts_ddl(class_, dialect):
+    """ statements creating the full-text index of `class_` on `dialect`:
+    an external content FTS5 table and the triggers keeping it in sync on
+    SQLite, GIN expression indexes on PostgreSQL
+    """
+    mapper = inspect(class_)
+    table = mapper.local_table.name
+    pk = mapper.primary_key[0].name
+    statements = []
+    if dialect == "sqlite":
+        tables = {}
+        for name, config in fts_columns(class_):
+            tables.setdefault(config.table, []).append(name)
+        for fts, columns in tables.items():
+            cols = ", ".join(columns)
+            new = ", ".join(f"new.{c}" for c in columns)
+            old = ", ".join(f"old.{c}" for c in columns)
+            delete = f"INSERT INTO {fts} ({fts}, rowid, {cols}) " \
+                     f"VALUES ('delete', old.{pk}, {old});"
+            insert = f"INSERT INTO {fts} (rowid, {cols}) " \
+                     f"VALUES (new.{pk}, {new});"
+            statements += [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{cols}, content='{table}', content_rowid='{pk}')",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON "
+                f"{table} BEGIN {insert} END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON "
+                f"{table} BEGIN {delete} END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON "
+                f"{table} BEGIN {delete} {insert} END",
+                f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+            ]
+    elif dialect == "postgresql":
+        for name, config in fts_columns(class_):
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{name}_fts ON {table} "
+                f"USING GIN (to_tsvector('{config.language}'::regconfig, "
+                f"{name}))")
+    return statements
+
+
+def create_fts(connection, class_):
+    """ create the full-text index of `class_` through `connection` """
+    for statement in fts_ddl(class_, connection.dialect.name):
+        connection.execute(text(statement))
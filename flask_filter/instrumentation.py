@@ -0,0 +1,218 @@
+""" timing hooks around the phases of a search. Listeners added with
+`FlaskFilter.add_listener` are called with a `QueryEvent` after each of
+
+* ``deserialize`` -- turning the JSON payload into filters,
+* ``build`` -- compiling (or re-using) the plan and building the query,
+* ``execute`` -- time spent in the database driver, and
+* ``hydrate`` -- turning the fetched rows into ORM objects.
+
+`FilterMetrics` is a ready-made listener keeping latency histograms per
+(model, field, op)::
+
+    metrics = FilterMetrics()
+    filtr.add_listener(metrics)
+    ...
+    metrics.snapshot()
+"""
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from sqlalchemy import event, inspect
+
+from flask_filter.plans import iter_leaves
+
+
+PHASES = ("deserialize", "build", "execute", "hydrate")
+# upper bounds of the latency buckets, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+           2.5, float("inf"))
+
+_local = threading.local()
+_engines = weakref.WeakSet()
+
+
+def _before_execute(conn, cursor, statement, parameters, context, many):
+    recorder = getattr(_local, "recorder", None)
+    if recorder is not None:
+        recorder._cursor_start = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, many):
+    recorder = getattr(_local, "recorder", None)
+    if recorder is not None and recorder._cursor_start is not None:
+        recorder._cursor_time += time.perf_counter() - recorder._cursor_start
+        recorder._cursor_start = None
+
+
+def _watch(engine):
+    """ time cursor executions on `engine` for the active recorder """
+    if engine in _engines:
+        return
+    _engines.add(engine)
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+
+
+class QueryEvent(object):
+    """ what a listener receives after each phase of a search. `sql` is
+    only compiled when a listener reads it.
+    """
+    __slots__ = ("phase", "model", "filters", "elapsed", "rows", "_query")
+
+    def __init__(self, phase, model, filters, elapsed, rows=None,
+                 query=None):
+        self.phase = phase
+        self.model = model
+        self.filters = filters
+        self.elapsed = elapsed
+        self.rows = rows
+        self._query = query
+
+    def __repr__(self):
+        return f"<QueryEvent(phase='{self.phase}', " \
+               f"model={self.model.__name__}, elapsed={self.elapsed:.6f}, " \
+               f"rows={self.rows})>"
+
+    @property
+    def shapes(self):
+        """ (field, path, op, ...) for every filter of the search """
+        return [f.shape for f in iter_leaves(self.filters or [])]
+
+    @property
+    def sql(self):
+        return None if self._query is None else str(self._query.statement)
+
+
+class SearchRecorder(object):
+    """ times one search and reports each phase to the listeners """
+
+    def __init__(self, listeners, model):
+        self.listeners = listeners
+        self.model = model
+        self.filters = None
+        self.query = None
+        self._cursor_start = None
+        self._cursor_time = 0.0
+
+    def describe(self, filters):
+        self.filters = filters
+
+    def _emit(self, phase, elapsed, rows=None):
+        e = QueryEvent(phase, self.model, self.filters, elapsed, rows,
+                       self.query)
+        for listener in self.listeners:
+            listener(e)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        self._emit(name, time.perf_counter() - start)
+
+    def run(self, query):
+        """ `query.all()`, split into execute and hydrate phases """
+        self.query = query
+        mapper = inspect(self.model)
+        _watch(query.session.get_bind(mapper=mapper))
+        previous = getattr(_local, "recorder", None)
+        _local.recorder = self
+        start = time.perf_counter()
+        try:
+            results = query.all()
+        finally:
+            _local.recorder = previous
+        total = time.perf_counter() - start
+        self._emit("execute", self._cursor_time, len(results))
+        self._emit("hydrate", total - self._cursor_time, len(results))
+        return results
+
+
+class _NullRecorder(object):
+    """ stands in for `SearchRecorder` when nobody is listening """
+
+    def describe(self, filters):
+        pass
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    def run(self, query):
+        return query.all()
+
+
+NULL_RECORDER = _NullRecorder()
+
+
+class Histogram(object):
+    """ cumulative latency histogram over `BUCKETS` """
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        cumulative, buckets = 0, {}
+        for bound, n in zip(BUCKETS, self.counts):
+            cumulative += n
+            buckets["+Inf" if bound == float("inf") else str(bound)] = \
+                cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class FilterMetrics(object):
+    """ listener keeping a latency histogram of the execute phase (or any
+    other `phase`) for every (model, field, op) a search filtered on.
+    """
+
+    def __init__(self, phase="execute"):
+        self.phase = phase
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, e):
+        if e.phase != self.phase:
+            return
+        keys = {(e.model.__name__, ".".join((shape[0],) + shape[1]), shape[2])
+                for shape in e.shapes}
+        with self._lock:
+            for key in keys:
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram()
+                histogram.observe(e.elapsed)
+
+    def snapshot(self) -> dict:
+        """ {"Model.field op": {"count", "sum", "buckets"}} """
+        with self._lock:
+            items = sorted(self.histograms.items())
+        return {f"{model}.{field} {op}": h.to_dict()
+                for (model, field, op), h in items}
+
+    def prometheus(self, name="flask_filter_query_seconds") -> str:
+        """ the histograms in the Prometheus text exposition format """
+        lines = [f"# TYPE {name} histogram"]
+        with self._lock:
+            items = sorted(self.histograms.items())
+        for (model, field, op), h in items:
+            labels = f'model="{model}",field="{field}",op="{op}"'
+            for le, n in h.to_dict()["buckets"].items():
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {n}')
+            lines.append(f"{name}_sum{{{labels}}} {h.sum}")
+            lines.append(f"{name}_count{{{labels}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self.histograms.clear()
@@ -0,0 +1,136 @@
+""" `in` filters over long lists. Lists up to the threshold compile as a
+single expanding bind parameter; beyond it, each value being a separate
+parameter makes statements huge (and runs into SQLite's variable limit),
+so the list is instead
+
+* bound as one array for `column = ANY(:values)` on PostgreSQL, or
+* loaded into a temporary table that the column is semi-joined against
+  with `column IN (SELECT value FROM ff_in_<n>)` on other databases.
+
+Temp tables are numbered per statement: queries combined into one (as by
+`search_many` or `facets`) share a numbering so each list gets its own.
+"""
+import itertools
+
+from sqlalchemy import (
+    ARRAY, Column, MetaData, Table, any_, bindparam, select, type_coerce
+)
+from sqlalchemy.sql.elements import BindParameter
+
+from flask_filter.fields import get_column
+from flask_filter.filters.filters import InFilter
+from flask_filter.filters.groups import FilterGroup, NotFilter
+from flask_filter.relationships import RelationshipPath, is_relationship
+
+
+STRATEGIES = ("auto", "in", "any", "temp_table")
+
+_metadata = MetaData()
+_tables = {}
+
+
+def temp_table(n, type_):
+    """ the temporary table holding the values of the `n`th large list of
+    a statement, one per column type
+    """
+    key = (n, type(type_))
+    table = _tables.get(key)
+    if table is None:
+        name = f"ff_in_{n}_{type(type_).__name__.lower()}"
+        table = Table(name, _metadata, Column("value", type_),
+                      prefixes=["TEMPORARY"])
+        _tables[key] = table
+    return table
+
+
+class AnyFilter(InFilter):
+    """ `column = ANY(:values)` with the whole list bound as one array """
+    __slots__ = ()
+
+    @property
+    def shape(self):
+        return super().shape + ("any",)
+
+    def criterion(self, column, value):
+        if isinstance(value, BindParameter):
+            value = type_coerce(value, ARRAY(column.type))
+        return column == any_(value)
+
+    def parameter(self, key):
+        return bindparam(key)
+
+    def bind_value(self):
+        # DBAPIs adapt lists, not tuples, to arrays
+        return list(self.value)
+
+
+class TempTableInFilter(InFilter):
+    """ `column IN (SELECT value FROM <temp table>)` """
+    __slots__ = ("n",)
+
+    def __init__(self, field, value, n):
+        self.n = n
+        super().__init__(field, value)
+
+    @property
+    def shape(self):
+        return super().shape + ("temp_table", self.n)
+
+    def criterion(self, column, value):
+        table = temp_table(self.n, column.type)
+        return column.in_(select([table.c.value]))
+
+    def parameter(self, key):
+        return None
+
+    def bind_value(self):
+        return None
+
+    def load(self, connection, class_, schema, chunk_size=10000):
+        """ (re)fill this filter's temporary table on `connection` """
+        column = get_column(class_, schema, self.field)
+        if is_relationship(column):
+            path = RelationshipPath(class_, column, self.path)
+            column = getattr(path.target, path.column)
+        table = temp_table(self.n, column.type)
+        table.create(connection, checkfirst=True)
+        connection.execute(table.delete())
+        values = list(dict.fromkeys(self.value))
+        for start in range(0, len(values), chunk_size):
+            rows = [{"value": v} for v in values[start:start + chunk_size]]
+            connection.execute(table.insert(), rows)
+
+
+def choose_strategy(strategy, dialect_name):
+    if strategy != "auto":
+        return strategy
+    return "any" if dialect_name == "postgresql" else "temp_table"
+
+
+def rewrite_large_in(filters, threshold, strategy, tables=None):
+    """ replace `in` filters longer than `threshold` by their large-list
+    counterpart. Returns the new filter list and the temp table filters
+    that must be loaded before the query runs. `tables` numbers the temp
+    tables; pass the same iterator for every query of one statement.
+    """
+    loads = []
+    tables = itertools.count() if tables is None else tables
+
+    def rewrite(node):
+        if isinstance(node, FilterGroup):
+            children = [rewrite(f) for f in node.filters]
+            if isinstance(node, NotFilter):
+                return NotFilter(children[0])
+            return type(node)(children)
+        if type(node) is not InFilter or len(node.value) <= threshold:
+            return node
+        field = ".".join((node.field,) + node.path)
+        if strategy == "any":
+            return AnyFilter(field, node.value)
+        large = TempTableInFilter(field, node.value, next(tables))
+        loads.append(large)
+        return large
+
+    if strategy == "in":
+        return filters, loads
+    return [rewrite(f) for f in filters], loads
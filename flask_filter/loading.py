@@ -0,0 +1,117 @@
+""" eager loading for the relationships a schema serializes. Every
+`Nested` (or `List(Nested)`) field of a schema that is backed by a
+relationship gets a loader option, so dumping a page of results costs one
+query per relationship rather than one per row and relationship:
+
+* collections use `selectinload` -- one `IN` query for the whole page,
+  without multiplying the rows of the main query (which would break
+  `limit`), and
+* many-to-one / one-to-one relationships use `joinedload`.
+"""
+from marshmallow import fields as ma_fields
+from marshmallow.exceptions import RegistryError
+from sqlalchemy.orm import joinedload, selectinload
+
+from flask_filter.fields import field_index
+from flask_filter.relationships import is_relationship
+
+
+STRATEGIES = ("auto", "selectin", "joined")
+_LOADERS = {"selectin": selectinload, "joined": joinedload}
+
+
+def _nested_schema(field, parent):
+    """ the schema class serialized by a `Nested` / `List(Nested)` field,
+    or None if `field` is not nested
+    """
+    if isinstance(field, ma_fields.List):
+        field = getattr(field, "inner", None) or getattr(field, "container")
+    if not isinstance(field, ma_fields.Nested):
+        return None
+    if field.nested == "self":
+        return parent
+    try:
+        schema = field.schema
+    except RegistryError:
+        return None
+    return type(schema)
+
+
+def _schema_class(schema):
+    return schema if schema is None or isinstance(schema, type) \
+        else type(schema)
+
+
+def nested_paths(class_, schema, depth=3, only=None):
+    """ dotted JSON paths of the nested relationship fields of `schema`,
+    followed through nested schemas up to `depth` relationships deep.
+    """
+    schema = _schema_class(schema)
+    paths = []
+    if depth <= 0 or schema is None:
+        return paths
+    for name, info in field_index(class_, schema).fields.items():
+        if info.relationship is None:
+            continue
+        if only is not None and name not in only:
+            continue
+        nested = _nested_schema(schema._declared_fields[name], schema)
+        if nested is None:
+            continue
+        paths.append(name)
+        target = info.relationship.mapper.class_
+        paths.extend(f"{name}.{p}"
+                     for p in nested_paths(target, nested, depth - 1))
+    return paths
+
+
+def _resolve(class_, schema, path):
+    """ the relationship attributes walked by a dotted JSON path """
+    attrs = []
+    schema = _schema_class(schema)
+    for name in path.split("."):
+        if schema is not None and name in field_index(class_, schema):
+            attr = field_index(class_, schema).resolve(name).column
+            nested = _nested_schema(schema._declared_fields[name], schema)
+        else:
+            attr, nested = getattr(class_, name, None), None
+        if not is_relationship(attr):
+            raise ValueError(f"'{path}' is not a relationship field")
+        attrs.append(attr)
+        class_, schema = attr.property.mapper.class_, nested
+    return attrs
+
+
+def _loader(attr, strategy):
+    if strategy == "auto":
+        strategy = "selectin" if attr.property.uselist else "joined"
+    if strategy not in _LOADERS:
+        raise ValueError(f"unknown eager loading strategy '{strategy}', "
+                         f"expected one of {STRATEGIES}")
+    return _LOADERS[strategy]
+
+
+def eager_options(class_, schema, eager=True, only=None):
+    """ loader options for a search.
+
+    :param eager: True to load every nested relationship of `schema`, a
+        list of dotted JSON paths (loaded with the "auto" strategy), or a
+        dict mapping paths to "auto", "selectin" or "joined"
+    :param only: the JSON fields the search projects, if any
+    """
+    if not eager:
+        return []
+    if eager is True:
+        eager = nested_paths(class_, schema, only=only)
+    if not isinstance(eager, dict):
+        eager = dict.fromkeys(eager, "auto")
+    options = []
+    for path, strategy in eager.items():
+        attrs = _resolve(class_, schema, path)
+        option = None
+        for attr in attrs:
+            loader = _loader(attr, strategy)
+            option = loader(attr) if option is None \
+                else getattr(option, loader.__name__)(attr)
+        options.append(option)
+    return options
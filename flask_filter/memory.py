@@ -0,0 +1,171 @@
+""" evaluate filters against in-memory python collections instead of a
+database: ORM or plain objects (`filter_objects`), dicts such as decoded
+message payloads (`filter_records`), or, with NumPy installed, a dict of
+column arrays evaluated as boolean masks (`filter_columns`).
+"""
+import datetime
+
+from marshmallow.exceptions import ValidationError
+
+from flask_filter.coercion import parse_date
+from flask_filter.fields import get_db_field
+from flask_filter.filters.filters import ContainsFilter
+from flask_filter.filters.groups import FilterGroup
+from flask_filter.schemas import deserialize_filters
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_COLLECTIONS = (list, tuple, set, frozenset)
+# filters testing the members of a collection rather than the collection
+_FANOUT_FILTERS = (ContainsFilter,)
+
+
+def _load(filters):
+    return deserialize_filters(list(filters), many=True)
+
+
+def _get_attr(obj, key):
+    return getattr(obj, key, None)
+
+
+def _get_item(obj, key):
+    return obj.get(key) if isinstance(obj, dict) else None
+
+
+def _resolve(obj, keys, getter):
+    """ the values found by walking `keys` from `obj`, fanning out over
+    collections the way a relationship path does in SQL.
+    """
+    values = [obj]
+    for key in keys:
+        found = []
+        for value in values:
+            child = getter(value, key)
+            if isinstance(child, _COLLECTIONS):
+                found.extend(child)
+            else:
+                found.append(child)
+        values = found
+    return values
+
+
+def _is_date(value):
+    return type(value) is datetime.date or isinstance(value, tuple) \
+        and any(type(v) is datetime.date for v in value)
+
+
+def _as_date(value):
+    """ an ISO date string read off a record as a date, to compare with a
+    filter value parsed into one; anything else as it is
+    """
+    if isinstance(value, str):
+        try:
+            return parse_date(value)
+        except ValidationError:
+            return value
+    return value
+
+
+def _on_dates(test):
+    return lambda x: test(_as_date(x))
+
+
+def _compile(node, getter, schema):
+    if isinstance(node, FilterGroup):
+        return node.combine_predicates(
+            [_compile(f, getter, schema) for f in node.filters]
+        )
+    keys = (get_db_field(schema, node.field),) + node.path
+    test = node.predicate()
+    if getter is _get_item and _is_date(node.value):
+        test = _on_dates(test)
+    if len(keys) == 1 and not isinstance(node, _FANOUT_FILTERS):
+        key = keys[0]
+        return lambda obj: test(getter(obj, key))
+    return lambda obj: any(test(v) for v in _resolve(obj, keys, getter))
+
+
+def compile_predicate(filters, schema=None, records=False):
+    """ compile a filter list into a callable returning True for the objects
+    (or dicts, with `records=True`) that match every filter. `schema` maps
+    JSON field names to attribute names for objects. Record values in ISO
+    date format compare as dates with filters on dates.
+    """
+    getter = _get_item if records else _get_attr
+    predicates = [_compile(f, getter, schema) for f in _load(filters)]
+    return lambda obj: all(p(obj) for p in predicates)
+
+
+def filter_objects(objects, filters, schema=None) -> list:
+    """ the objects whose attributes match `filters` """
+    predicate = compile_predicate(filters, schema)
+    return [obj for obj in objects if predicate(obj)]
+
+
+def filter_records(records, filters) -> list:
+    """ the dicts whose keys match `filters` """
+    predicate = compile_predicate(filters, records=True)
+    return [r for r in records if predicate(r)]
+
+
+def _is_null(column):
+    if column.dtype.kind == "f":
+        return np.isnan(column)
+    if column.dtype.kind == "O":
+        return np.fromiter((x is None for x in column), dtype=bool,
+                           count=len(column))
+    return np.zeros(len(column), dtype=bool)
+
+
+def _vectorized(f, column):
+    op, value = f.OP, f.value
+    if op in ("<", "<=", ">", ">=") and column.dtype.kind in "iufM":
+        return {"<": np.less, "<=": np.less_equal, ">": np.greater,
+                ">=": np.greater_equal}[op](column, value)
+    if op in ("=", "!=") and value is None:
+        null = _is_null(column)
+        return null if op == "=" else ~null
+    if op == "=" and column.dtype.kind != "O":
+        return column == value
+    if op == "!=" and column.dtype.kind != "O":
+        return (column != value) & ~_is_null(column)
+    if op == "in":
+        return np.isin(column, list(value))
+    return None
+
+
+def _mask(node, columns, size):
+    if isinstance(node, FilterGroup):
+        masks = [_mask(f, columns, size) for f in node.filters]
+        if node.KEY == "not":
+            return ~masks[0]
+        if not masks:
+            return np.full(size, node.KEY == "and")
+        reduce = np.logical_and if node.KEY == "and" else np.logical_or
+        return reduce.reduce(masks)
+    column = np.asarray(columns[".".join((node.field,) + node.path)])
+    mask = _vectorized(node, column)
+    if mask is None:
+        test = node.predicate()
+        mask = np.fromiter((test(x) for x in column), dtype=bool,
+                           count=len(column))
+    return mask
+
+
+def filter_columns(columns, filters):
+    """ evaluate `filters` over a dict of equal-length column arrays and
+    return the boolean mask of matching rows. Comparisons, equality and
+    `in` run as NumPy array operations; other operators fall back to each
+    filter's python predicate.
+    """
+    if np is None:
+        raise ImportError("filter_columns requires NumPy to be installed")
+    size = len(next(iter(columns.values()))) if columns else 0
+    masks = [_mask(f, columns, size) for f in _load(filters)]
+    if not masks:
+        return np.ones(size, dtype=bool)
+    return np.logical_and.reduce(masks)
@@ -0,0 +1,191 @@
+""" canonical form for a top-level (AND-ed) filter list. Filters on the
+same column are folded together: ranges tighten to a single interval,
+`=` and `in` intersect into one `=` or `in`, implied filters are dropped,
+and sets that no row can satisfy (`weight < 3` and `weight > 5`) are
+detected so the search can skip the database entirely.
+
+Only filters on the model's own columns are folded; a filter on a
+relationship such as `toys` or `toys.name` may be satisfied by a
+different related row per filter.
+Folded filters keep the values as they were parsed.
+"""
+from numbers import Number
+
+from marshmallow.exceptions import ValidationError
+
+from flask_filter.coercion import identity
+from flask_filter.filters.filters import (
+    EqualsFilter, GTEFilter, GTFilter, InFilter, LTEFilter, LTFilter,
+    NotEqualsFilter
+)
+from flask_filter.filters.groups import AndFilter
+
+
+_LOWER = {GTFilter: False, GTEFilter: True}
+_UPPER = {LTFilter: False, LTEFilter: True}
+_FOLDABLE = (EqualsFilter, NotEqualsFilter, InFilter) + tuple(_LOWER) + \
+    tuple(_UPPER)
+
+
+class Contradiction(Exception):
+    """ raised while folding a field whose filters cannot all hold """
+
+
+def _tighter(bound, other, upper):
+    """ the stricter of two (value, inclusive) bounds """
+    if bound is None:
+        return other
+    if other[0] == bound[0]:
+        return bound if not bound[1] else other
+    if upper:
+        return other if other[0] < bound[0] else bound
+    return other if other[0] > bound[0] else bound
+
+
+def _kinds(values):
+    return {Number if isinstance(v, Number) else type(v) for v in values}
+
+
+def _intersect(allowed, values):
+    """ values in both lists, refusing (with TypeError) to compare lists of
+    different kinds, such as dates against the date strings of an `in`.
+    """
+    if allowed is None:
+        return list(dict.fromkeys(values))
+    if not allowed or not values:
+        return []
+    if _kinds(allowed) != _kinds(values):
+        raise TypeError("values of different types")
+    return [v for v in allowed if v in values]
+
+
+def _make(Class, field, value):
+    """ a filter on values already parsed, which must not be parsed again
+    (e.g. a date-like string compared to a string column)
+    """
+    return Class(field, value, parse=identity)
+
+
+def _equals(field, value):
+    try:
+        return _make(EqualsFilter, field, value)
+    except ValidationError:
+        return _make(InFilter, field, [value])
+
+
+def _within(value, lower, upper):
+    if lower is not None and (
+            value < lower[0] or (value == lower[0] and not lower[1])):
+        return False
+    if upper is not None and (
+            value > upper[0] or (value == upper[0] and not upper[1])):
+        return False
+    return True
+
+
+def _fold(field, filters):
+    """ the smallest filter list equivalent to `filters`, all on `field` """
+    lower = upper = allowed = None
+    excluded, is_null, not_null = [], False, False
+    for f in filters:
+        Class, value = type(f), f.value
+        if Class in _LOWER:
+            lower = _tighter(lower, (value, _LOWER[Class]), upper=False)
+        elif Class in _UPPER:
+            upper = _tighter(upper, (value, _UPPER[Class]), upper=True)
+        elif Class is EqualsFilter and value is None:
+            is_null = True
+        elif Class is NotEqualsFilter and value is None:
+            not_null = True
+        elif Class is NotEqualsFilter:
+            excluded.append(value)
+        else:
+            # `IN (NULL)` matches nothing, unlike `IS NULL`
+            values = [value] if Class is EqualsFilter \
+                else [v for v in value if v is not None]
+            allowed = _intersect(allowed, values)
+
+    # every comparison is false for NULL
+    if is_null:
+        if not_null or excluded or allowed is not None or lower or upper:
+            raise Contradiction(field)
+        return [_make(EqualsFilter, field, None)]
+    if lower is not None and upper is not None:
+        if lower[0] > upper[0] or (
+                lower[0] == upper[0] and not (lower[1] and upper[1])):
+            raise Contradiction(field)
+        if lower[0] == upper[0]:
+            allowed = [lower[0]] if allowed is None else allowed
+    if allowed is not None:
+        allowed = [v for v in allowed
+                   if v not in excluded and _within(v, lower, upper)]
+        if not allowed:
+            raise Contradiction(field)
+        if len(allowed) == 1:
+            return [_equals(field, allowed[0])]
+        return [_make(InFilter, field, allowed)]
+
+    folded = []
+    if lower is not None:
+        folded.append(_make(GTEFilter if lower[1] else GTFilter, field,
+                            lower[0]))
+    if upper is not None:
+        folded.append(_make(LTEFilter if upper[1] else LTFilter, field,
+                            upper[0]))
+    excluded = [v for v in dict.fromkeys(excluded)
+                if _within(v, lower, upper)]
+    folded.extend(_make(NotEqualsFilter, field, v) for v in excluded)
+    if not_null and not folded:
+        folded.append(_make(NotEqualsFilter, field, None))
+    return folded
+
+
+def _splice(filters):
+    """ top-level filters with nested AND groups spliced in """
+    for f in filters:
+        if isinstance(f, AndFilter):
+            yield from _splice(f.filters)
+        else:
+            yield f
+
+
+def _is_column(index, field):
+    info = index.fields.get(field) if index is not None else None
+    return index is None or info is not None and info.relationship is None
+
+
+def normalize_filters(filters, index=None):
+    """ fold the filters of an AND-ed list into canonical form, keeping the
+    position of the first filter on each field. Returns None when the
+    filters contradict each other and can match no rows. Given the
+    model's `FieldIndex`, only filters on its columns are folded.
+    """
+    fields, order, seen = {}, [], set()
+    for f in _splice(filters):
+        if type(f) in _FOLDABLE and not f.path and \
+                _is_column(index, f.field):
+            if f.field not in fields:
+                order.append(f.field)
+            fields.setdefault(f.field, []).append(f)
+            continue
+        try:
+            if f in seen:
+                continue
+            seen.add(f)
+        except TypeError:
+            pass
+        order.append(f)
+    normalized = []
+    for item in order:
+        if not isinstance(item, str):
+            normalized.append(item)
+            continue
+        try:
+            normalized.extend(_fold(item, fields[item]))
+        except Contradiction:
+            return None
+        except TypeError:
+            # values that do not compare (e.g. a number and a string) are
+            # left for the database to judge
+            normalized.extend(dict.fromkeys(fields[item]))
+    return normalized
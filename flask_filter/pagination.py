@@ -0,0 +1,190 @@
+import base64
+import binascii
+import datetime
+import decimal
+import enum
+import json
+import uuid
+from collections import namedtuple
+
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import and_, false, inspect, or_
+from sqlalchemy.orm import ColumnProperty
+from sqlalchemy.orm.exc import UnmappedColumnError
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from flask_filter.coercion import column_parser
+from flask_filter.fields import get_column
+
+
+Page = namedtuple("Page", ["items", "next_cursor"])
+
+# dialects that sort NULL above every value (NULLS LAST when ascending);
+# the others sort it below
+NULLS_HIGH = ("postgresql", "oracle")
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"$t": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"$n": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"$u": str(value)}
+    if isinstance(value, enum.Enum):
+        # parsed back into a member by the column's enum parser
+        return {"$e": value.name}
+    raise TypeError(f"cannot encode {value!r} in a cursor")
+
+
+def _decode_value(obj):
+    if "$dt" in obj:
+        return datetime.datetime.fromisoformat(obj["$dt"])
+    if "$d" in obj:
+        return datetime.date.fromisoformat(obj["$d"])
+    if "$t" in obj:
+        return datetime.time.fromisoformat(obj["$t"])
+    if "$n" in obj:
+        return decimal.Decimal(obj["$n"])
+    if "$u" in obj:
+        return uuid.UUID(obj["$u"])
+    if "$e" in obj:
+        return obj["$e"]
+    return obj
+
+
+def encode_cursor(values) -> str:
+    """ encode the sort-key values of the last row on a page as an opaque,
+    url-safe token.
+    """
+    data = json.dumps(list(values), default=_encode_value,
+                      separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(token: str) -> list:
+    try:
+        data = base64.urlsafe_b64decode(token.encode())
+        values = json.loads(data, object_hook=_decode_value)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValidationError({"cursor": ["invalid pagination cursor"]})
+    if not isinstance(values, list):
+        raise ValidationError({"cursor": ["invalid pagination cursor"]})
+    return values
+
+
+def cursor_values(keys, token: str) -> list:
+    """ the sort-key values in `token`, parsed into the types of the
+    columns of `keys` (e.g. enum names back into members)
+    """
+    values = decode_cursor(token)
+    if len(values) != len(keys):
+        raise ValidationError({"cursor": ["cursor does not match ordering"]})
+    parsed = []
+    for (column, _), value in zip(keys, values):
+        parse = column_parser(getattr(column, "type", None))
+        try:
+            parsed.append(value if parse is None else parse(value))
+        except ValidationError:
+            raise ValidationError({"cursor": ["invalid pagination cursor"]})
+    return parsed
+
+
+def _ordering(class_, clause):
+    """ (attribute, descending) for a mapped attribute or its `.asc()` /
+    `.desc()`; other ordering clauses cannot be sought past
+    """
+    descending = False
+    if isinstance(clause, UnaryExpression):
+        if clause.modifier not in (operators.asc_op, operators.desc_op):
+            raise ValidationError(f"cannot paginate by {clause}")
+        descending = clause.modifier is operators.desc_op
+        clause = clause.element
+    prop = getattr(clause, "property", None)
+    if isinstance(prop, ColumnProperty):
+        return clause, descending
+    try:
+        prop = inspect(class_).get_property_by_column(clause)
+    except UnmappedColumnError:
+        raise ValidationError(f"cannot paginate by {clause}")
+    return getattr(class_, prop.key), descending
+
+
+def sort_keys(class_, schema, order_by=None):
+    """ resolve `order_by` into a list of (column, descending) pairs ending
+    with the primary key as a tiebreaker. `order_by` takes JSON field names
+    (prefix with "-" to sort descending), mapped attributes, or a list of
+    either, where attributes may carry `.asc()` / `.desc()`.
+    """
+    if order_by is None:
+        order_by = []
+    elif not isinstance(order_by, (list, tuple)):
+        order_by = [order_by]
+    keys = []
+    for key in order_by:
+        if isinstance(key, str):
+            descending = key.startswith("-")
+            column = get_column(class_, schema, key.lstrip("-"))
+            keys.append((column, descending))
+        else:
+            keys.append(_ordering(class_, key))
+    mapper = inspect(class_)
+    names = {column.key for column, _ in keys}
+    for pk in mapper.primary_key:
+        prop = mapper.get_property_by_column(pk)
+        if prop.key not in names:
+            keys.append((getattr(class_, prop.key), False))
+    return keys
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _after(column, value, descending, nulls_first):
+    """ the rows whose `column` sorts strictly after `value` """
+    if value is None:
+        return column.isnot(None) if nulls_first else false()
+    after = column < value if descending else column > value
+    return after if nulls_first else or_(after, column.is_(None))
+
+
+def seek_criterion(keys, values, nulls_high=False):
+    """ compound predicate selecting the rows that sort after `values`:
+    (a > :a) OR (a = :a AND b > :b) OR ...
+    NULL values compare with IS NULL / IS NOT NULL, sorting first or last
+    as the dialect does (`nulls_high` for NULLS LAST in ascending order).
+    """
+    if len(values) != len(keys):
+        raise ValidationError({"cursor": ["cursor does not match ordering"]})
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal = [_equal(c, v) for (c, _), v in zip(keys[:i], values[:i])]
+        after = _after(column, values[i], descending,
+                       nulls_first=nulls_high == descending)
+        clauses.append(and_(*equal, after))
+    return or_(*clauses)
+
+
+def paginate_query(query, keys, limit, cursor=None, dialect=None) -> Page:
+    """ fetch one page of `query` ordered by `keys`, starting after the row
+    encoded in `cursor`. `dialect` names the database, for where it sorts
+    NULL.
+    """
+    if cursor:
+        criterion = seek_criterion(keys, cursor_values(keys, cursor),
+                                   nulls_high=dialect in NULLS_HIGH)
+        query = query.filter(criterion)
+    order = [c.desc() if descending else c.asc() for c, descending in keys]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, c.key) for c, _ in keys)
+    return Page(items, next_cursor)
@@ -0,0 +1,189 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from sqlalchemy import and_
+from sqlalchemy.sql.elements import BindParameter
+
+from flask_filter.filters.filters import Filter
+from flask_filter.filters.groups import AndFilter, FilterGroup
+from flask_filter.relationships import (
+    RelationshipPath, compile_relationships, is_relationship
+)
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def _schema_key(schema):
+    """ field resolution only depends on a schema's declared fields, so
+    instances of the same schema class share their compiled plans.
+    """
+    if schema is None or isinstance(schema, type):
+        return schema
+    return type(schema)
+
+
+def _is_compilable(f):
+    """ filters that override `apply` (or never implement `criterion`)
+    are opaque to the planner and are applied one at a time instead.
+    """
+    cls = type(f)
+    return cls.apply is Filter.apply and cls.criterion is not Filter.criterion
+
+
+def _leaf(f, value):
+    return lambda column: f.criterion(column, value)
+
+
+def iter_leaves(filters):
+    """ the filters in a (possibly nested) filter list, depth first """
+    for f in filters:
+        if isinstance(f, FilterGroup):
+            yield from f.leaves()
+        else:
+            yield f
+
+
+def plan_key(class_, schema, filters):
+    return class_, _schema_key(schema), tuple(f.shape for f in filters)
+
+
+class FilterPlan(object):
+    """ a parameterized SQL criterion compiled from the shape of a list of
+    filters. The plan resolves each filter's column once and stands a bind
+    parameter in for every value, so it can be re-used by any filter list
+    with the same fields and operators. and / or / not groups compile into
+    the same single WHERE clause.
+    """
+
+    def __init__(self, class_, schema, filters, relationship_strategy="auto"):
+        self.class_ = class_
+        self.schema = schema
+        self.columns = []
+        self.bindings = []
+        self.opaque = []
+        related = []
+        clauses = [self._compile(f, related) for f in filters]
+        clauses = [c for c in clauses if c is not None]
+        criteria = compile_relationships(related, relationship_strategy)
+        clauses.extend(criteria.clauses)
+        self.joins = criteria.joins
+        self.distinct = criteria.distinct
+        self.criterion = and_(*clauses) if clauses else None
+
+    def _compile(self, node, related=None):
+        """ compile one node of the filter tree. `related` collects the
+        relationship filters and opaque filters that sit directly under the
+        top-level AND, where they can be merged or applied separately;
+        anywhere else they must compile to a self-contained clause.
+        """
+        if isinstance(node, FilterGroup):
+            top = related if isinstance(node, AndFilter) else None
+            clauses = [self._compile(f, top) for f in node.filters]
+            clauses = [c for c in clauses if c is not None]
+            if top is not None:
+                return and_(*clauses) if clauses else None
+            return node.combine(clauses)
+        i = len(self.columns)
+        column = node._get_column(self.class_, self.schema)
+        self.columns.append(column)
+        if not _is_compilable(node):
+            if related is None:
+                raise TypeError(f"{node} overrides `apply` and cannot be "
+                                f"nested in an or / not group")
+            self.opaque.append(i)
+            return None
+        leaf = _leaf(node, self._parameter(node, i))
+        if is_relationship(column):
+            path = RelationshipPath(self.class_, column, node.path)
+            if related is None:
+                return path.exists(leaf)
+            related.append((path, leaf))
+            return None
+        return leaf(column)
+
+    def _parameter(self, f, i):
+        param = f.parameter(f"ff_{i}")
+        if isinstance(param, BindParameter):
+            self.bindings.append((param.key, i))
+            return param
+        return f.bind_value()
+
+    def __repr__(self):
+        return f"<FilterPlan(model={self.class_.__name__}, " \
+               f"params={len(self.bindings)}, opaque={len(self.opaque)})>"
+
+    def params(self, filters):
+        leaves = list(iter_leaves(filters))
+        return {key: leaves[i].bind_value() for key, i in self.bindings}
+
+    def apply(self, query, filters):
+        for target in self.joins:
+            query = query.join(target)
+        if self.distinct:
+            query = query.distinct()
+        if self.criterion is not None:
+            query = query.filter(self.criterion).params(self.params(filters))
+        if self.opaque:
+            leaves = list(iter_leaves(filters))
+            for i in self.opaque:
+                query = leaves[i].apply(query, self.class_, self.schema)
+        return query
+
+    def apply_statement(self, statement, filters):
+        """ add this plan's joins and criterion to a Core `select()`
+        statement. DISTINCT is left to the caller, since it depends on
+        what the statement selects.
+        """
+        if self.opaque:
+            raise TypeError("filters overriding `apply` only work with "
+                            "ORM queries, not select() statements")
+        for target in self.joins:
+            statement = statement.join(target)
+        if self.criterion is not None:
+            criterion = self.criterion.params(self.params(filters))
+            statement = statement.where(criterion)
+        return statement
+
+
+class PlanCache(object):
+    """ bounded LRU cache of `FilterPlan` objects keyed on
+    (model, schema, filter shapes).
+    """
+
+    def __init__(self, maxsize: int = 128, relationship_strategy="auto"):
+        self.maxsize = maxsize
+        self.relationship_strategy = relationship_strategy
+        self.hits = 0
+        self.misses = 0
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._plans)
+
+    def get(self, class_, schema, filters) -> FilterPlan:
+        key = plan_key(class_, schema, filters)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+        plan = FilterPlan(class_, schema, filters, self.relationship_strategy)
+        if self.maxsize > 0:
+            with self._lock:
+                self._plans[key] = plan
+                while len(self._plans) > self.maxsize:
+                    self._plans.popitem(last=False)
+        return plan
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._plans))
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+            self.hits = 0
+            self.misses = 0
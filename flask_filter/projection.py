@@ -0,0 +1,51 @@
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import inspect
+from sqlalchemy.orm import ColumnProperty, load_only
+
+from flask_filter.fields import get_column
+
+
+def projected_fields(schema, fields=None):
+    """ the JSON fields a search needs to load: `fields` when given,
+    otherwise the `only` set of a schema instance (if any).
+    """
+    if fields is None and schema is not None and not isinstance(schema, type):
+        fields = getattr(schema, "only", None)
+    if fields is None:
+        return None
+    return [f.split(".")[0] for f in fields]
+
+
+def _is_column(attr):
+    return isinstance(getattr(attr, "property", None), ColumnProperty)
+
+
+def load_only_option(class_, schema, fields):
+    """ a `load_only` option deferring every column not behind `fields`.
+    relationships named in `fields` are left to their own loaders.
+    """
+    keys = []
+    for name in fields:
+        column = get_column(class_, schema, name)
+        if _is_column(column):
+            keys.append(column.key)
+    return load_only(*keys) if keys else None
+
+
+def project_rows(query, class_, schema, fields):
+    """ select only the columns behind `fields` and return each row as a
+    dict keyed by JSON field name instead of hydrating ORM objects.
+    """
+    columns = []
+    for name in fields:
+        column = get_column(class_, schema, name)
+        if not _is_column(column):
+            raise ValidationError(f"'{name}' is not a column field")
+        columns.append(column)
+    if query._distinct:
+        # DISTINCT drops the rows repeated by relationship joins; select
+        # the primary key too so that objects sharing values are kept
+        pk = list(inspect(class_).primary_key)
+        rows = query.with_entities(*columns, *pk)
+        return [dict(zip(fields, row[:len(columns)])) for row in rows]
+    return [dict(zip(fields, row)) for row in query.with_entities(*columns)]
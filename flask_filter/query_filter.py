@@ -1,11 +1,44 @@
+from sqlalchemy import distinct, func, inspect
+
 from .schemas import deserialize_filters
+from .streaming import stream_query
 
 
 def query_with_filters(class_, filters, schema=None, order_by=None):
+    return _filtered_query(class_, filters, schema, order_by).all()
+
+
+def count_with_filters(class_, filters, schema=None):
+    return count_query(_filtered_query(class_, filters, schema), class_)
+
+
+def exists_with_filters(class_, filters, schema=None):
+    return exists_query(_filtered_query(class_, filters, schema))
+
+
+def stream_with_filters(class_, filters, schema=None, order_by=None,
+                        chunk_size=1000):
+    query = _filtered_query(class_, filters, schema, order_by)
+    return stream_query(query, chunk_size)
+
+
+def count_query(query, class_) -> int:
+    """ SELECT count(pk) over the filtered query without loading any rows """
+    pk = inspect(class_).primary_key[0]
+    count = func.count(distinct(pk)) if query._distinct else func.count(pk)
+    return query.order_by(None).with_entities(count).scalar()
+
+
+def exists_query(query) -> bool:
+    """ SELECT EXISTS (...) over the filtered query """
+    return query.session.query(query.order_by(None).exists()).scalar()
+
+
+def _filtered_query(class_, filters, schema=None, order_by=None):
     _filters = deserialize_filters(filters, many=True)
     query = class_.query
     for f in _filters:
         query = f.apply(query, class_, schema)
     if order_by:
         query = query.order_by(order_by)
-    return query.all()
+    return query
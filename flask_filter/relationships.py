@@ -0,0 +1,159 @@
+from collections import OrderedDict, namedtuple
+
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import and_, case, func, inspect, or_, select, tuple_
+from sqlalchemy.orm import RelationshipProperty, aliased
+from sqlalchemy.orm import join as orm_join
+
+
+STRATEGIES = ("auto", "exists", "semijoin", "join", "grouped")
+RelationshipCriteria = namedtuple(
+    "RelationshipCriteria", ["clauses", "joins", "distinct"]
+)
+
+
+def is_relationship(attr):
+    return isinstance(getattr(attr, "property", None), RelationshipProperty)
+
+
+def _primary_key(entity):
+    mapper = inspect(entity).mapper
+    keys = [mapper.get_property_by_column(c).key for c in mapper.primary_key]
+    columns = [getattr(entity, k) for k in keys]
+    return columns[0] if len(columns) == 1 else tuple_(*columns)
+
+
+class RelationshipPath(object):
+    """ a dotted filter field such as `owner.address.city` resolved into
+    the chain of relationships it walks and the column it ends on. A path
+    that ends on a relationship (`toys`) compares against the primary key
+    of the related model.
+    """
+
+    def __init__(self, class_, root, segments):
+        self.class_ = class_
+        self.keys = [root.key]
+        self.uselist = root.property.uselist
+        target = root.property.mapper.class_
+        self.models = [target]
+        segments = list(segments)
+        while segments and is_relationship(getattr(target, segments[0], None)):
+            prop = getattr(target, segments.pop(0)).property
+            self.keys.append(prop.key)
+            self.uselist = self.uselist or prop.uselist
+            target = prop.mapper.class_
+            self.models.append(target)
+        if len(segments) > 1 or (segments and not hasattr(
+                getattr(target, segments[0], None), "__clause_element__")):
+            field = ".".join(self.keys + segments)
+            raise ValidationError(f"'{field}' is not a valid field")
+        self.target = target
+        if segments:
+            self.column = segments[0]
+        else:
+            mapper = inspect(target)
+            self.column = mapper.get_property_by_column(
+                mapper.primary_key[0]).key
+
+    def __repr__(self):
+        return f"<RelationshipPath({self.class_.__name__}." \
+               f"{'.'.join(self.keys)}.{self.column})>"
+
+    @property
+    def key(self):
+        """ relationships are merged when they walk the same chain """
+        return (self.class_,) + tuple(self.keys)
+
+    def hops(self, start):
+        """ (relationship attribute, aliased target) for each step of the
+        path starting at entity `start`. Every target is aliased so that
+        self-referential paths never correlate with the outer query.
+        """
+        hops, entity = [], start
+        for key in self.keys:
+            attr = getattr(entity, key)
+            target = aliased(attr.property.mapper.class_)
+            hops.append((attr, target))
+            entity = target
+        return hops
+
+    def exists(self, leaf):
+        """ nested any() / has() -- one correlated EXISTS per hop """
+        hops = self.hops(self.class_)
+        clause = leaf(getattr(hops[-1][1], self.column))
+        for attr, target in reversed(hops):
+            comparator = attr.of_type(target)
+            if attr.property.uselist:
+                clause = comparator.any(clause)
+            else:
+                clause = comparator.has(clause)
+        return clause
+
+    def joins(self, leaf):
+        """ the join targets walking this path from the outer query and the
+        criterion to filter the joined rows on.
+        """
+        hops = self.hops(self.class_)
+        joins = [attr.of_type(target) for attr, target in hops]
+        return joins, leaf(getattr(hops[-1][1], self.column))
+
+    def semijoin(self, *leaves):
+        """ pk IN (SELECT pk FROM model JOIN ... WHERE ...). With several
+        leaves the rows are grouped by parent so that each leaf may match a
+        different related row, exactly like separate EXISTS clauses would.
+        """
+        root = aliased(self.class_)
+        hops = self.hops(root)
+        joined = root
+        for attr, target in hops:
+            joined = orm_join(joined, target, attr)
+        column = getattr(hops[-1][1], self.column)
+        conditions = [leaf(column) for leaf in leaves]
+        pk = _primary_key(root)
+        subquery = select([pk]).select_from(joined)
+        if len(conditions) == 1:
+            subquery = subquery.where(conditions[0])
+        else:
+            matched = [func.max(case([(c, 1)], else_=0)) == 1
+                       for c in conditions]
+            subquery = subquery.where(or_(*conditions)) \
+                .group_by(pk).having(and_(*matched))
+        return _primary_key(self.class_).in_(subquery)
+
+
+def _choose(strategy, path, count):
+    if strategy == "auto":
+        if count > 1:
+            return "grouped"
+        return "semijoin" if path.uselist else "join"
+    if strategy == "join" and count > 1:
+        return "grouped"
+    return strategy
+
+
+def compile_relationships(leaves, strategy="auto") -> RelationshipCriteria:
+    """ compile (RelationshipPath, leaf) pairs into WHERE clauses and the
+    joins they need. `leaf` builds the criterion for the column a path ends
+    on. Leaves walking the same relationships are merged into a single
+    grouped subquery unless the strategy is "exists" or "semijoin".
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown relationship strategy '{strategy}'")
+    groups = OrderedDict()
+    for path, leaf in leaves:
+        groups.setdefault(path.key, (path, []))[1].append(leaf)
+    clauses, joins, distinct = [], [], False
+    for path, members in groups.values():
+        chosen = _choose(strategy, path, len(members))
+        if chosen == "exists":
+            clauses.extend(path.exists(leaf) for leaf in members)
+        elif chosen == "semijoin":
+            clauses.extend(path.semijoin(leaf) for leaf in members)
+        elif chosen == "grouped":
+            clauses.append(path.semijoin(*members))
+        else:
+            path_joins, clause = path.joins(members[0])
+            joins.extend(path_joins)
+            clauses.append(clause)
+            distinct = distinct or path.uselist
+    return RelationshipCriteria(clauses, joins, distinct)
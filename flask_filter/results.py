@@ -0,0 +1,253 @@
+""" optional cache of search results, keyed on a canonical form of the
+search and invalidated whenever a model the results depend on is flushed::
+
+    filtr = FlaskFilter(result_cache=ResultCache(LRUBackend(ttl=60)))
+
+Invalidation listens to the mapper's `after_insert` / `after_update` /
+`after_delete` events, so bulk `Query.update()` / `Query.delete()` calls and
+writes from other processes are not seen; use a TTL to bound staleness.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from flask_filter.filters.groups import FilterGroup
+from flask_filter.plans import _schema_key, iter_leaves
+from flask_filter.relationships import RelationshipPath, is_relationship
+
+
+MAPPER_EVENTS = ("after_insert", "after_update", "after_delete")
+
+
+def _typed(value):
+    """ a value with its type, so that e.g. "5" and 5 key differently """
+    if isinstance(value, tuple):
+        return tuple(_typed(v) for v in value)
+    return type(value).__qualname__, value
+
+
+def _canonical(node):
+    if isinstance(node, FilterGroup):
+        return node.KEY, tuple(_canonical(f) for f in node.filters)
+    return node.shape + (_typed(node.value),)
+
+
+def canonical_filters(filters):
+    """ each filter as its shape (field, relationship path and operator)
+    and typed value. Top-level filters are AND-ed, so their order does not
+    matter and repeats (equal by `Filter.__hash__`) can be dropped.
+    """
+    return tuple(sorted((_canonical(f) for f in dict.fromkeys(filters)),
+                        key=repr))
+
+
+def _eager_key(eager):
+    if not eager:
+        return None
+    if isinstance(eager, dict):
+        return tuple(sorted(eager.items()))
+    if isinstance(eager, (list, tuple, set)):
+        return tuple(sorted(eager))
+    return eager
+
+
+def cache_key(class_, schema, filters, order_by=None, limit=None,
+              fields=None, eager=None):
+    schema = _schema_key(schema)
+    return (
+        f"{class_.__module__}.{class_.__qualname__}",
+        None if schema is None else schema.__qualname__,
+        repr(canonical_filters(filters)),
+        None if order_by is None else str(order_by),
+        limit,
+        None if fields is None else tuple(sorted(fields)),
+        _eager_key(eager),
+    )
+
+
+def dependencies(class_, schema, filters):
+    """ the models whose rows can change the results of a search: the
+    model itself plus every model a relationship filter walks through.
+    """
+    models = {class_}
+    for f in iter_leaves(filters):
+        column = f._get_column(class_, schema)
+        if is_relationship(column):
+            models.update(RelationshipPath(class_, column, f.path).models)
+    return models
+
+
+class LRUBackend(object):
+    """ bounded in-process store evicting the least recently used entry,
+    with an optional time-to-live in seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DictBackend(object):
+    """ unbounded store over any mutable mapping with string keys, e.g. a
+    plain dict or a `shelve` opened by the caller.
+    """
+
+    def __init__(self, store=None):
+        self.store = {} if store is None else store
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.store)
+
+    def get(self, key):
+        with self._lock:
+            return self.store.get(repr(key))
+
+    def set(self, key, value):
+        with self._lock:
+            self.store[repr(key)] = value
+
+    def delete(self, key):
+        with self._lock:
+            self.store.pop(repr(key), None)
+
+    def clear(self):
+        with self._lock:
+            self.store.clear()
+
+
+def detached_copy(obj, memo=None):
+    """ a session-free copy of `obj` holding its loaded column values and
+    loaded relationships (copied the same way), so that expiring or
+    closing the session that loaded it leaves the copy intact. Merging
+    the copy back carries the relationships along, sparing the lazy loads
+    an eager search avoided. `memo` maps the objects copied so far to
+    their copies.
+    """
+    memo = {} if memo is None else memo
+    if obj is None:
+        return None
+    copy = memo.get(id(obj))
+    if copy is not None:
+        return copy
+    state = inspect(obj)
+    mapper = state.mapper
+    copy = memo[id(obj)] = mapper.class_manager.new_instance()
+    for prop in mapper.column_attrs:
+        if prop.key in state.dict:
+            set_committed_value(copy, prop.key, state.dict[prop.key])
+    make_transient_to_detached(copy)
+    for prop in mapper.relationships:
+        if prop.key not in state.dict:
+            continue
+        value = state.dict[prop.key]
+        if prop.uselist:
+            value = [detached_copy(v, memo) for v in value]
+        else:
+            value = detached_copy(value, memo)
+        set_committed_value(copy, prop.key, value)
+    return copy
+
+
+class ResultCache(object):
+    """ search results cached in a backend (`LRUBackend` by default) and
+    dropped when any model they depend on is inserted, updated or deleted.
+    Results are stored as detached copies of their loaded state and merged
+    into the current session without reloading; writes to any model in a
+    cached result (eager-loaded relationships included) invalidate it.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = LRUBackend() if backend is None else backend
+        self.hits = 0
+        self.misses = 0
+        self._dependents = {}
+        self._watched = set()
+        self._lock = threading.Lock()
+
+    def get(self, key, session):
+        objects = self.backend.get(key)
+        if objects is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [session.merge(obj, load=False) for obj in objects]
+
+    def set(self, key, objects, models):
+        memo = {}
+        copies = [detached_copy(obj, memo) for obj in objects]
+        models = set(models) | {type(c) for c in memo.values()}
+        with self._lock:
+            for model in models:
+                self.watch(model)
+                self._dependents.setdefault(model, set()).add(key)
+        self.backend.set(key, copies)
+
+    def watch(self, class_):
+        """ invalidate dependent results whenever `class_` is flushed """
+        if class_ in self._watched:
+            return
+        self._watched.add(class_)
+        for name in MAPPER_EVENTS:
+            event.listen(class_, name, self._on_change, propagate=True)
+
+    def unwatch(self):
+        """ remove this cache's event listeners from every watched model """
+        for class_ in self._watched:
+            for name in MAPPER_EVENTS:
+                event.remove(class_, name, self._on_change)
+        self._watched.clear()
+
+    def invalidate(self, class_):
+        with self._lock:
+            keys = self._dependents.pop(class_, set())
+        for key in keys:
+            self.backend.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._dependents.clear()
+            self.hits = 0
+            self.misses = 0
+        self.backend.clear()
+
+    def _on_change(self, mapper, connection, target):
+        for class_ in mapper.class_.__mro__:
+            self.invalidate(class_)
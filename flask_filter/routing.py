@@ -0,0 +1,133 @@
+""" send searches to read replicas. A `ReplicaRouter` holds one scoped
+session per replica and picks a replica for every search, either in turn
+("round_robin") or the one with the fewest connections in use
+("least_busy")::
+
+    router = ReplicaRouter([create_engine(url) for url in replica_urls])
+    filtr = FlaskFilter(app, router=router)
+
+    with filtr.primary():
+        # read-your-writes: these searches use the primary session
+        filtr.search(Dog, filters)
+
+Replicas may be engines, session factories, or Flask-SQLAlchemy bind keys
+(`ReplicaRouter.from_binds`). Replica sessions are removed when the Flask
+application context tears down.
+"""
+import itertools
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+
+STRATEGIES = ("round_robin", "least_busy")
+
+
+class Replica(object):
+    """ one read target: a scoped session and a count of the connections
+    checked out of its engine's pool
+    """
+
+    def __init__(self, target):
+        if isinstance(target, Engine):
+            target = sessionmaker(bind=target)
+        self.session = scoped_session(target)
+        self.engine = getattr(target, "kw", {}).get("bind")
+        self.active = 0
+        self._lock = threading.Lock()
+        if self.engine is not None:
+            event.listen(self.engine, "checkout", self._checkout)
+            event.listen(self.engine, "checkin", self._checkin)
+
+    def __repr__(self):
+        return f"<Replica(engine={self.engine}, active={self.active})>"
+
+    def _checkout(self, *args):
+        with self._lock:
+            self.active += 1
+
+    def _checkin(self, *args):
+        with self._lock:
+            self.active = max(self.active - 1, 0)
+
+    def close(self):
+        if self.engine is not None:
+            event.remove(self.engine, "checkout", self._checkout)
+            event.remove(self.engine, "checkin", self._checkin)
+
+
+class ReplicaRouter(object):
+
+    def __init__(self, replicas, strategy="round_robin"):
+        """
+        :param replicas: engines or session factories of the replicas
+        :param strategy: "round_robin" or "least_busy"
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown routing strategy '{strategy}', "
+                             f"expected one of {STRATEGIES}")
+        if not replicas:
+            raise ValueError("a ReplicaRouter needs at least one replica")
+        self.replicas = [Replica(r) for r in replicas]
+        self.strategy = strategy
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_binds(cls, db, binds, app=None, strategy="round_robin"):
+        """ route to the engines of Flask-SQLAlchemy `SQLALCHEMY_BINDS` """
+        return cls([db.get_engine(app, bind=b) for b in binds], strategy)
+
+    def __repr__(self):
+        return f"<ReplicaRouter(strategy='{self.strategy}', " \
+               f"replicas={len(self.replicas)})>"
+
+    @property
+    def pinned(self):
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextmanager
+    def primary(self):
+        """ run the searches of this block (in this thread) on the primary """
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+
+    def choose(self) -> Replica:
+        with self._lock:
+            turn = next(self._turn)
+        if self.strategy == "least_busy":
+            # ties go round the replicas in turn
+            n = len(self.replicas)
+            order = [self.replicas[(turn + i) % n] for i in range(n)]
+            return min(order, key=lambda r: r.active)
+        return self.replicas[turn % len(self.replicas)]
+
+    def session(self):
+        """ the session of the replica chosen for the next search, or None
+        when pinned to the primary
+        """
+        if self.pinned:
+            return None
+        return self.choose().session()
+
+    def route(self, query):
+        """ `query` on a replica's session, unless pinned to the primary """
+        session = self.session()
+        return query if session is None else query.with_session(session)
+
+    def remove(self):
+        """ close this thread's replica sessions """
+        for replica in self.replicas:
+            replica.session.remove()
+
+    def close(self):
+        self.remove()
+        for replica in self.replicas:
+            replica.close()
@@ -1,12 +1,17 @@
 import logging
 import marshmallow as ma
 from marshmallow.exceptions import ValidationError
-from flask_filter.filters import FILTERS
+from flask_filter.filters import FILTERS, GROUPS
+from flask_filter.filters.filters import Filter
+from flask_filter.filters.groups import FilterGroup
 
 
 __FILTER_MAP = {c.OP: c for c in FILTERS}
+__GROUP_MAP = {g.KEY: g for g in GROUPS}
 __VALID_OPERATORS = {x.OP for x in FILTERS}
+__FILTER_KEYS = {"field", "op", "value"}
 _mm2 = ma.__version_info__[0] == 2
+_data_key = "load_from" if _mm2 else "data_key"
 logger = logging.getLogger(__name__)
 
 
@@ -14,6 +19,14 @@ def _get_filter_class(operator):
     return __FILTER_MAP.get(operator)
 
 
+def _get_group_keys(json):
+    return [key for key in __GROUP_MAP if key in json]
+
+
+def _get_group_class(key):
+    return __GROUP_MAP.get(key)
+
+
 def validate_operator(value):
     if value not in __VALID_OPERATORS:
         message = {'op': [f"operator {value} is not supported"]}
@@ -21,28 +34,130 @@ def validate_operator(value):
 
 
 class FilterSchema(ma.Schema):
-    field = ma.fields.String(required=True, allow_none=False)
-    op = ma.fields.String(required=True, attribute="OP", validate=validate_operator)
-    value = ma.fields.Field(required=True, allow_none=True)
+    """ a `{field, op, value}` filter, or a boolean group of filters:
+    `{"and": [...]}`, `{"or": [...]}` or `{"not": {...}}`.
+    """
+    field = ma.fields.String(allow_none=False)
+    op = ma.fields.String(attribute="OP", validate=validate_operator)
+    value = ma.fields.Field(allow_none=True)
+    and_ = ma.fields.Nested("self", many=True, attribute="and",
+                            **{_data_key: "and"})
+    or_ = ma.fields.Nested("self", many=True, attribute="or",
+                           **{_data_key: "or"})
+    not_ = ma.fields.Nested("self", attribute="not", **{_data_key: "not"})
+
+    @ma.validates_schema
+    def validate_node(self, json, *args, **kwargs):
+        groups = _get_group_keys(json)
+        if not groups:
+            missing = {
+                key: ["Missing data for required field."]
+                for key, attr in (("field", "field"), ("op", "OP"),
+                                  ("value", "value"))
+                if attr not in json
+            }
+            if missing:
+                raise ValidationError(missing)
+        elif len(groups) > 1 or {"field", "OP", "value"} & set(json):
+            raise ValidationError("a filter must be either a field/op/value "
+                                  "filter or a single and / or / not group")
 
     @ma.post_load
     def make_object(self, json, *args, **kwargs):
+        for key in _get_group_keys(json):
+            return _get_group_class(key)(json[key])
         op = json.get("OP")
         field = json.get("field")
         value = json.get("value")
         Class = _get_filter_class(op)
-        return Class(field=field, value=value)
+        return Class(field=field, value=value,
+                     parse=_parser(self.context.get("index"), field))
 
 
 _schema = FilterSchema()
 
 
-def deserialize_filters(data, *args, **kwargs):
+def _parser(index, field):
+    """ the value parser of a (possibly dotted) field in `index`, if any.
+    Fields the index does not know raise `ValidationError` here, before
+    any query is built.
+    """
+    if index is None or not isinstance(field, str):
+        return None
+    name, *path = field.split(".")
+    info = index.resolve(name)
+    if path and info.relationship is None:
+        raise ValidationError(f"'{field}' is not a valid field")
+    return index.parser(name, tuple(path))
+
+
+def _fast_node(item, index=None):
+    if type(item) is not dict:
+        return None
+    if len(item) == 1:
+        key, children = next(iter(item.items()))
+        Group = __GROUP_MAP.get(key)
+        if Group is None:
+            return None
+        if Group.KEY == "not":
+            child = _fast_node(children, index)
+            return None if child is None else Group(child)
+        nodes = _fast_load(children, many=True, index=index)
+        return None if nodes is None else Group(nodes)
+    if item.keys() != __FILTER_KEYS:
+        return None
+    field, op = item["field"], item["op"]
+    if not isinstance(field, str) or not isinstance(op, str):
+        return None
+    Class = __FILTER_MAP.get(op)
+    if Class is None:
+        return None
+    try:
+        return Class(field=field, value=item["value"],
+                     parse=_parser(index, field))
+    except ValidationError:
+        return None
+
+
+def _fast_load(data, many=False, index=None):
+    """ builds filters straight from the filter map when every item is a
+    well-formed `{field, op, value}` dict or boolean group. returns None
+    if anything is off so the caller can fall back to `FilterSchema` for
+    its error messages.
+    """
+    if many and not isinstance(data, list):
+        return None
+    filters = []
+    for item in (data if many else [data]):
+        node = _fast_node(item, index)
+        if node is None:
+            return None
+        filters.append(node)
+    return filters if many else filters[0]
+
+
+def deserialize_filters(data, *args, index=None, **kwargs):
     """ centralizes marshmallow v2/v3 api change handling to one place.
     in future version of this we can remove all mm2 support and this
     function will be a one-liner.
+
+    well-formed payloads skip marshmallow entirely; anything else goes
+    through `FilterSchema.load` so errors keep their usual messages, and
+    lists that are already filters are returned as they are.
+
+    :param index: optional `FieldIndex` of the model searched; values are
+        then parsed into the python types of their columns
     """
-    data = _schema.load(data, *args, **kwargs)
+    if kwargs.get("many") and isinstance(data, list) and data and all(
+            isinstance(f, (Filter, FilterGroup)) for f in data):
+        return data
+    if not _mm2 and not args and set(kwargs) <= {"many"}:
+        filters = _fast_load(data, kwargs.get("many") or _schema.many, index)
+        if filters is not None:
+            return filters
+    schema = _schema if index is None else FilterSchema(
+        context={"index": index})
+    data = schema.load(data, *args, **kwargs)
     if _mm2:
         logger.warning("Marshmallow v2 is deprecated and will not be "
                        "supported in future versions of FlaskFilter. "
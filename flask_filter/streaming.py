@@ -0,0 +1,39 @@
+import json
+
+from flask_filter.schemas import _mm2
+
+
+def stream_query(query, chunk_size: int = 1000):
+    """ iterate over the results of `query` fetching `chunk_size` rows at a
+    time over a server-side cursor where the database driver supports one,
+    instead of loading the full result set with `query.all()`.
+    """
+    return iter(query.yield_per(chunk_size))
+
+
+def stream_ndjson(query, schema, chunk_size: int = 1000):
+    """ serialize the results of `query` as newline-delimited JSON, one
+    chunk of `chunk_size` objects at a time, through a marshmallow schema.
+    """
+    if isinstance(schema, type):
+        schema = schema()
+    rows = stream_query(query, chunk_size)
+
+    def generate():
+        chunk = []
+        for obj in rows:
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                yield _dump_lines(schema, chunk)
+                chunk = []
+        if chunk:
+            yield _dump_lines(schema, chunk)
+
+    return generate()
+
+
+def _dump_lines(schema, objs):
+    data = schema.dump(objs, many=True)
+    if _mm2:
+        data = data.data
+    return "".join(json.dumps(d, default=str) + "\n" for d in data)
@@ -7,7 +7,8 @@ setup(
     author="Exley McCormick",
     author_email="exleym@gmail.com",
     description="A Flask extension for creating standard resource searches",
-    packages=find_packages(exclude=["tests", "docs", "contrib"]),
+    packages=find_packages(exclude=["tests", "tests.*", "benchmarks",
+                                    "benchmarks.*", "docs", "contrib"]),
     license='Creative Commons Attribution-Noncommercial-Share Alike license',
     long_description=open('README.md').read(),
     long_description_content_type="text/markdown",
@@ -0,0 +1,105 @@
+import unittest
+from datetime import date
+
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import event
+
+from flask_filter import FlaskFilter
+from tests.minipet_app import create_app, filtr, Dog, db, Toy
+
+
+class AggregateTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=40),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=50),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        ball, rope = Toy(name="Ball"), Toy(name="Rope")
+        doggos[0].toys.extend([ball, rope])
+        doggos[1].toys.extend([ball, rope])
+        doggos[3].toys.append(ball)
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def test_count_without_groups(self):
+        with self.app.app_context():
+            rows = self.filtr.aggregate(Dog, [])
+            self.assertEqual([{"count": 5}], rows)
+
+    def test_group_by_with_metrics(self):
+        filters = [{"field": "weight", "op": "<", "value": 100}]
+        metrics = ["count", "count:dateOfBirth", "max:dateOfBirth",
+                   "min:name", "sum:weight", "avg:weight"]
+        with self.app.app_context():
+            rows = self.filtr.aggregate(Dog, filters, ["weight"], metrics)
+        self.assertEqual([
+            {"weight": 40.0, "count": 2, "count_dateOfBirth": 2,
+             "max_dateOfBirth": date(2000, 5, 24), "min_name": "Jasmine",
+             "sum_weight": 80.0, "avg_weight": 40.0},
+            {"weight": 50.0, "count": 2, "count_dateOfBirth": 1,
+             "max_dateOfBirth": date(2005, 12, 31), "min_name": "Jinx",
+             "sum_weight": 100.0, "avg_weight": 50.0},
+        ], rows)
+
+    def test_single_query(self):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with self.app.app_context():
+            event.listen(self.db.engine, "before_cursor_execute", record)
+            try:
+                self.filtr.aggregate(Dog, [], ["weight"], ["min:name"])
+            finally:
+                event.remove(self.db.engine, "before_cursor_execute", record)
+        self.assertEqual(1, len(statements))
+        self.assertIn("GROUP BY", statements[0])
+
+    def test_relationship_join_counts_each_object_once(self):
+        filtr = FlaskFilter(relationship_strategy="join")
+        filters = [{"field": "toys.name", "op": "in",
+                    "value": ["Ball", "Rope"]}]
+        with self.app.app_context():
+            rows = filtr.aggregate(Dog, filters, ["weight"], ["count"])
+        self.assertEqual([{"weight": 40.0, "count": 1},
+                          {"weight": 50.0, "count": 1},
+                          {"weight": 100.0, "count": 1}], rows)
+
+    def test_contradiction(self):
+        filters = [{"field": "weight", "op": "<", "value": 10},
+                   {"field": "weight", "op": ">", "value": 20}]
+        with self.app.app_context():
+            self.assertEqual([], self.filtr.aggregate(Dog, filters,
+                                                      ["weight"]))
+            self.assertEqual([{"count": 0, "sum_weight": None}],
+                             self.filtr.aggregate(Dog, filters, None,
+                                                  ["count", "sum:weight"]))
+
+    def test_invalid_metrics(self):
+        with self.app.app_context():
+            for metrics in (["median:weight"], ["sum"], ["max:toys"],
+                            ["avg:unknown"]):
+                with self.assertRaises(ValidationError):
+                    self.filtr.aggregate(Dog, [], None, metrics)
+            with self.assertRaises(ValidationError):
+                self.filtr.aggregate(Dog, [], ["toys"])
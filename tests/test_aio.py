@@ -0,0 +1,76 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from flask_filter import FlaskFilter
+from tests.minipet_app import Dog, DogSchema, db, Toy
+
+try:
+    from flask_filter.aio import AsyncSearch
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    import aiosqlite
+except ImportError:
+    AsyncSearch = None
+
+
+@unittest.skipIf(AsyncSearch is None, "requires SQLAlchemy 1.4+ and aiosqlite")
+class AsyncSearchTestClass(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        engine = create_engine(f"sqlite:///{self.path}")
+        db.metadata.create_all(engine)
+        with Session(engine) as session:
+            self.make_dogs(session)
+        engine.dispose()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{self.path}")
+        self.filtr = FlaskFilter()
+        self.filtr.register_model(Dog, DogSchema)
+        self.search = AsyncSearch(
+            self.filtr, lambda: AsyncSession(self.engine)
+        )
+
+    def tearDown(self):
+        asyncio.run(self.engine.dispose())
+        os.remove(self.path)
+
+    def make_dogs(self, session):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[0].toys.append(Toy(name="Rock"))
+        session.add_all(doggos)
+        session.commit()
+
+    def test_search(self):
+        f = [{"field": "weight", "op": ">=", "value": 55}]
+        dogs = asyncio.run(self.search.search(Dog, f, order_by="name"))
+        self.assertListEqual([d.name for d in dogs],
+                             ["Jinx", "Quick", "Xocomil"])
+
+    def test_count_and_page_gathered_concurrently(self):
+        f = [{"field": "name", "op": "like", "value": "%i%"}]
+
+        async def run():
+            return await asyncio.gather(
+                self.search.count(Dog, f),
+                self.search.search(Dog, f, limit=2, order_by="name"),
+                self.search.exists(Dog, [{"field": "toys.name",
+                                          "op": "contains",
+                                          "value": "Rock"}]),
+            )
+
+        count, page, exists = asyncio.run(run())
+        self.assertEqual(count, 4)
+        self.assertListEqual([d.name for d in page], ["Jasmine", "Jinx"])
+        self.assertTrue(exists)
@@ -0,0 +1,31 @@
+import unittest
+
+from benchmarks.suite import compare, metric, run
+
+
+class BenchmarkSuiteTestClass(unittest.TestCase):
+
+    def test_small_run_reports_every_section(self):
+        report = run(dogs=300, toys=20, repeat=1, number=5)
+        self.assertEqual(report["meta"]["dogs"], 300)
+        sections = {name.split(".")[0] for name in report["results"]}
+        self.assertEqual(sections, {"deserialize", "compile",
+                                    "compile-cached", "search", "memory"})
+        self.assertIn("search.contains", report["results"])
+        self.assertGreater(report["results"]["memory.search"]["value"], 0)
+
+    def test_compare_flags_regressions_only(self):
+        baseline = {"results": {
+            "search.=": metric(1.0, "ms"),
+            "search.in": metric(1.0, "ms"),
+            "deserialize.single": metric(1000.0, "ops/s", True),
+            "deserialize.mixed": metric(1000.0, "ops/s", True),
+        }}
+        current = {"results": {
+            "search.=": metric(1.5, "ms"),
+            "search.in": metric(0.5, "ms"),
+            "deserialize.single": metric(700.0, "ops/s", True),
+            "deserialize.mixed": metric(2000.0, "ops/s", True),
+        }}
+        names = [r[0] for r in compare(current, baseline, tolerance=0.2)]
+        self.assertEqual(names, ["search.=", "deserialize.single"])
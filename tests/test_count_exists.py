@@ -0,0 +1,76 @@
+import unittest
+from datetime import date
+
+from sqlalchemy import event
+
+from flask_filter.query_filter import count_with_filters, exists_with_filters
+from tests.minipet_app import create_app, filtr, Dog, DogSchema, db, Toy
+
+
+class CountExistsTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[0].toys.append(Toy(name="Rock"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def test_count_without_filters(self):
+        with self.app.app_context():
+            self.assertEqual(self.filtr.count(Dog, []), 5)
+
+    def test_count_with_filters(self):
+        f = [{"field": "weight", "op": ">=", "value": 55}]
+        with self.app.app_context():
+            self.assertEqual(self.filtr.count(Dog, f, DogSchema), 3)
+
+    def test_count_emits_single_aggregate_select(self):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        f = [{"field": "toys.name", "op": "contains", "value": "Rock"}]
+        with self.app.app_context():
+            engine = self.db.engine
+            event.listen(engine, "before_cursor_execute", record)
+            try:
+                self.assertEqual(self.filtr.count(Dog, f), 1)
+            finally:
+                event.remove(engine, "before_cursor_execute", record)
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith("SELECT count(dog.id)"))
+
+    def test_exists(self):
+        yes = [{"field": "name", "op": "like", "value": "J%"}]
+        no = [{"field": "name", "op": "=", "value": "Fido"}]
+        with self.app.app_context():
+            self.assertTrue(self.filtr.exists(Dog, yes))
+            self.assertFalse(self.filtr.exists(Dog, no))
+
+    def test_module_level_functions(self):
+        f = [{"field": "dateOfBirth", "op": "=", "value": None}]
+        with self.app.app_context():
+            self.assertEqual(count_with_filters(Dog, f, DogSchema), 1)
+            self.assertTrue(exists_with_filters(Dog, f, DogSchema))
@@ -0,0 +1,59 @@
+import unittest
+
+from marshmallow.exceptions import ValidationError
+
+from flask_filter.schemas import FilterSchema, deserialize_filters
+from flask_filter.filters import *
+
+
+class DeserializeFiltersTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = FilterSchema()
+
+    def tearDown(self):
+        self.schema = None
+
+    def assertSameError(self, data, **kwargs):
+        with self.assertRaises(ValidationError) as fast:
+            deserialize_filters(data, **kwargs)
+        with self.assertRaises(ValidationError) as slow:
+            self.schema.load(data, **kwargs)
+        self.assertEqual(fast.exception.messages, slow.exception.messages)
+
+    def test_fast_path_matches_schema_load(self):
+        data = [
+            {"field": "weight", "op": "<", "value": 10.24},
+            {"field": "dateOfBirth", "op": ">=", "value": "2018-12-15"},
+            {"field": "name", "op": "in", "value": ["Jinx", "Kaya"]},
+            {"field": "toys.id", "op": "contains", "value": 2},
+        ]
+        fast = deserialize_filters(data, many=True)
+        slow = self.schema.load(data, many=True)
+        self.assertListEqual([type(f) for f in fast], [type(f) for f in slow])
+        self.assertListEqual([f.value for f in fast], [f.value for f in slow])
+        self.assertEqual(fast[3].nested, "id")
+
+    def test_fast_path_single_filter(self):
+        f = deserialize_filters({"field": "name", "op": "=", "value": "Fido"})
+        self.assertIsInstance(f, EqualsFilter)
+
+    def test_bad_operator_falls_back_to_schema_errors(self):
+        self.assertSameError([{"field": "weight", "op": "ne", "value": 1}],
+                             many=True)
+
+    def test_missing_key_falls_back_to_schema_errors(self):
+        self.assertSameError([{"field": "weight", "op": "<"}], many=True)
+
+    def test_unknown_key_falls_back_to_schema_errors(self):
+        data = {"field": "weight", "op": "<", "value": 1, "extra": True}
+        self.assertSameError(data)
+
+    def test_invalid_value_raises_validationerror(self):
+        with self.assertRaises(ValidationError):
+            deserialize_filters([{"field": "name", "op": "<", "value": "x"}],
+                                many=True)
+
+    def test_many_requires_list(self):
+        self.assertSameError({"field": "name", "op": "=", "value": "x"},
+                             many=True)
@@ -0,0 +1,110 @@
+import unittest
+from datetime import date
+
+from sqlalchemy import event
+
+from flask_filter import FlaskFilter
+from flask_filter.loading import eager_options, nested_paths
+from tests.minipet_app import (
+    create_app, filtr, Dog, DogSchema, db, Toy, ToySchema
+)
+
+
+class EagerLoadingTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        for i, dog in enumerate(doggos):
+            dog.toys.append(Toy(name=f"Toy {i}"))
+        doggos[0].toys.append(Toy(name="Rock"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def _dump_statements(self, search):
+        """ statements run by a search and by serializing its results """
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = self.db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            dogs = search()
+            data = DogSchema(many=True).dump(dogs)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        self.db.session.expunge_all()
+        return data, statements
+
+    def test_nested_paths_from_schema(self):
+        self.assertEqual(nested_paths(Dog, DogSchema), ["toys"])
+        self.assertEqual(nested_paths(Dog, DogSchema, only=["name"]), [])
+        self.assertEqual(nested_paths(Toy, ToySchema), [])
+
+    def test_lazy_loading_by_default(self):
+        with self.app.app_context():
+            data, statements = self._dump_statements(
+                lambda: self.filtr.search(Dog, []))
+        self.assertEqual(len(data), 5)
+        self.assertEqual(len(statements), 6)
+
+    def test_eager_search_uses_bounded_queries(self):
+        with self.app.app_context():
+            lazy, _ = self._dump_statements(
+                lambda: self.filtr.search(Dog, [], order_by="name"))
+            eager, statements = self._dump_statements(
+                lambda: self.filtr.search(Dog, [], order_by="name",
+                                          eager=True))
+        self.assertEqual(len(statements), 2)
+        self.assertIn(" IN (", statements[1])
+        self.assertEqual(eager, lazy)
+
+    def test_joined_strategy_keeps_limit(self):
+        f = [{"field": "weight", "op": ">=", "value": 50}]
+        with self.app.app_context():
+            data, statements = self._dump_statements(
+                lambda: self.filtr.search(Dog, f, limit=2, order_by="name",
+                                          eager={"toys": "joined"}))
+        self.assertEqual(len(statements), 1)
+        self.assertEqual([d["name"] for d in data], ["Jinx", "Kaya"])
+
+    def test_extension_default_and_projection(self):
+        eager = FlaskFilter(eager_load=True)
+        with self.app.app_context():
+            _, statements = self._dump_statements(
+                lambda: eager.search(Dog, [], DogSchema))
+            self.assertEqual(len(statements), 2)
+            page, statements = self._dump_statements(
+                lambda: eager.paginate(Dog, [], DogSchema, limit=2).items)
+            self.assertEqual(len(statements), 2)
+            self.assertEqual(len(page), 2)
+            options = eager_options(Dog, DogSchema, True, only=["name"])
+            self.assertEqual(options, [])
+
+    def test_unknown_paths_and_strategies(self):
+        with self.assertRaises(ValueError):
+            eager_options(Dog, DogSchema, ["name"])
+        with self.assertRaises(ValueError):
+            eager_options(Dog, DogSchema, {"toys": "subquery"})
@@ -0,0 +1,80 @@
+import unittest
+from datetime import date
+
+from flask_filter.explain import advise, explain, format_advice
+from tests.minipet_app import create_app, filtr, Dog, db, Toy
+
+
+class ExplainTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[0].toys.append(Toy(name="Rock"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def test_unindexed_column_scans(self):
+        f = [{"field": "weight", "op": ">", "value": 45}]
+        with self.app.app_context():
+            report = explain(self.filtr, Dog, f)
+        self.assertEqual(report.full_scans, ["dog"])
+        self.assertIn("WHERE dog.weight >", report.sql)
+
+    def test_indexed_columns_do_not_scan(self):
+        by_name = [{"field": "name", "op": "=", "value": "Kaya"}]
+        by_id = [{"field": "id", "op": "in", "value": [1, 2]}]
+        with self.app.app_context():
+            self.assertEqual(explain(self.filtr, Dog, by_name).full_scans, [])
+            self.assertEqual(explain(self.filtr, Dog, by_id).full_scans, [])
+
+    def test_contradiction_has_no_plan(self):
+        f = [{"field": "weight", "op": "<", "value": 3},
+             {"field": "weight", "op": ">", "value": 5}]
+        with self.app.app_context():
+            report = explain(self.filtr, Dog, f)
+        self.assertEqual((report.sql, report.plan), (None, []))
+
+    def test_advise_suggests_missing_indexes(self):
+        payloads = [
+            [{"field": "weight", "op": ">", "value": 45}],
+            [{"field": "toys.name", "op": "like", "value": "R%"}],
+        ]
+        with self.app.app_context():
+            advice = advise(self.filtr, Dog, payloads)
+            ddl = [s.ddl for s in advice.suggestions]
+            self.assertIn("CREATE INDEX ix_dog_weight ON dog (weight)", ddl)
+            self.assertIn("CREATE INDEX ix_dog_dob ON dog (dob)", ddl)
+            self.assertIn("CREATE INDEX ix_dog_toys_dog_id ON dog_toys "
+                          "(dog_id)", ddl)
+            self.assertNotIn("name", [s.column for s in advice.suggestions])
+            weight = next(s for s in advice.suggestions
+                          if s.column == "weight")
+            self.assertEqual(weight.fields, ["weight"])
+            self.assertTrue(weight.scanned)
+            self.assertIn("FULL SCAN of dog", format_advice(advice))
+
+            self.db.session.execute("CREATE INDEX ix_dog_weight "
+                                    "ON dog (weight)")
+            advice = advise(self.filtr, Dog, payloads[:1])
+            self.assertEqual(advice.reports[0].full_scans, [])
+            self.assertNotIn("weight",
+                             [s.column for s in advice.suggestions])
@@ -0,0 +1,117 @@
+import unittest
+from datetime import date
+
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import event
+
+from flask_filter import FlaskFilter
+from flask_filter.facets import bucket_labels
+from tests.minipet_app import create_app, filtr, Dog, db, Toy
+
+
+class FacetsTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=40),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=12)
+        ]
+        ball, rope = Toy(name="Ball"), Toy(name="Rope")
+        doggos[0].toys.extend([ball, rope])
+        doggos[1].toys.extend([ball, rope])
+        doggos[3].toys.append(ball)
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def _statements(self, fn):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.db.engine, "before_cursor_execute", record)
+        try:
+            result = fn()
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", record)
+        return result, statements
+
+    def test_counts_in_one_statement(self):
+        filters = [{"field": "weight", "op": ">=", "value": 20}]
+        facets = ["weight", "toys.name", "dateOfBirth"]
+        with self.app.app_context():
+            result, statements = self._statements(
+                lambda: self.filtr.facets(Dog, filters, facets))
+        self.assertEqual(1, len(statements))
+        self.assertIn("UNION ALL", statements[0])
+        # the weight facet leaves out the weight filter
+        self.assertEqual([{"value": 40.0, "count": 2},
+                          {"value": 12.0, "count": 1},
+                          {"value": 55.0, "count": 1},
+                          {"value": 100.0, "count": 1}], result["weight"])
+        self.assertEqual([{"value": "Ball", "count": 3},
+                          {"value": "Rope", "count": 2}], result["toys.name"])
+        self.assertEqual(4, len(result["dateOfBirth"]))
+        self.assertIsInstance(result["dateOfBirth"][0]["value"], date)
+
+    def test_other_facets_keep_the_filter(self):
+        filters = [{"field": "toys.name", "op": "=", "value": "Rope"}]
+        with self.app.app_context():
+            result = self.filtr.facets(Dog, filters, ["toys.name", "name"])
+        self.assertEqual([{"value": "Ball", "count": 3},
+                          {"value": "Rope", "count": 2}], result["toys.name"])
+        self.assertEqual(["Jasmine", "Xocomil"],
+                         sorted(c["value"] for c in result["name"]))
+
+    def test_buckets(self):
+        facet = {"field": "weight", "buckets": [25, 50]}
+        self.assertEqual(["*-25", "25-50", "50-*"], bucket_labels([25, 50]))
+        with self.app.app_context():
+            result = self.filtr.facets(Dog, [], [facet])
+        self.assertEqual([{"value": "*-25", "count": 1},
+                          {"value": "25-50", "count": 2},
+                          {"value": "50-*", "count": 2}], result["weight"])
+
+    def test_relationship_join_strategy(self):
+        filtr = FlaskFilter(relationship_strategy="join")
+        filters = [{"field": "toys.name", "op": "=", "value": "Ball"}]
+        with self.app.app_context():
+            result = filtr.facets(Dog, filters, ["weight", "toys.name"])
+        self.assertEqual([{"value": 40.0, "count": 1},
+                          {"value": 55.0, "count": 1},
+                          {"value": 100.0, "count": 1}], result["weight"])
+        self.assertEqual("Ball", result["toys.name"][0]["value"])
+
+    def test_contradictory_filters(self):
+        filters = [{"field": "weight", "op": "<", "value": 10},
+                   {"field": "weight", "op": ">", "value": 20}]
+        with self.app.app_context():
+            result = self.filtr.facets(Dog, filters, ["weight", "name"])
+        self.assertEqual([], result["name"])
+        self.assertEqual(4, len(result["weight"]))
+
+    def test_invalid_facets(self):
+        with self.app.app_context():
+            with self.assertRaises(ValidationError):
+                self.filtr.facets(Dog, [], ["unknown"])
+            with self.assertRaises(ValidationError):
+                self.filtr.facets(Dog, [], [{"field": "weight",
+                                             "buckets": []}])
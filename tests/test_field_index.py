@@ -0,0 +1,72 @@
+import unittest
+
+from marshmallow import fields
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import Date
+
+from flask_filter.fields import field_index, _INDEXES
+from flask_filter.schemas import deserialize_filters
+from tests.minipet_app import create_app, filtr, Dog, DogSchema, db
+
+
+class AgeSchema(DogSchema):
+    age = fields.Integer()
+
+
+class FieldIndexTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.filtr = filtr
+
+    def tearDown(self):
+        self.app = None
+        self.filtr = None
+
+    def test_register_model_builds_index(self):
+        self.assertIn((Dog, DogSchema), _INDEXES)
+
+    def test_index_follows_attribute_remaps(self):
+        info = field_index(Dog, DogSchema).resolve("dateOfBirth")
+        self.assertIs(info.column, Dog.dob)
+        self.assertEqual(info.attribute, "dob")
+        self.assertIsInstance(info.type, Date)
+        self.assertIsNone(info.relationship)
+
+    def test_index_records_relationships(self):
+        info = field_index(Dog, DogSchema).resolve("toys")
+        self.assertIsNotNone(info.relationship)
+        self.assertIsNone(info.type)
+
+    def test_schema_instances_share_class_index(self):
+        self.assertIs(field_index(Dog, DogSchema()),
+                      field_index(Dog, DogSchema))
+
+    def test_unmapped_fields_are_excluded(self):
+        index = field_index(Dog, AgeSchema)
+        self.assertNotIn("age", index)
+        with self.assertRaises(ValidationError):
+            index.resolve("age")
+
+    def test_index_is_frozen(self):
+        index = field_index(Dog, DogSchema)
+        with self.assertRaises(TypeError):
+            index.fields["color"] = None
+
+    def test_unknown_field_rejected_before_querying(self):
+        f = [{"field": "color", "op": "=", "value": "brown"}]
+        with self.app.app_context():
+            with self.assertRaises(ValidationError):
+                self.filtr.search(Dog, f)
+
+    def test_unknown_field_rejected_while_deserializing(self):
+        index = field_index(Dog, DogSchema)
+        for field in ("color", "weight.kg", "toys.color"):
+            f = [{"field": field, "op": "=", "value": "brown"}]
+            with self.assertRaises(ValidationError):
+                deserialize_filters(f, many=True, index=index)
+        # a long `in` list would otherwise fill a temp table first
+        f = [{"field": "color", "op": "in", "value": list(range(2000))}]
+        with self.app.app_context():
+            with self.assertRaises(ValidationError):
+                self.filtr.search(Dog, f)
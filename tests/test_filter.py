@@ -47,3 +47,18 @@ class FilterSchemaTestClass(unittest.TestCase):
         instance_1 = self.schema.load(json_1)
         instance_2 = self.schema.load(json_2)
         self.assertNotEqual(instance_1, instance_2)
+
+    def test_filters_are_immutable(self):
+        f = self.schema.load({"field": "weight", "op": "<", "value": 45})
+        with self.assertRaises(AttributeError):
+            f.value = 50
+        with self.assertRaises(AttributeError):
+            f.extra = 1
+        self.assertFalse(hasattr(f, "__dict__"))
+
+    def test_infilter_hashable_as_cache_key(self):
+        json = {"field": "id", "op": "in", "value": [1, 2, 3]}
+        instance_1 = self.schema.load(json)
+        instance_2 = self.schema.load(json)
+        self.assertEqual((1, 2, 3), instance_1.value)
+        self.assertEqual({instance_1: "hit"}[instance_2], "hit")
@@ -0,0 +1,125 @@
+import unittest
+from datetime import date
+
+from marshmallow.exceptions import ValidationError
+
+from flask_filter import FlaskFilter
+from flask_filter.filters import *
+from flask_filter.query_filter import query_with_filters
+from flask_filter.schemas import FilterSchema, deserialize_filters
+from tests.minipet_app import create_app, Dog, DogSchema, db, Toy
+
+
+class FilterGroupSchemaTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = FilterSchema()
+
+    def tearDown(self):
+        self.schema = None
+
+    def test_schema_loads_boolean_tree(self):
+        json = {"or": [
+            {"field": "name", "op": "=", "value": "Kaya"},
+            {"not": {"field": "weight", "op": "<", "value": 50}},
+        ]}
+        group = self.schema.load(json)
+        self.assertIsInstance(group, OrFilter)
+        self.assertIsInstance(group.filters[0], EqualsFilter)
+        self.assertIsInstance(group.filters[1], NotFilter)
+        self.assertIsInstance(group.filters[1].filters[0], LTFilter)
+
+    def test_fast_path_matches_schema_load(self):
+        json = [{"and": [
+            {"field": "name", "op": "like", "value": "J%"},
+            {"or": [{"field": "weight", "op": ">", "value": 50}]},
+        ]}]
+        self.assertListEqual(deserialize_filters(json, many=True),
+                             self.schema.load(json, many=True))
+
+    def test_nested_groups_are_flattened_and_deduplicated(self):
+        leaf = {"field": "weight", "op": ">", "value": 50}
+        other = {"field": "name", "op": "=", "value": "Kaya"}
+        group = self.schema.load({"or": [leaf, {"or": [leaf, other]}]})
+        self.assertEqual(len(group.filters), 2)
+        self.assertIsInstance(group.filters[1], EqualsFilter)
+
+    def test_group_mixed_with_leaf_keys_raises(self):
+        json = {"field": "name", "op": "=", "value": "x", "or": []}
+        with self.assertRaises(ValidationError):
+            self.schema.load(json)
+
+    def test_incomplete_nested_leaf_raises(self):
+        json = {"and": [{"field": "name", "op": "="}]}
+        with self.assertRaises(ValidationError):
+            deserialize_filters(json)
+
+
+class FilterGroupSearchTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = FlaskFilter(self.app)
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[3].toys.append(Toy(name="Kong"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def search(self, filters):
+        with self.app.app_context():
+            dogs = self.filtr.search(Dog, filters, DogSchema, order_by="name")
+        return [d.name for d in dogs]
+
+    def test_or_group(self):
+        f = [{"or": [
+            {"field": "name", "op": "=", "value": "Kaya"},
+            {"field": "weight", "op": ">", "value": 95},
+        ]}]
+        self.assertListEqual(self.search(f), ["Kaya", "Xocomil"])
+
+    def test_not_group_with_implicit_and(self):
+        f = [
+            {"not": {"field": "name", "op": "like", "value": "J%"}},
+            {"field": "weight", "op": ">=", "value": 50},
+        ]
+        self.assertListEqual(self.search(f), ["Kaya", "Quick", "Xocomil"])
+
+    def test_or_group_over_relationship(self):
+        f = [{"or": [
+            {"field": "toys.name", "op": "contains", "value": "Kong"},
+            {"field": "dateOfBirth", "op": "=", "value": None},
+        ]}]
+        self.assertListEqual(self.search(f), ["Jinx", "Kaya"])
+
+    def test_same_tree_shape_reuses_plan(self):
+        for name in ("Kaya", "Quick"):
+            f = [{"or": [{"field": "name", "op": "=", "value": name},
+                         {"field": "weight", "op": "<", "value": 45}]}]
+            self.assertListEqual(self.search(f), sorted(["Jasmine", name]))
+        self.assertEqual(self.filtr.plan_cache.info().hits, 1)
+
+    def test_query_with_filters_accepts_groups(self):
+        f = [{"or": [{"field": "name", "op": "=", "value": "Jinx"},
+                     {"field": "name", "op": "=", "value": "Kaya"}]}]
+        with self.app.app_context():
+            dogs = query_with_filters(Dog, f, DogSchema)
+        self.assertEqual(len(dogs), 2)
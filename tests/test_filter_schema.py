@@ -62,7 +62,7 @@ class FilterSchemaTestClass(unittest.TestCase):
         self.assertIsInstance(filter, InFilter)
         self.assertEqual(filter.field, "age")
         self.assertEqual(filter.OP, "in")
-        self.assertEqual(filter.value, [3, 4, 5])
+        self.assertEqual(filter.value, (3, 4, 5))
 
     def test_filter_schema_deserializes_notequalsfilter(self):
         json = {"field": "age", "op": "!=", "value": 3}
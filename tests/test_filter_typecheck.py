@@ -147,11 +147,11 @@ class FilterSchemaTestClass(unittest.TestCase):
         with self.assertRaises(ValidationError):
             self.schema.load(json)
 
-    def test_infilter_accepts_string_and_converts_to_list(self):
+    def test_infilter_accepts_string_and_converts_to_tuple(self):
         json = {"field": "name", "op": "in", "value": "Fido"}
         infilter = self.schema.load(json)
         self.assertIsInstance(infilter, InFilter)
-        self.assertEqual(infilter.value, ["Fido"])
+        self.assertEqual(infilter.value, ("Fido",))
 
     def test_notequalsfilter_accepts_string(self):
         json = {"field": "name", "op": "!=", "value": "Fido"}
@@ -0,0 +1,82 @@
+import unittest
+from datetime import date
+
+from flask_filter import FlaskFilter
+from flask_filter.instrumentation import FilterMetrics, PHASES
+from tests.minipet_app import create_app, Dog, DogSchema, db, Toy
+
+
+class InstrumentationTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = FlaskFilter()
+        self.filtr.register_model(Dog, DogSchema)
+        self.events = []
+        self.filtr.add_listener(self.events.append)
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[0].toys.append(Toy(name="Rock"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def test_every_phase_reported(self):
+        f = [{"field": "weight", "op": ">", "value": 50},
+             {"field": "toys.name", "op": "=", "value": "Rock"}]
+        with self.app.app_context():
+            dogs = self.filtr.search(Dog, f)
+        self.assertEqual(len(dogs), 1)
+        self.assertEqual(tuple(e.phase for e in self.events), PHASES)
+        for e in self.events:
+            self.assertIs(e.model, Dog)
+            self.assertGreaterEqual(e.elapsed, 0)
+            self.assertEqual(e.shapes, [("weight", (), ">"),
+                                        ("toys", ("name",), "=", False)])
+        execute, hydrate = self.events[2:]
+        self.assertEqual((execute.rows, hydrate.rows), (1, 1))
+        self.assertIn("FROM dog", execute.sql)
+        self.assertIn("dog.weight >", execute.sql)
+        self.assertIsNone(self.events[0].sql)
+
+    def test_listener_removed(self):
+        self.filtr.remove_listener(self.events.append)
+        with self.app.app_context():
+            self.filtr.search(Dog, [])
+        self.assertEqual(self.events, [])
+
+    def test_metrics_histograms(self):
+        metrics = FilterMetrics()
+        self.filtr.add_listener(metrics)
+        by_weight = [{"field": "weight", "op": ">", "value": 50}]
+        by_both = by_weight + [{"field": "name", "op": "like", "value": "J%"}]
+        with self.app.app_context():
+            self.filtr.search(Dog, by_weight)
+            self.filtr.search(Dog, by_both)
+        snapshot = metrics.snapshot()
+        self.assertEqual(sorted(snapshot), ["Dog.name like", "Dog.weight >"])
+        self.assertEqual(snapshot["Dog.weight >"]["count"], 2)
+        self.assertEqual(snapshot["Dog.name like"]["count"], 1)
+        self.assertEqual(snapshot["Dog.weight >"]["buckets"]["+Inf"], 2)
+        text = metrics.prometheus()
+        self.assertIn('flask_filter_query_seconds_count{model="Dog",'
+                      'field="weight",op=">"} 2', text)
+        metrics.clear()
+        self.assertEqual(metrics.snapshot(), {})
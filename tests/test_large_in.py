@@ -0,0 +1,130 @@
+import unittest
+from datetime import date
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+
+from flask_filter import FlaskFilter
+from flask_filter.filters import InFilter
+from flask_filter.large_in import AnyFilter, rewrite_large_in
+from flask_filter.plans import FilterPlan
+from tests.minipet_app import create_app, Dog, DogSchema, db, Toy
+
+
+class LargeInTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = FlaskFilter(large_in_threshold=3)
+        self.filtr.register_model(Dog, DogSchema)
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[0].toys.append(Toy(name="Rock"))
+        doggos[1].toys.append(Toy(name="Ball"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def _search(self, filtr, filters):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = self.db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            names = [d.name for d in filtr.search(Dog, filters,
+                                                  order_by="name")]
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        return names, statements[-1]
+
+    def test_long_list_uses_temp_table(self):
+        ids = [2, 4] + list(range(1000, 6000))
+        f = [{"field": "id", "op": "in", "value": ids}]
+        with self.app.app_context():
+            names, sql = self._search(self.filtr, f)
+        self.assertEqual(names, ["Jasmine", "Jinx"])
+        self.assertIn("ff_in_0_integer", sql)
+        self.assertLess(sql.count("?"), 10)
+
+    def test_short_list_stays_in(self):
+        f = [{"field": "name", "op": "in", "value": ["Jinx", "Kaya"]}]
+        with self.app.app_context():
+            names, sql = self._search(self.filtr, f)
+        self.assertEqual(names, ["Jinx", "Kaya"])
+        self.assertIn("IN (?, ?)", sql)
+
+    def test_temp_table_reloaded_per_search(self):
+        f1 = [{"field": "name", "op": "in",
+               "value": ["Jinx", "Kaya", "Rex", "Fido"]}]
+        f2 = [{"field": "name", "op": "in",
+               "value": ["Quick", "Xocomil", "Rex", "Fido"]}]
+        with self.app.app_context():
+            self.assertEqual(self._search(self.filtr, f1)[0],
+                             ["Jinx", "Kaya"])
+            self.assertEqual(self._search(self.filtr, f2)[0],
+                             ["Quick", "Xocomil"])
+        self.assertEqual(self.filtr.plan_cache.info().hits, 1)
+
+    def test_lists_of_one_statement_get_their_own_tables(self):
+        heavy = {"field": "weight", "op": ">", "value": 0}
+        sets = [[{"field": "id", "op": "in", "value": [1, 2, 3, 4]}, heavy],
+                [{"field": "id", "op": "in", "value": [3, 4, 5, 6]}, heavy]]
+        f = [{"field": "id", "op": "in", "value": [1, 2, 3, 4]},
+             {"field": "toys.id", "op": "in", "value": [2, 3, 4, 5]}]
+        with self.app.app_context():
+            found = self.filtr.search_many(Dog, sets, order_by="id")
+            facets = self.filtr.facets(Dog, f, ["id", "name"])
+        self.assertEqual([[1, 2, 3, 4], [3, 4, 5]],
+                         [[d.id for d in dogs] for dogs in found])
+        self.assertEqual([{"value": 2, "count": 1}], facets["id"])
+        self.assertEqual([{"value": "Jasmine", "count": 1}], facets["name"])
+
+    def test_nested_and_related_lists(self):
+        f = [{"or": [
+            {"field": "weight", "op": ">", "value": 95},
+            {"field": "toys.name", "op": "in",
+             "value": ["Ball", "Bone", "Stick", "Frisbee"]},
+        ]}]
+        with self.app.app_context():
+            names, sql = self._search(self.filtr, f)
+        self.assertEqual(names, ["Jasmine", "Xocomil"])
+        self.assertIn("ff_in_0_string", sql)
+
+    def test_in_strategy_keeps_lists_inline(self):
+        filtr = FlaskFilter(large_in_threshold=3, large_in_strategy="in")
+        f = [{"field": "id", "op": "in", "value": [1, 2, 3, 4, 50]}]
+        with self.app.app_context():
+            names, sql = self._search(filtr, f)
+        self.assertEqual(len(names), 4)
+        self.assertNotIn("ff_in", sql)
+
+    def test_any_strategy_binds_one_array(self):
+        filters, loads = rewrite_large_in(
+            [InFilter("id", [1, 2, 3, 4])],
+            threshold=3, strategy="any")
+        self.assertEqual(loads, [])
+        self.assertIsInstance(filters[0], AnyFilter)
+        plan = FilterPlan(Dog, DogSchema, filters)
+        sql = str(plan.criterion.compile(dialect=postgresql.dialect()))
+        self.assertEqual(sql, "dog.id = ANY (%(ff_0)s)")
+        self.assertEqual(plan.params(filters), {"ff_0": [1, 2, 3, 4]})
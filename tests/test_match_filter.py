@@ -0,0 +1,165 @@
+import unittest
+from datetime import date
+
+from marshmallow.exceptions import ValidationError
+
+from flask_filter.filters import MatchFilter
+from flask_filter.fts import create_fts, fts_ddl, unregister_fts
+from flask_filter.schemas import deserialize_filters
+from tests.minipet_app import (
+    create_app, filtr, Dog, DogSchema, db, Toy, ToySchema
+)
+
+
+class MatchFilterTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        unregister_fts(Dog)
+        unregister_fts(Toy)
+        self.filtr.register_model(Dog, DogSchema)
+        with self.app.app_context():
+            self.db.session.execute("DROP TABLE IF EXISTS dog_fts")
+            self.db.session.execute("DROP TABLE IF EXISTS toy_fts")
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Big Red", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Red Rover Red", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Little Red Rover", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[0].toys.append(Toy(name="Tennis Ball"))
+        doggos[3].toys.append(Toy(name="Squeaky Ball"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def enable_fts(self):
+        self.filtr.register_model(Dog, DogSchema, fts=["name"])
+        create_fts(self.db.session.connection(), Dog)
+
+    def match(self, value, field="name", **kwargs):
+        filters = [{"field": field, "op": "match", "value": value}]
+        return [d.name for d in self.filtr.search(Dog, filters, **kwargs)]
+
+    def test_deserializes(self):
+        f = deserialize_filters({"field": "name", "op": "match",
+                                 "value": "red"})
+        self.assertIsInstance(f, MatchFilter)
+
+    def test_requires_words(self):
+        for value in (7, "", " - "):
+            with self.assertRaises(ValidationError):
+                MatchFilter("name", value)
+
+    def test_fallback_without_fts(self):
+        with self.app.app_context():
+            self.assertEqual(["Jinx"], self.match("JINX"))
+            self.assertEqual(["Red Rover Red", "Little Red Rover"],
+                             self.match("red rover", order_by="id"))
+            self.assertEqual([], self.match("rover little"))
+
+    def test_fallback_escapes_wildcards(self):
+        with self.app.app_context():
+            # unescaped, "_" would match the space in "Little Red"
+            self.assertEqual([], self.match("e_r"))
+
+    def test_full_text(self):
+        with self.app.app_context():
+            self.enable_fts()
+            query = self.filtr._search_query(
+                Dog, [MatchFilter("name", "red")])
+            self.assertIn("MATCH", str(query))
+            self.assertEqual(["Big Red", "Red Rover Red", "Little Red Rover"],
+                             self.match("red", order_by="id"))
+            # any order, whole words only
+            self.assertEqual(["Red Rover Red", "Little Red Rover"],
+                             self.match("rover red", order_by="id"))
+            self.assertEqual([], self.match("rov"))
+
+    def test_full_text_ignores_query_syntax(self):
+        with self.app.app_context():
+            self.enable_fts()
+            self.assertEqual(["Jinx"], self.match('"jinx*'))
+            self.assertEqual([], self.match("jinx OR kaya"))
+            self.assertEqual(["Kaya"], self.match("(kaya"))
+
+    def test_plan_reused_across_values(self):
+        with self.app.app_context():
+            self.enable_fts()
+            self.assertEqual(["Jinx"], self.match("jinx"))
+            self.assertEqual(["Kaya"], self.match("kaya"))
+
+    def test_index_follows_writes(self):
+        with self.app.app_context():
+            self.enable_fts()
+            dog = Dog.query.filter_by(name="Jinx").one()
+            dog.name = "Jinx Junior"
+            self.db.session.add(Dog(name="Rusty", weight=12))
+            self.db.session.commit()
+            self.assertEqual(["Jinx Junior"], self.match("junior"))
+            self.assertEqual(["Rusty"], self.match("rusty"))
+            self.db.session.delete(dog)
+            self.db.session.commit()
+            self.assertEqual([], self.match("jinx"))
+
+    def test_relevance_order(self):
+        with self.app.app_context():
+            self.enable_fts()
+            names = self.match("red", order_by="relevance")
+            self.assertEqual("Red Rover Red", names[0])
+            self.assertEqual(3, len(names))
+
+    def test_relevance_without_fts(self):
+        with self.app.app_context():
+            self.assertEqual(3, len(self.match("red", order_by="relevance")))
+
+    def test_related_field(self):
+        with self.app.app_context():
+            self.assertEqual(["Big Red", "Jinx"],
+                             self.match("ball", "toys.name", order_by="id"))
+            self.filtr.register_model(Toy, ToySchema, fts=["name"])
+            create_fts(self.db.session.connection(), Toy)
+            self.assertEqual(["Jinx"], self.match("squeaky", "toys.name"))
+
+    def test_nested_in_or_group(self):
+        with self.app.app_context():
+            self.enable_fts()
+            filters = [{"or": [
+                {"field": "name", "op": "match", "value": "big"},
+                {"field": "name", "op": "match", "value": "kaya"},
+            ]}]
+            dogs = self.filtr.search(Dog, filters, order_by="id")
+            self.assertEqual(["Big Red", "Kaya"], [d.name for d in dogs])
+
+    def test_predicate(self):
+        predicate = MatchFilter("name", "rover RED").predicate()
+        self.assertTrue(predicate("Little Red Rover"))
+        self.assertFalse(predicate("Red Rovers"))
+        self.assertFalse(predicate(None))
+
+    def test_ddl(self):
+        self.filtr.register_model(Dog, DogSchema, fts=["name"])
+        sqlite = fts_ddl(Dog, "sqlite")
+        self.assertIn("USING fts5(name, content='dog', content_rowid='id')",
+                      sqlite[0])
+        postgres = fts_ddl(Dog, "postgresql")
+        self.assertEqual(["CREATE INDEX IF NOT EXISTS ix_dog_name_fts ON dog "
+                          "USING GIN (to_tsvector('english'::regconfig, "
+                          "name))"], postgres)
+
+    def test_rejects_relationship_field(self):
+        with self.assertRaises(ValueError):
+            self.filtr.register_model(Dog, DogSchema, fts=["toys"])
@@ -0,0 +1,105 @@
+import unittest
+from datetime import date
+from types import SimpleNamespace
+
+from flask_filter.memory import filter_columns, filter_objects, filter_records
+from tests.minipet_app import DogSchema
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def dog(id, name, dob, weight, toys=()):
+    return SimpleNamespace(id=id, name=name, dob=dob, weight=weight,
+                           toys=[SimpleNamespace(id=i, name=n) for i, n in toys])
+
+
+DOGS = [
+    dog(1, "Xocomil", date(1990, 12, 16), 100, [(1, "Rock"), (2, "Ball")]),
+    dog(2, "Jasmine", date(1997, 4, 20), 40),
+    dog(3, "Quick", date(2000, 5, 24), 90, [(2, "Ball")]),
+    dog(4, "Jinx", date(2005, 12, 31), 55, [(4, "Kong")]),
+    dog(5, "Kaya", None, 50),
+]
+
+
+class MemoryFilterTestClass(unittest.TestCase):
+
+    def names(self, filters, schema=DogSchema):
+        return [d.name for d in filter_objects(DOGS, filters, schema)]
+
+    def test_comparators_follow_schema_attributes(self):
+        f = [{"field": "dateOfBirth", "op": "<", "value": "2000-01-01"},
+             {"field": "weight", "op": ">=", "value": 50}]
+        self.assertListEqual(self.names(f), ["Xocomil"])
+
+    def test_null_semantics_match_sql(self):
+        eq = [{"field": "dateOfBirth", "op": "=", "value": None}]
+        lt = [{"field": "dateOfBirth", "op": "<", "value": "2020-01-01"}]
+        self.assertListEqual(self.names(eq), ["Kaya"])
+        self.assertEqual(len(self.names(lt)), 4)
+
+    def test_like_and_in(self):
+        f = [{"field": "name", "op": "like", "value": "J%"},
+             {"field": "id", "op": "in", "value": [2, 3]}]
+        self.assertListEqual(self.names(f), ["Jasmine"])
+
+    def test_contains_walks_collections(self):
+        by_id = [{"field": "toys", "op": "contains", "value": 2}]
+        by_name = [{"field": "toys.name", "op": "contains", "value": "Kong"}]
+        self.assertListEqual(self.names(by_id), ["Xocomil", "Quick"])
+        self.assertListEqual(self.names(by_name), ["Jinx"])
+
+    def test_boolean_groups(self):
+        f = [{"or": [{"field": "name", "op": "=", "value": "Kaya"},
+                     {"not": {"field": "weight", "op": "<", "value": 95}}]}]
+        self.assertListEqual(self.names(f), ["Xocomil", "Kaya"])
+
+    def test_filter_records_uses_dict_keys(self):
+        records = [{"name": "Fido", "weight": 12, "owner": {"city": "Oslo"}},
+                   {"name": "Rex", "weight": 30},
+                   {"name": "Spot", "owner": {"city": "Rome"}}]
+        f = [{"field": "owner.city", "op": "in", "value": ["Oslo", "Rome"]},
+             {"field": "weight", "op": "!=", "value": 30}]
+        matches = filter_records(records, f)
+        self.assertListEqual([r["name"] for r in matches], ["Fido"])
+
+    def test_filter_records_keeps_date_strings(self):
+        records = [{"name": "Fido", "dob": "2019-05-05"},
+                   {"name": "Rex", "dob": "2021-01-01"}]
+        before = [{"field": "dob", "op": "<", "value": "2020-01-01"}]
+        on = [{"field": "dob", "op": "=", "value": "2021-01-01"}]
+        self.assertListEqual([r["name"] for r in
+                              filter_records(records, before)], ["Fido"])
+        self.assertListEqual([r["name"] for r in
+                              filter_records(records, on)], ["Rex"])
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class ColumnarFilterTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = {
+            "name": np.array(["Xocomil", "Jasmine", "Quick", "Jinx", "Kaya"],
+                             dtype=object),
+            "weight": np.array([100, 40, 90, 55, np.nan]),
+        }
+
+    def test_vectorized_comparisons(self):
+        f = [{"field": "weight", "op": ">", "value": 50},
+             {"field": "weight", "op": "!=", "value": 90}]
+        mask = filter_columns(self.columns, f)
+        self.assertListEqual(mask.tolist(), [True, False, False, True, False])
+
+    def test_predicate_fallback_and_groups(self):
+        f = [{"or": [{"field": "name", "op": "like", "value": "J%"},
+                     {"field": "weight", "op": "=", "value": None}]}]
+        mask = filter_columns(self.columns, f)
+        self.assertListEqual(mask.tolist(), [False, True, False, True, True])
+
+    def test_in_filter_mask(self):
+        f = [{"field": "name", "op": "in", "value": ["Kaya", "Quick"]}]
+        mask = filter_columns(self.columns, f)
+        self.assertListEqual(mask.tolist(), [False, False, True, False, True])
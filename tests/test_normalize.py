@@ -0,0 +1,192 @@
+import unittest
+from datetime import date
+
+from sqlalchemy import event
+
+from flask_filter import FlaskFilter
+from flask_filter.filters import (
+    EqualsFilter, GTFilter, InFilter, LikeFilter, LTEFilter, NotEqualsFilter
+)
+from flask_filter.fields import field_index
+from flask_filter.normalize import normalize_filters
+from flask_filter.schemas import deserialize_filters
+from tests.minipet_app import create_app, filtr, Dog, DogSchema, db, Toy
+
+
+def normalize(filters):
+    return normalize_filters(deserialize_filters(filters, many=True))
+
+
+class NormalizeFiltersTestClass(unittest.TestCase):
+
+    def test_ranges_merge_into_one_interval(self):
+        f = [
+            {"field": "weight", "op": ">", "value": 5},
+            {"field": "weight", "op": ">", "value": 10},
+            {"field": "weight", "op": ">=", "value": 3},
+            {"field": "weight", "op": "<=", "value": 90},
+            {"field": "weight", "op": "<", "value": 95},
+        ]
+        self.assertEqual(normalize(f), [GTFilter("weight", 10),
+                                        LTEFilter("weight", 90)])
+
+    def test_equal_bounds_become_equality(self):
+        f = [{"field": "weight", "op": ">=", "value": 50},
+             {"field": "weight", "op": "<=", "value": 50}]
+        self.assertEqual(normalize(f), [EqualsFilter("weight", 50)])
+
+    def test_single_in_collapses_to_equality(self):
+        f = [{"field": "name", "op": "in", "value": ["Jinx"]}]
+        self.assertEqual(normalize(f), [EqualsFilter("name", "Jinx")])
+
+    def test_equality_and_in_intersect(self):
+        f = [{"field": "name", "op": "in", "value": ["Jinx", "Kaya", "Rex"]},
+             {"field": "name", "op": "in", "value": ["Kaya", "Rex", "Fido"]},
+             {"field": "name", "op": "!=", "value": "Rex"}]
+        self.assertEqual(normalize(f), [EqualsFilter("name", "Kaya")])
+        f = [{"field": "weight", "op": "in", "value": [40, 50, 100]},
+             {"field": "weight", "op": ">", "value": 45}]
+        self.assertEqual(normalize(f), [InFilter("weight", [50, 100])])
+
+    def test_duplicates_dropped_and_order_kept(self):
+        f = [{"field": "name", "op": "like", "value": "J%"},
+             {"field": "weight", "op": ">", "value": 5},
+             {"field": "name", "op": "like", "value": "J%"},
+             {"field": "weight", "op": "!=", "value": None}]
+        self.assertEqual(normalize(f), [LikeFilter("name", "J%"),
+                                        GTFilter("weight", 5)])
+
+    def test_contradictions(self):
+        contradictions = [
+            [{"field": "weight", "op": "<", "value": 3},
+             {"field": "weight", "op": ">", "value": 5}],
+            [{"field": "weight", "op": "<", "value": 5},
+             {"field": "weight", "op": ">=", "value": 5}],
+            [{"field": "name", "op": "=", "value": "Jinx"},
+             {"field": "name", "op": "=", "value": "Kaya"}],
+            [{"field": "name", "op": "=", "value": "Jinx"},
+             {"field": "name", "op": "!=", "value": "Jinx"}],
+            [{"field": "dateOfBirth", "op": "=", "value": None},
+             {"field": "dateOfBirth", "op": ">", "value": "2000-01-01"}],
+            [{"field": "name", "op": "in", "value": []}],
+            [{"field": "weight", "op": "in", "value": [None]}],
+            [{"field": "weight", "op": "!=", "value": 2},
+             {"field": "weight", "op": "in", "value": [None]}],
+            [{"field": "weight", "op": "in", "value": [None, 5]},
+             {"field": "weight", "op": "in", "value": [None, 6]}],
+        ]
+        for f in contradictions:
+            self.assertIsNone(normalize(f), f)
+
+    def test_related_and_mismatched_filters_left_alone(self):
+        f = [{"field": "toys.id", "op": "<", "value": 3},
+             {"field": "toys.id", "op": ">", "value": 5}]
+        self.assertEqual(len(normalize(f)), 2)
+        f = [{"field": "dateOfBirth", "op": "=", "value": "2000-05-24"},
+             {"field": "dateOfBirth", "op": "in", "value": ["2000-05-24"]}]
+        self.assertEqual(len(normalize(f)), 2)
+
+    def test_relationship_fields_left_alone(self):
+        index = field_index(Dog, DogSchema)
+        for op, values in (("=", (1, 2)), ("in", ([1], [2]))):
+            f = deserialize_filters(
+                [{"field": "toys", "op": op, "value": v} for v in values],
+                many=True, index=index)
+            self.assertEqual(normalize_filters(f, index), f)
+
+    def test_inequality_outside_range_dropped(self):
+        f = [{"field": "weight", "op": ">", "value": 50},
+             {"field": "weight", "op": "!=", "value": 10},
+             {"field": "weight", "op": "!=", "value": 60}]
+        self.assertEqual(normalize(f), [GTFilter("weight", 50),
+                                        NotEqualsFilter("weight", 60)])
+
+
+class NormalizedSearchTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def test_contradiction_skips_database(self):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        f = [{"field": "weight", "op": "<", "value": 3},
+             {"field": "weight", "op": ">", "value": 5}]
+        with self.app.app_context():
+            engine = self.db.engine
+            event.listen(engine, "before_cursor_execute", record)
+            try:
+                self.assertEqual(self.filtr.search(Dog, f), [])
+                self.assertEqual(self.filtr.count(Dog, f), 0)
+                self.assertFalse(self.filtr.exists(Dog, f))
+                self.assertEqual(self.filtr.paginate(Dog, f).items, [])
+                self.assertEqual(list(self.filtr.stream(Dog, f)), [])
+                many = self.filtr.search_many(Dog, [f, []])
+            finally:
+                event.remove(engine, "before_cursor_execute", record)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual([len(r) for r in many], [0, 5])
+
+    def test_dog_owning_both_toys(self):
+        with self.app.app_context():
+            jinx = Dog.query.filter_by(name="Jinx").one()
+            kaya = Dog.query.filter_by(name="Kaya").one()
+            jinx.toys.extend([Toy(name="Ball"), Toy(name="Rope")])
+            kaya.toys.append(Toy(name="Rock"))
+            self.db.session.commit()
+            f = [{"field": "toys", "op": "=", "value": 1},
+                 {"field": "toys", "op": "=", "value": 2}]
+            self.assertEqual(["Jinx"],
+                             [d.name for d in self.filtr.search(Dog, f)])
+            f = [{"field": "toys", "op": "in", "value": [1, 3]},
+                 {"field": "toys", "op": "in", "value": [2]}]
+            self.assertEqual(["Jinx"],
+                             [d.name for d in self.filtr.search(Dog, f)])
+
+    def test_in_null_matches_nothing(self):
+        raw = FlaskFilter(normalize=False)
+        f = [{"field": "dateOfBirth", "op": "in", "value": [None]}]
+        g = [{"field": "dateOfBirth", "op": "in",
+              "value": [None, "2005-12-31"]}]
+        with self.app.app_context():
+            self.assertEqual([], self.filtr.search(Dog, f))
+            self.assertEqual([], raw.search(Dog, f, DogSchema))
+            self.assertEqual(["Jinx"],
+                             [d.name for d in self.filtr.search(Dog, g)])
+
+    def test_normalized_search_matches_raw_search(self):
+        raw = FlaskFilter(normalize=False)
+        f = [{"field": "weight", "op": ">", "value": 45},
+             {"field": "weight", "op": ">=", "value": 50},
+             {"field": "weight", "op": "<", "value": 100},
+             {"field": "name", "op": "in",
+              "value": ["Jinx", "Kaya", "Xocomil"]}]
+        with self.app.app_context():
+            self.assertEqual(self.filtr.search(Dog, f, order_by="id"),
+                             raw.search(Dog, f, DogSchema, order_by="id"))
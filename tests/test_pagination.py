@@ -0,0 +1,150 @@
+import enum
+import unittest
+import uuid
+from datetime import date, time
+
+from marshmallow import Schema, fields
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import CHAR, TypeDecorator, func
+
+from flask_filter.pagination import decode_cursor, encode_cursor
+from tests.minipet_app import create_app, filtr, Dog, DogSchema, db
+
+
+class GUID(TypeDecorator):
+    impl = CHAR(36)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else str(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else uuid.UUID(value)
+
+
+class Kind(enum.Enum):
+    walk = "w"
+    vet = "v"
+
+
+class Visit(db.Model):
+    id = db.Column(GUID, primary_key=True)
+    kind = db.Column(db.Enum(Kind))
+    at = db.Column(db.Time)
+
+
+class VisitSchema(Schema):
+    id = fields.UUID()
+    kind = fields.String()
+    at = fields.Time()
+
+
+class KeysetPaginationTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=50),
+            Dog(name="Kaya", dob=date(2009, 3, 15), weight=50)
+        ]
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def collect(self, filters, **kwargs):
+        ids, cursor = [], None
+        while True:
+            page = self.filtr.paginate(Dog, filters, cursor=cursor, **kwargs)
+            ids.append([d.id for d in page.items])
+            cursor = page.next_cursor
+            if cursor is None:
+                return ids
+
+    def test_pages_by_primary_key(self):
+        with self.app.app_context():
+            pages = self.collect([], limit=2)
+        self.assertListEqual(pages, [[1, 2], [3, 4], [5]])
+
+    def test_multi_column_ordering_with_tiebreaker(self):
+        with self.app.app_context():
+            pages = self.collect([], limit=2, order_by=["weight"])
+        self.assertListEqual(pages, [[2, 4], [5, 3], [1]])
+
+    def test_descending_ordering_on_remapped_field(self):
+        f = [{"field": "weight", "op": "<", "value": 95}]
+        with self.app.app_context():
+            pages = self.collect(f, limit=3, order_by="-dateOfBirth")
+        self.assertListEqual(pages, [[5, 4, 3], [2]])
+
+    def test_page_boundary_on_null_sort_key(self):
+        with self.app.app_context():
+            self.db.session.add_all([Dog(name="Ollie", weight=20),
+                                     Dog(name="Pip", weight=30)])
+            self.db.session.commit()
+            ascending = self.collect([], limit=2, order_by="dateOfBirth")
+            descending = self.collect([], limit=2, order_by="-dateOfBirth")
+        # SQLite sorts NULL below every date
+        self.assertListEqual(ascending, [[6, 7], [1, 2], [3, 4], [5]])
+        self.assertListEqual(descending, [[5, 4], [3, 2], [1, 6], [7]])
+
+    def test_ordering_clauses(self):
+        with self.app.app_context():
+            pages = self.collect([], limit=2, order_by=[Dog.weight.desc()])
+            self.assertListEqual(pages, [[1, 3], [4, 5], [2]])
+            with self.assertRaises(ValidationError):
+                self.filtr.paginate(Dog, [], order_by=func.lower(Dog.name))
+
+    def test_uuid_enum_and_time_keys(self):
+        ids = sorted(uuid.uuid4() for _ in range(5))
+        with self.app.app_context():
+            self.db.session.add_all([
+                Visit(id=i, kind=Kind.vet if n % 2 else Kind.walk,
+                      at=time(9, n)) for n, i in enumerate(ids)])
+            self.db.session.commit()
+            for order_by, expected in (
+                    (None, ids),
+                    ("-at", ids[::-1]),
+                    ("kind", [ids[1], ids[3], ids[0], ids[2], ids[4]])):
+                found, cursor = [], None
+                while True:
+                    page = self.filtr.paginate(Visit, [], VisitSchema,
+                                               limit=2, order_by=order_by,
+                                               cursor=cursor)
+                    found.extend(v.id for v in page.items)
+                    cursor = page.next_cursor
+                    if cursor is None:
+                        break
+                self.assertListEqual(expected, found)
+
+    def test_exact_page_has_no_next_cursor(self):
+        with self.app.app_context():
+            page = self.filtr.paginate(Dog, [], DogSchema, limit=5)
+        self.assertEqual(len(page.items), 5)
+        self.assertIsNone(page.next_cursor)
+
+    def test_cursor_round_trips_dates(self):
+        values = [date(2005, 12, 31), 50.0, 4]
+        self.assertListEqual(decode_cursor(encode_cursor(values)), values)
+
+    def test_invalid_cursor_raises_validationerror(self):
+        with self.app.app_context():
+            with self.assertRaises(ValidationError):
+                self.filtr.paginate(Dog, [], cursor="not a cursor")
+            with self.assertRaises(ValidationError):
+                self.filtr.paginate(Dog, [], cursor=encode_cursor([1, 2]))
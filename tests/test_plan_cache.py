@@ -0,0 +1,107 @@
+import unittest
+from datetime import date
+
+from flask_filter import FlaskFilter
+from flask_filter.filters import InFilter
+from flask_filter.plans import PlanCache
+
+from tests.minipet_app import create_app, Dog, DogSchema, db
+
+
+class NotInFilter(InFilter):
+    OP = "!in"
+
+    def apply(self, query, class_, schema=None):
+        field = self._get_db_field(schema)
+        return query.filter(getattr(class_, field).notin_(list(self.value)))
+
+
+class PlanCacheTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = FlaskFilter(self.app, plan_cache_size=2)
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.db = None
+        self.filtr = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def test_same_shape_reuses_plan(self):
+        f1 = [{"field": "weight", "op": ">", "value": 90}]
+        f2 = [{"field": "weight", "op": ">", "value": 45}]
+        with self.app.app_context():
+            fat_dogs = self.filtr.search(Dog, f1, DogSchema)
+            fatish_dogs = self.filtr.search(Dog, f2, DogSchema)
+        self.assertEqual(len(fat_dogs), 1)
+        self.assertEqual(len(fatish_dogs), 4)
+        info = self.filtr.plan_cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_infilter_binds_list_values(self):
+        f1 = [{"field": "name", "op": "in", "value": ["Jinx", "Kaya"]}]
+        f2 = [{"field": "name", "op": "in", "value": ["Jinx", "Fido", "Rex"]}]
+        with self.app.app_context():
+            two_dogs = self.filtr.search(Dog, f1, DogSchema)
+            one_dog = self.filtr.search(Dog, f2, DogSchema)
+        self.assertEqual(len(two_dogs), 2)
+        self.assertEqual(len(one_dog), 1)
+        self.assertEqual(self.filtr.plan_cache.info().hits, 1)
+
+    def test_null_equality_compiles_separate_plan(self):
+        f1 = [{"field": "dateOfBirth", "op": "=", "value": None}]
+        f2 = [{"field": "name", "op": "=", "value": None}]
+        f3 = [{"field": "name", "op": "=", "value": "Kaya"}]
+        with self.app.app_context():
+            no_dob = self.filtr.search(Dog, f1, DogSchema)
+            no_name = self.filtr.search(Dog, f2, DogSchema)
+            kaya = self.filtr.search(Dog, f3, DogSchema)
+        self.assertEqual(len(no_dob), 1)
+        self.assertEqual(len(no_name), 0)
+        self.assertEqual(kaya[0].name, "Kaya")
+        self.assertEqual(self.filtr.plan_cache.info().misses, 3)
+
+    def test_lru_evicts_least_recently_used_plan(self):
+        cache = self.filtr.plan_cache
+        by_weight = [{"field": "weight", "op": ">", "value": 90}]
+        by_name = [{"field": "name", "op": "=", "value": "Jinx"}]
+        by_dob = [{"field": "dateOfBirth", "op": "<", "value": "2000-01-01"}]
+        with self.app.app_context():
+            self.filtr.search(Dog, by_weight, DogSchema)
+            self.filtr.search(Dog, by_name, DogSchema)
+            self.filtr.search(Dog, by_weight, DogSchema)
+            self.filtr.search(Dog, by_dob, DogSchema)
+            self.filtr.search(Dog, by_weight, DogSchema)
+            self.filtr.search(Dog, by_name, DogSchema)
+        self.assertEqual(cache.info(), (2, 4, 2, 2))
+
+    def test_apply_overrides_bypass_plan(self):
+        f = [NotInFilter("name", ["Jinx", "Kaya"])]
+        with self.app.app_context():
+            query = self.filtr._build_query(Dog, f, DogSchema)
+            self.assertEqual(len(query.all()), 3)
+
+    def test_disabled_cache_still_compiles(self):
+        cache = PlanCache(maxsize=0)
+        f = [InFilter("name", ["Jinx", "Quick"])]
+        with self.app.app_context():
+            plan = cache.get(Dog, DogSchema, f)
+            self.assertEqual(len(plan.apply(Dog.query, f).all()), 2)
+        self.assertEqual(len(cache), 0)
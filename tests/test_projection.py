@@ -0,0 +1,84 @@
+import unittest
+from datetime import date
+
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import inspect
+
+from flask_filter import FlaskFilter
+from tests.minipet_app import create_app, filtr, Dog, DogSchema, db, Toy
+
+
+class ProjectionTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+        ]
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def test_search_fields_defers_other_columns(self):
+        f = [{"field": "weight", "op": ">", "value": 50}]
+        with self.app.app_context():
+            dogs = self.filtr.search(Dog, f, fields=["name", "toys"])
+            unloaded = inspect(dogs[0]).unloaded
+        self.assertEqual(len(dogs), 2)
+        self.assertIn("weight", unloaded)
+        self.assertIn("dob", unloaded)
+        self.assertNotIn("name", unloaded)
+
+    def test_schema_only_drives_projection(self):
+        schema = DogSchema(only=("id", "dateOfBirth"))
+        with self.app.app_context():
+            dogs = self.filtr.search(Dog, [], schema)
+            unloaded = inspect(dogs[0]).unloaded
+        self.assertNotIn("dob", unloaded)
+        self.assertIn("name", unloaded)
+
+    def test_search_rows_returns_dicts_keyed_by_json_field(self):
+        f = [{"field": "name", "op": "=", "value": "Jasmine"}]
+        with self.app.app_context():
+            rows = self.filtr.search_rows(Dog, f, ["name", "dateOfBirth"])
+        self.assertListEqual(
+            rows, [{"name": "Jasmine", "dateOfBirth": date(1997, 4, 20)}]
+        )
+
+    def test_search_rows_keeps_objects_sharing_values_under_join(self):
+        filtr = FlaskFilter(relationship_strategy="join")
+        f = [{"field": "toys.name", "op": "in", "value": ["Ball", "Rope"]}]
+        with self.app.app_context():
+            ball, rope = Toy(name="Ball"), Toy(name="Rope")
+            for dog in Dog.query.filter(Dog.weight < 95):
+                dog.weight = 40
+                dog.toys.extend([ball, rope])
+            self.db.session.commit()
+            rows = filtr.search_rows(Dog, f, ["weight"])
+            self.assertEqual(2, filtr.count(Dog, f))
+        self.assertListEqual(rows, [{"weight": 40.0}, {"weight": 40.0}])
+
+    def test_search_rows_rejects_relationships(self):
+        with self.app.app_context():
+            with self.assertRaises(ValidationError):
+                self.filtr.search_rows(Dog, [], ["name", "toys"])
+
+    def test_unknown_projected_field_raises(self):
+        with self.app.app_context():
+            with self.assertRaises(ValidationError):
+                self.filtr.search(Dog, [], fields=["color"])
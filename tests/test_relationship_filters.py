@@ -0,0 +1,120 @@
+import unittest
+from datetime import date
+
+from marshmallow.exceptions import ValidationError
+
+from flask_filter import FlaskFilter
+from flask_filter.query_filter import query_with_filters
+from flask_filter.relationships import STRATEGIES
+from tests.minipet_app import create_app, Dog, DogSchema, db, Toy
+
+
+class RelationshipFilterTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+            self.make_toys()
+            self.associate_dogs_with_toys()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def make_toys(self):
+        toys = [
+            Toy(name="Rock"),
+            Toy(name="Tennis Ball"),
+            Toy(name="Knotted Rope"),
+            Toy(name="Kong")
+        ]
+        self.db.session.add_all(toys)
+        self.db.session.commit()
+
+    def associate_dogs_with_toys(self):
+        self.associate("Xocomil", "Rock")
+        self.associate("Xocomil", "Tennis Ball")
+        self.associate("Quick", "Tennis Ball")
+        self.associate("Jinx", "Kong")
+
+    def associate(self, dog_name, toy_name):
+        dog = Dog.query.filter_by(name=dog_name).one()
+        toy = Toy.query.filter_by(name=toy_name).one()
+        dog.toys.append(toy)
+        db.session.add(dog)
+        db.session.commit()
+
+    def search_all_strategies(self, filters):
+        results = {}
+        for strategy in STRATEGIES:
+            filtr = FlaskFilter(self.app, relationship_strategy=strategy)
+            with self.app.app_context():
+                dogs = filtr.search(Dog, filters, DogSchema, order_by="name")
+                count = filtr.count(Dog, filters, DogSchema)
+            names = [d.name for d in dogs]
+            self.assertEqual(count, len(names), strategy)
+            results[strategy] = names
+        return results
+
+    def assertAllStrategies(self, filters, expected):
+        for strategy, names in self.search_all_strategies(filters).items():
+            self.assertListEqual(names, expected, strategy)
+
+    def test_contains_on_nested_column(self):
+        f = [{"field": "toys.name", "op": "contains", "value": "Tennis Ball"}]
+        self.assertAllStrategies(f, ["Quick", "Xocomil"])
+
+    def test_contains_defaults_to_primary_key(self):
+        f = [{"field": "toys", "op": "contains", "value": 4}]
+        self.assertAllStrategies(f, ["Jinx"])
+
+    def test_other_operators_on_related_columns(self):
+        f = [{"field": "toys.name", "op": "like", "value": "%o%"}]
+        self.assertAllStrategies(f, ["Jinx", "Xocomil"])
+
+    def test_arbitrary_depth_self_referential_path(self):
+        f = [{"field": "toys.dogs.name", "op": "contains", "value": "Quick"}]
+        self.assertAllStrategies(f, ["Quick", "Xocomil"])
+
+    def test_merged_filters_match_independently(self):
+        f = [
+            {"field": "toys.name", "op": "contains", "value": "Rock"},
+            {"field": "toys.name", "op": "contains", "value": "Tennis Ball"},
+        ]
+        self.assertAllStrategies(f, ["Xocomil"])
+
+    def test_relationship_and_column_filters_combine(self):
+        f = [
+            {"field": "toys.name", "op": "contains", "value": "Tennis Ball"},
+            {"field": "weight", "op": "<", "value": 95},
+        ]
+        self.assertAllStrategies(f, ["Quick"])
+
+    def test_invalid_path_raises_validationerror(self):
+        f = [{"field": "toys.color", "op": "contains", "value": "red"}]
+        filtr = FlaskFilter(self.app)
+        with self.app.app_context():
+            with self.assertRaises(ValidationError):
+                filtr.search(Dog, f, DogSchema)
+
+    def test_query_with_filters_walks_nested_paths(self):
+        f = [{"field": "toys.dogs.name", "op": "contains", "value": "Jinx"}]
+        with self.app.app_context():
+            dogs = query_with_filters(Dog, f, DogSchema)
+        self.assertListEqual([d.name for d in dogs], ["Jinx"])
@@ -0,0 +1,197 @@
+import os
+import shelve
+import tempfile
+import unittest
+from datetime import date
+
+from sqlalchemy import event
+
+from flask_filter import FlaskFilter
+from flask_filter.results import (
+    DictBackend, LRUBackend, ResultCache, cache_key
+)
+from flask_filter.schemas import deserialize_filters
+from tests.minipet_app import create_app, Dog, DogSchema, db, Toy
+
+
+class ResultCacheTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.cache = ResultCache()
+        self.filtr = FlaskFilter(result_cache=self.cache)
+        self.filtr.register_model(Dog, DogSchema)
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.cache.unwatch()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[0].toys.append(Toy(name="Rock"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def _count_statements(self, fn):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = self.db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            result = fn()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        return result, len(statements)
+
+    def test_repeated_search_skips_database(self):
+        f = [{"field": "weight", "op": ">", "value": 60}]
+        with self.app.app_context():
+            first = self.filtr.search(Dog, f, order_by="name")
+            second, n = self._count_statements(
+                lambda: self.filtr.search(Dog, f, order_by="name"))
+            self.assertEqual(n, 0)
+            self.assertEqual([d.name for d in second], ["Quick", "Xocomil"])
+            self.assertEqual(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_ignores_filter_order_and_repeats(self):
+        a = {"field": "weight", "op": ">", "value": 60}
+        b = {"field": "name", "op": "in", "value": ["Quick", "Kaya"]}
+        k1 = cache_key(Dog, DogSchema, deserialize_filters([a, b], many=True))
+        k2 = cache_key(Dog, DogSchema(),
+                       deserialize_filters([b, a, b], many=True))
+        self.assertEqual(k1, k2)
+        k3 = cache_key(Dog, DogSchema, deserialize_filters([a], many=True),
+                       limit=1)
+        self.assertNotEqual(k1, k3)
+
+    def test_key_tells_paths_and_value_types_apart(self):
+        def key(field, value):
+            f = deserialize_filters(
+                [{"field": field, "op": "contains", "value": value}],
+                many=True)
+            return cache_key(Dog, DogSchema, f)
+        self.assertNotEqual(key("toys.id", 2), key("toys.name", "2"))
+        self.assertNotEqual(key("toys.id", "2"), key("toys.name", "2"))
+        self.assertNotEqual(key("toys.name", 5), key("toys.name", "5"))
+
+    def test_dotted_fields_do_not_share_results(self):
+        by_id = [{"field": "toys.id", "op": "contains", "value": 1}]
+        by_name = [{"field": "toys.name", "op": "contains", "value": "1"}]
+        with self.app.app_context():
+            self.assertEqual(["Xocomil"],
+                             [d.name for d in self.filtr.search(Dog, by_id)])
+            self.assertEqual([], self.filtr.search(Dog, by_name))
+
+    def test_hits_survive_an_unrelated_commit(self):
+        f = [{"field": "weight", "op": ">", "value": 60}]
+        with self.app.app_context():
+            self.filtr.search(Dog, f, order_by="name")
+            self.db.session.add(Toy(name="Ball"))
+            self.db.session.commit()
+            names, n = self._count_statements(lambda: [
+                d.name for d in self.filtr.search(Dog, f, order_by="name")])
+        self.assertEqual(["Quick", "Xocomil"], names)
+        self.assertEqual(0, n)
+
+    def test_eager_hits_keep_loaded_relationships(self):
+        def dump():
+            dogs = self.filtr.search(Dog, [], order_by="name", eager=True)
+            return DogSchema(many=True).dump(dogs)
+
+        with self.app.app_context():
+            miss, n_miss = self._count_statements(dump)
+            self.db.session.expunge_all()
+            hit, n_hit = self._count_statements(dump)
+            self.assertEqual(miss, hit)
+            self.assertEqual((2, 0), (n_miss, n_hit))
+            # a lazy search does not share the eager one's entry
+            self.filtr.search(Dog, [], order_by="name")
+            self.assertEqual(2, self.cache.misses)
+            # nor outlives a write to an eager-loaded model
+            self.db.session.query(Toy).one().name = "Ball"
+            self.db.session.commit()
+            self.assertEqual(["Ball"], [t["name"] for d in dump()
+                                        for t in d["toys"]])
+
+    def test_cache_can_be_bypassed(self):
+        f = [{"field": "name", "op": "=", "value": "Kaya"}]
+        with self.app.app_context():
+            self.filtr.search(Dog, f)
+            _, n = self._count_statements(
+                lambda: self.filtr.search(Dog, f, cache=False))
+            self.assertEqual(n, 1)
+
+    def test_insert_update_and_delete_invalidate(self):
+        f = [{"field": "weight", "op": ">", "value": 95}]
+        with self.app.app_context():
+            self.assertEqual(len(self.filtr.search(Dog, f)), 1)
+            self.db.session.add(Dog(name="Tank", weight=120))
+            self.db.session.commit()
+            self.assertEqual(len(self.filtr.search(Dog, f)), 2)
+            tank = Dog.query.filter_by(name="Tank").one()
+            tank.weight = 10
+            self.db.session.commit()
+            self.assertEqual(len(self.filtr.search(Dog, f)), 1)
+            self.db.session.delete(Dog.query.filter_by(name="Xocomil").one())
+            self.db.session.commit()
+            self.assertEqual(self.filtr.search(Dog, f), [])
+
+    def test_related_model_changes_invalidate(self):
+        f = [{"field": "toys.name", "op": "=", "value": "Ball"}]
+        with self.app.app_context():
+            self.assertEqual(self.filtr.search(Dog, f), [])
+            self.db.session.query(Toy).one().name = "Ball"
+            self.db.session.commit()
+            self.assertEqual([d.name for d in self.filtr.search(Dog, f)],
+                             ["Xocomil"])
+
+    def test_shelve_backend(self):
+        f = [{"field": "name", "op": "like", "value": "J%"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            with shelve.open(os.path.join(tmp, "results")) as store:
+                self.cache.backend = DictBackend(store)
+                with self.app.app_context():
+                    self.filtr.search(Dog, f, order_by="name")
+                    cached, n = self._count_statements(
+                        lambda: self.filtr.search(Dog, f, order_by="name"))
+                    self.assertEqual(n, 0)
+                    self.assertEqual([d.name for d in cached],
+                                     ["Jasmine", "Jinx"])
+                    self.assertEqual(len(store), 1)
+
+
+class LRUBackendTestClass(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        backend = LRUBackend(maxsize=2)
+        backend.set("a", [1])
+        backend.set("b", [2])
+        backend.get("a")
+        backend.set("c", [3])
+        self.assertEqual(backend.get("a"), [1])
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(len(backend), 2)
+
+    def test_entries_expire(self):
+        backend = LRUBackend(ttl=0)
+        backend.set("a", [1])
+        self.assertIsNone(backend.get("a"))
+        self.assertEqual(len(backend), 0)
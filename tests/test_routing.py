@@ -0,0 +1,173 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import object_session, sessionmaker
+
+from flask_filter import FlaskFilter
+from flask_filter.results import ResultCache
+from flask_filter.routing import ReplicaRouter
+from tests.minipet_app import create_app, Dog, db, Toy
+
+
+class ReplicaRoutingTestClass(unittest.TestCase):
+    """ a primary and two replica SQLite files, each holding one dog whose
+    name tells which database answered
+    """
+
+    def setUp(self):
+        self.paths = []
+        for _ in range(3):
+            fd, path = tempfile.mkstemp(suffix=".db")
+            os.close(fd)
+            self.paths.append(path)
+        self.app = create_app()
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = \
+            f"sqlite:///{self.paths[0]}"
+        self.engines = [create_engine(f"sqlite:///{p}")
+                        for p in self.paths[1:]]
+        self.router = ReplicaRouter(self.engines)
+        self.filtr = FlaskFilter(self.app, router=self.router)
+        with self.app.app_context():
+            db.create_all()
+            self.make_dog(db.session, "primary")
+        for i, engine in enumerate(self.engines):
+            db.metadata.create_all(engine)
+            session = sessionmaker(bind=engine)()
+            self.make_dog(session, f"replica{i}")
+            session.close()
+
+    def tearDown(self):
+        self.router.close()
+        for engine in self.engines:
+            engine.dispose()
+        with self.app.app_context():
+            db.session.remove()
+            db.get_engine().dispose()
+        for path in self.paths:
+            os.remove(path)
+        self.app = None
+        self.filtr = None
+
+    def make_dog(self, session, name):
+        dog = Dog(name=name, dob=date(2000, 1, 1), weight=50)
+        dog.toys.append(Toy(name="Ball"))
+        session.add(dog)
+        session.commit()
+
+    def names(self, filtr=None):
+        filtr = filtr or self.filtr
+        return [d.name for d in filtr.search(Dog, [])]
+
+    def test_round_robin(self):
+        with self.app.app_context():
+            found = [self.names() for _ in range(4)]
+        self.assertEqual([["replica0"], ["replica1"],
+                          ["replica0"], ["replica1"]], found)
+
+    def test_count_paginate_and_aggregate_routed(self):
+        filters = [{"field": "toys.name", "op": "=", "value": "Ball"}]
+        with self.app.app_context():
+            page = self.filtr.paginate(Dog, filters)
+            self.assertEqual(["replica0"], [d.name for d in page.items])
+            rows = self.filtr.aggregate(Dog, filters, ["name"])
+            self.assertEqual([{"name": "replica1", "count": 1}], rows)
+            self.assertEqual(1, self.filtr.count(Dog, filters))
+
+    def test_one_replica_per_call(self):
+        filtr = FlaskFilter(self.app, router=self.router,
+                            large_in_threshold=3)
+        ids = {"field": "id", "op": "in", "value": [1, 2, 3, 4]}
+        toys = {"field": "toys.id", "op": "in", "value": [1, 5, 6, 7]}
+        with self.app.app_context():
+            found = filtr.search_many(Dog, [[ids], [ids, toys]])
+            facets = filtr.facets(Dog, [ids, toys], ["id", "name"])
+        self.assertEqual([["replica0"], ["replica0"]],
+                         [[d.name for d in dogs] for dogs in found])
+        self.assertEqual([{"value": "replica1", "count": 1}],
+                         facets["name"])
+
+    def test_cache_hits_join_the_routed_session(self):
+        cache = ResultCache()
+        filtr = FlaskFilter(self.app, router=self.router, result_cache=cache)
+        try:
+            with self.app.app_context():
+                filtr.search(Dog, [])
+                hit = filtr.search(Dog, [])
+                self.assertEqual(1, cache.hits)
+                self.assertEqual(["replica0"], [d.name for d in hit])
+                self.assertIs(self.router.replicas[1].session(),
+                              object_session(hit[0]))
+        finally:
+            cache.unwatch()
+
+    def test_pinned_to_primary(self):
+        with self.app.app_context():
+            db.session.add(Dog(name="fresh", weight=1))
+            db.session.flush()
+            with self.filtr.primary():
+                self.assertEqual(["primary", "fresh"], self.names())
+                with self.filtr.primary():
+                    self.assertEqual(["primary", "fresh"], self.names())
+            self.assertEqual(["replica0"], self.names())
+            db.session.rollback()
+
+    def test_pin_is_per_thread(self):
+        found = []
+
+        def search():
+            with self.app.app_context():
+                found.append(self.names())
+
+        with self.app.app_context(), self.filtr.primary():
+            thread = threading.Thread(target=search)
+            thread.start()
+            thread.join()
+        self.assertEqual([["replica0"]], found)
+
+    def test_least_busy(self):
+        router = ReplicaRouter(self.engines, strategy="least_busy")
+        filtr = FlaskFilter(self.app, router=router)
+        try:
+            with self.app.app_context():
+                # a replica session holds its connection until removed, so
+                # keep replica0 busier than that
+                busy = [self.engines[0].connect() for _ in range(2)]
+                try:
+                    self.assertEqual(2, router.replicas[0].active)
+                    found = {self.names(filtr)[0] for _ in range(3)}
+                finally:
+                    for connection in busy:
+                        connection.close()
+            self.assertEqual({"replica1"}, found)
+            self.assertEqual(0, router.replicas[0].active)
+        finally:
+            router.close()
+
+    def test_session_factories_and_teardown(self):
+        factories = [sessionmaker(bind=e) for e in self.engines]
+        router = ReplicaRouter(factories)
+        filtr = FlaskFilter(self.app, router=router)
+        try:
+            with self.app.app_context():
+                self.assertEqual(["replica0"], self.names(filtr))
+                session = router.replicas[0].session()
+                self.assertIs(session, router.replicas[0].session())
+            # the application context teardown removed the scoped session
+            self.assertIsNot(session, router.replicas[0].session())
+        finally:
+            router.close()
+
+    def test_without_router(self):
+        filtr = FlaskFilter(self.app)
+        with self.app.app_context(), filtr.primary():
+            self.assertEqual(["primary"], self.names(filtr))
+
+    def test_invalid_router(self):
+        with self.assertRaises(ValueError):
+            ReplicaRouter(self.engines, strategy="random")
+        with self.assertRaises(ValueError):
+            ReplicaRouter([])
@@ -0,0 +1,124 @@
+import unittest
+from datetime import date
+
+from sqlalchemy import event
+
+from tests.minipet_app import create_app, filtr, Dog, db, Toy
+
+
+class SearchManyTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[0].toys.append(Toy(name="Rock"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def _statements(self, fn):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = self.db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            result = fn()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        return result, statements
+
+    def test_empty(self):
+        with self.app.app_context():
+            self.assertEqual(self.filtr.search_many(Dog, []), [])
+
+    def test_equality_sets_run_as_one_in_query(self):
+        sets = [
+            [{"field": "name", "op": "=", "value": "Jinx"}],
+            [{"field": "name", "op": "=", "value": "Fido"}],
+            [{"field": "name", "op": "=", "value": "Kaya"}],
+        ]
+        with self.app.app_context():
+            results, statements = self._statements(
+                lambda: self.filtr.search_many(Dog, sets))
+            self.assertEqual([[d.name for d in r] for r in results],
+                             [["Jinx"], [], ["Kaya"]])
+        self.assertEqual(len(statements), 1)
+        self.assertIn(" IN ", statements[0])
+
+    def test_equality_on_relationship_runs_as_union(self):
+        sets = [[{"field": "toys", "op": "=", "value": 1}],
+                [{"field": "toys", "op": "=", "value": 2}]]
+        with self.app.app_context():
+            results, statements = self._statements(
+                lambda: self.filtr.search_many(Dog, sets))
+            self.assertEqual([[d.name for d in r] for r in results],
+                             [["Xocomil"], []])
+        self.assertIn("UNION ALL", statements[0])
+
+    def test_equality_on_dates(self):
+        sets = [
+            [{"field": "dateOfBirth", "op": "=", "value": "2000-05-24"}],
+            [{"field": "dateOfBirth", "op": "=", "value": "1990-12-16"}],
+        ]
+        with self.app.app_context():
+            results = self.filtr.search_many(Dog, sets)
+            self.assertEqual([[d.name for d in r] for r in results],
+                             [["Quick"], ["Xocomil"]])
+
+    def test_mixed_sets_run_as_one_union(self):
+        sets = [
+            [{"field": "weight", "op": ">", "value": 60}],
+            [{"field": "name", "op": "like", "value": "J%"}],
+            [{"field": "toys.name", "op": "=", "value": "Rock"}],
+        ]
+        with self.app.app_context():
+            results, statements = self._statements(
+                lambda: self.filtr.search_many(Dog, sets, order_by="name"))
+            self.assertEqual([[d.name for d in r] for r in results],
+                             [["Quick", "Xocomil"], ["Jasmine", "Jinx"],
+                              ["Xocomil"]])
+        self.assertEqual(len(statements), 1)
+        self.assertIn("UNION ALL", statements[0])
+
+    def test_limit_and_descending_order_per_set(self):
+        sets = [
+            [{"field": "weight", "op": ">=", "value": 50}],
+            [{"field": "name", "op": "like", "value": "%a%"}],
+        ]
+        with self.app.app_context():
+            results = self.filtr.search_many(Dog, sets, limit=2,
+                                             order_by=Dog.weight.desc())
+            self.assertEqual([[d.name for d in r] for r in results],
+                             [["Xocomil", "Quick"], ["Kaya", "Jasmine"]])
+
+    def test_matches_individual_searches(self):
+        sets = [
+            [{"field": "weight", "op": "<", "value": 60}],
+            [{"field": "dateOfBirth", "op": "=", "value": None}],
+        ]
+        with self.app.app_context():
+            results = self.filtr.search_many(Dog, sets)
+            expected = [self.filtr.search(Dog, s, order_by="id") for s in sets]
+            self.assertEqual(results, expected)
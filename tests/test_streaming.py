@@ -0,0 +1,68 @@
+import json
+import types
+import unittest
+from datetime import date
+
+from marshmallow.exceptions import ValidationError
+
+from flask_filter.query_filter import stream_with_filters
+from tests.minipet_app import create_app, filtr, Dog, DogSchema, db
+
+
+class StreamingTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="Xocomil", dob=date(1990, 12, 16), weight=100),
+            Dog(name="Jasmine", dob=date(1997, 4, 20), weight=40),
+            Dog(name="Quick", dob=date(2000, 5, 24), weight=90),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def test_stream_yields_all_matches_in_chunks(self):
+        f = [{"field": "weight", "op": ">=", "value": 50}]
+        with self.app.app_context():
+            dogs = self.filtr.stream(Dog, f, chunk_size=2, order_by="name")
+            self.assertIsInstance(dogs, types.GeneratorType)
+            names = [d.name for d in dogs]
+        self.assertListEqual(names, ["Jinx", "Kaya", "Quick", "Xocomil"])
+
+    def test_stream_validates_filters_eagerly(self):
+        f = [{"field": "name", "op": "<", "value": "Fido"}]
+        with self.app.app_context():
+            with self.assertRaises(ValidationError):
+                self.filtr.stream(Dog, f)
+
+    def test_stream_json_emits_one_line_per_object(self):
+        f = [{"field": "dateOfBirth", "op": "<", "value": "2002-01-01"}]
+        with self.app.app_context():
+            chunks = list(self.filtr.stream_json(Dog, f, chunk_size=2))
+        self.assertEqual(len(chunks), 2)
+        lines = "".join(chunks).splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]["dateOfBirth"], "1990-12-16")
+
+    def test_stream_with_filters_function(self):
+        f = [{"field": "name", "op": "like", "value": "J%"}]
+        with self.app.app_context():
+            dogs = list(stream_with_filters(Dog, f, DogSchema, chunk_size=1))
+        self.assertEqual(len(dogs), 2)
@@ -0,0 +1,187 @@
+import enum
+import unittest
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from marshmallow import Schema, fields
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import Boolean, Column, DateTime, Enum, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.declarative import declarative_base
+
+from flask_filter.coercion import column_parser, identity
+from flask_filter.fields import field_index
+from flask_filter.schemas import deserialize_filters
+from tests.minipet_app import create_app, filtr, Dog, DogSchema, db, Toy
+
+
+Base = declarative_base()
+
+
+class Kind(enum.Enum):
+    walk = "w"
+    vet = "v"
+
+
+class Event(Base):
+    __tablename__ = "event"
+    id = Column(Integer, primary_key=True)
+    at = Column(DateTime(timezone=True))
+    price = Column(Numeric(10, 2))
+    kind = Column(Enum(Kind))
+    done = Column(Boolean)
+    token = Column(UUID(as_uuid=True))
+
+
+class EventSchema(Schema):
+    id = fields.Integer()
+    at = fields.DateTime()
+    price = fields.Decimal()
+    kind = fields.String()
+    done = fields.Boolean()
+    token = fields.UUID()
+    notes = fields.String()
+
+
+class ValueCoercionTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.index = field_index(Event, EventSchema)
+
+    def load(self, field, op, value, index=None):
+        return deserialize_filters({"field": field, "op": op, "value": value},
+                                   index=index or self.index)
+
+    def test_parsers_follow_column_types(self):
+        self.assertEqual(datetime(2020, 1, 2, 3, 4, tzinfo=timezone.utc),
+                         self.load("at", ">", "2020-01-02T03:04:00Z").value)
+        self.assertEqual(datetime(2020, 1, 2, tzinfo=timezone.utc),
+                         self.load("at", ">", "2020-01-02").value)
+        self.assertEqual(Decimal("9.99"), self.load("price", "=", "9.99").value)
+        self.assertIs(Kind.vet, self.load("kind", "=", "vet").value)
+        self.assertIs(Kind.walk, self.load("kind", "=", "w").value)
+        self.assertIs(False, self.load("done", "=", "false").value)
+        token = uuid.uuid4()
+        self.assertEqual(token, self.load("token", "=", str(token)).value)
+        self.assertEqual(7, self.load("id", "=", "7").value)
+
+    def test_in_lists_parsed_in_bulk(self):
+        f = self.load("id", "in", ["1", 2, 3.0])
+        self.assertEqual((1, 2, 3), f.value)
+        f = self.load("kind", "in", ["walk", "v"])
+        self.assertEqual((Kind.walk, Kind.vet), f.value)
+
+    def test_invalid_values_raise(self):
+        for field, value in (("id", "seven"), ("at", "yesterday"),
+                             ("kind", "run"), ("done", "maybe"),
+                             ("token", "not-a-uuid"), ("price", "cheap")):
+            with self.assertRaises(ValidationError):
+                self.load(field, "=", value)
+        with self.assertRaises(ValidationError):
+            self.load("id", "in", 7)
+        for op in ("=", "!=", "in"):
+            with self.assertRaises(ValidationError):
+                self.load("id", op, [1.5] if op == "in" else 1.5)
+
+    def test_range_bounds_on_integers_take_any_number(self):
+        self.assertEqual(1.5, self.load("id", "<", 1.5).value)
+        self.assertEqual(2.5, self.load("id", ">=", "2.5").value)
+        self.assertEqual(3, self.load("id", ">", "3").value)
+        with self.assertRaises(ValidationError):
+            self.load("id", "<=", "three")
+
+    def test_parsers_kept_in_field_index(self):
+        self.assertIs(self.index.resolve("id").parse, self.index.parser("id"))
+        self.assertIsNone(self.index.parser("unknown"))
+
+    def test_marshmallow_field_fallback(self):
+        self.assertIs(identity, column_parser(None, fields.String()))
+        self.assertEqual(date(2020, 1, 2),
+                         column_parser(None, fields.Date())("2020-01-02"))
+        self.assertIsNone(column_parser(None, fields.Raw()))
+
+
+class SearchCoercionTestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.db = db
+        self.filtr = filtr
+        with self.app.app_context():
+            self.db.create_all()
+            self.make_dogs()
+
+    def tearDown(self):
+        with self.app.app_context():
+            self.db.drop_all()
+        self.app = None
+        self.filtr = None
+        self.db = None
+
+    def make_dogs(self):
+        doggos = [
+            Dog(name="2018-12-15", dob=date(2018, 12, 15), weight=10),
+            Dog(name="Jinx", dob=date(2005, 12, 31), weight=55.5),
+            Dog(name="Kaya", dob=None, weight=50)
+        ]
+        doggos[1].toys.append(Toy(name="Rock"))
+        self.db.session.add_all(doggos)
+        self.db.session.commit()
+
+    def search(self, field, op, value):
+        filters = [{"field": field, "op": op, "value": value}]
+        return [d.name for d in self.filtr.search(Dog, filters)]
+
+    def test_date_like_names_stay_strings(self):
+        index = field_index(Dog, DogSchema)
+        f = deserialize_filters({"field": "name", "op": "=",
+                                 "value": "2018-12-15"}, index=index)
+        self.assertEqual("2018-12-15", f.value)
+        with self.app.app_context():
+            self.assertEqual(["2018-12-15"],
+                             self.search("name", "=", "2018-12-15"))
+            self.assertEqual(["2018-12-15"],
+                             self.search("name", "in", ["2018-12-15"]))
+
+    def test_values_parsed_for_search(self):
+        with self.app.app_context():
+            self.assertEqual(["Jinx"],
+                             self.search("dateOfBirth", "in", ["2005-12-31"]))
+            self.assertEqual(["Jinx", "Kaya"], self.search("weight", ">", "20"))
+            self.assertEqual(["Jinx"], self.search("toys", "contains", "1"))
+
+    def test_equality_on_float_column(self):
+        with self.app.app_context():
+            self.assertEqual(["2018-12-15"], self.search("weight", "=", "10"))
+            self.assertEqual(["Jinx"], self.search("weight", "=", 55.5))
+            self.assertEqual(["Jinx", "Kaya"],
+                             self.search("weight", "!=", "10"))
+
+    def test_schema_fallback_parses_too(self):
+        index = field_index(Dog, DogSchema)
+        f = deserialize_filters([{"and": [
+            {"field": "id", "op": "=", "value": "3"}]}], many=True,
+            index=index, partial=False)
+        self.assertEqual(3, f[0].filters[0].value)
+
+    def test_normalized_filters_are_not_parsed_again(self):
+        found = []
+
+        def listener(event):
+            found.extend(event.filters or ())
+
+        self.filtr.add_listener(listener)
+        filters = [{"field": "name", "op": "=", "value": "2018-12-15"},
+                   {"field": "name", "op": "in",
+                    "value": ["2018-12-15", "Jinx"]},
+                   {"field": "dateOfBirth", "op": ">=",
+                    "value": "2018-12-15"}]
+        try:
+            with self.app.app_context():
+                dogs = self.filtr.search(Dog, filters)
+        finally:
+            self.filtr.remove_listener(listener)
+        self.assertEqual(["2018-12-15"], [d.name for d in dogs])
+        self.assertEqual(["2018-12-15", date(2018, 12, 15)],
+                         [f.value for f in found[:2]])